@@ -1,13 +1,27 @@
-from dash import Dash
+import os
+import diskcache
+from flask_compress import Compress
+from dash import Dash, DiskcacheManager
 import dash_bootstrap_components as dbc
+from components.metricas import register_metrics_route
 
-app = Dash(__name__, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
-server = app.server
-
-# app.py
 external_stylesheets = [
     dbc.themes.BOOTSTRAP,
     "https://cdnjs.cloudflare.com/ajax/libs/boxicons/2.1.2/css/boxicons.min.css"
 ]
 
-app = Dash(__name__, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True)
+# Los callbacks largos (Monte Carlo) se ejecutan como trabajos en segundo plano en procesos aparte.
+# Esos procesos no comparten la caché de valoración en memoria (components/cache.py): lo que se
+# reutiliza entre ellos es el almacén de trayectorias con semilla (components/almacen_trayectorias.py)
+background_callback_manager = DiskcacheManager(diskcache.Cache(os.environ.get("TFG_JOBS_CACHE_DIR", "./cache")))
+
+app = Dash(__name__, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True,
+           background_callback_manager=background_callback_manager)
+server = app.server
+
+# Compresión brotli/gzip de las respuestas de los callbacks (figuras en JSON) y de los recursos estáticos
+app.server.config.update(COMPRESS_ALGORITHM=['br', 'gzip'], COMPRESS_BR_LEVEL=4, COMPRESS_LEVEL=6)
+Compress(app.server)
+
+# Métricas de latencia de callbacks y núcleos en formato Prometheus
+register_metrics_route(app.server)
@@ -0,0 +1,164 @@
+// Black-Scholes y griegas en el navegador para el modo en vivo de las páginas de Black-Scholes.
+// Replica batch_option_price y option_greeks de components/funciones.py (mismas unidades: vega por
+// unidad de volatilidad, theta por año y rho por unidad de tasa) para que los deslizadores redibujen
+// sin ir al servidor. Monte Carlo y los árboles se siguen calculando en el servidor.
+(function () {
+    // Función de distribución normal estándar (algoritmo de Hart, precisión doble; West, 2005)
+    function normCdf(x) {
+        const z = Math.abs(x);
+        let tail = 0.0;
+        if (z <= 37) {
+            const e = Math.exp(-z * z / 2);
+            if (z < 7.07106781186547) {
+                let n = 3.52624965998911e-02 * z + 0.700383064443688;
+                n = n * z + 6.37396220353165;
+                n = n * z + 33.912866078383;
+                n = n * z + 112.079291497871;
+                n = n * z + 221.213596169931;
+                n = n * z + 220.206867912376;
+                let d = 8.83883476483184e-02 * z + 1.75566716318264;
+                d = d * z + 16.064177579207;
+                d = d * z + 86.7807322029461;
+                d = d * z + 296.564248779674;
+                d = d * z + 637.333633378831;
+                d = d * z + 793.826512519948;
+                d = d * z + 440.413735824752;
+                tail = e * n / d;
+            } else {
+                let d = z + 0.65;
+                d = z + 4 / d;
+                d = z + 3 / d;
+                d = z + 2 / d;
+                d = z + 1 / d;
+                tail = e / d / 2.506628274631;
+            }
+        }
+        return x > 0 ? 1 - tail : tail;
+    }
+
+    function normPdf(x) {
+        return Math.exp(-0.5 * x * x) / Math.sqrt(2 * Math.PI);
+    }
+
+    // Precio y griegas de una opción europea; con sigma * sqrt(T) = 0 se usa el valor intrínseco descontado
+    function greeks(S, K, r, T, sigma, optionType) {
+        const w = optionType === 'put' ? -1 : 1;
+        const sqrtT = Math.sqrt(Math.max(T, 0));
+        const volSqrtT = sigma * sqrtT;
+        const discountedK = K * Math.exp(-r * T);
+        if (!(volSqrtT > 0)) {
+            const inTheMoney = w * (S - discountedK) > 0 ? 1 : 0;
+            return {
+                price: Math.max(w * (S - discountedK), 0), delta: w * inTheMoney, gamma: 0, vega: 0,
+                theta: -w * r * discountedK * inTheMoney, rho: w * T * discountedK * inTheMoney,
+            };
+        }
+        const d1 = (Math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / volSqrtT;
+        const d2 = d1 - volSqrtT;
+        const pdf = normPdf(d1);
+        const cdfD1 = normCdf(w * d1);
+        const cdfD2 = normCdf(w * d2);
+        return {
+            price: w * (S * cdfD1 - discountedK * cdfD2),
+            delta: w * cdfD1,
+            gamma: pdf / (S * volSqrtT),
+            vega: S * pdf * sqrtT,
+            theta: -S * pdf * sigma / (2 * sqrtT) - w * r * discountedK * cdfD2,
+            rho: w * T * discountedK * cdfD2,
+        };
+    }
+
+    function price(S, K, r, T, sigma, optionType) {
+        return greeks(S, K, r, T, sigma, optionType).price;
+    }
+
+    function linspace(start, stop, num) {
+        const step = num > 1 ? (stop - start) / (num - 1) : 0;
+        return Array.from({length: num}, (_, i) => start + i * step);
+    }
+
+    function greeksChildren(title, g) {
+        const p = (text) => ({namespace: 'dash_html_components', type: 'P', props: {children: text}});
+        return [
+            {namespace: 'dash_html_components', type: 'H4', props: {children: title}},
+            p(`Precio: ${g.price.toFixed(4)}`),
+            p(`Delta: ${g.delta.toFixed(4)} | Gamma: ${g.gamma.toFixed(6)} | Vega: ${g.vega.toFixed(4)}`),
+            p(`Theta (por año): ${g.theta.toFixed(4)} | Rho: ${g.rho.toFixed(4)}`),
+        ];
+    }
+
+    function ready(...values) {
+        return values.every((value) => value !== null && value !== undefined && value !== '');
+    }
+
+    const noUpdate = () => window.dash_clientside.no_update;
+
+    window.blackScholes = {normCdf, normPdf, greeks, price, linspace};
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        black_scholes: {
+            // Muestra el panel en vivo y coloca los deslizadores en los valores del formulario
+            sync_live_controls: function (mode, spot, strike, rate, volatility, dateValue, dateExpiration) {
+                const live = Array.isArray(mode) && mode.includes('live');
+                const style = {display: live ? 'block' : 'none'};
+                const center = spot || strike || 100;
+                let expiry = noUpdate();
+                if (ready(dateValue, dateExpiration)) {
+                    const days = (new Date(dateExpiration) - new Date(dateValue)) / 86400000;
+                    if (days > 0) {
+                        // Misma convención que las páginas del servidor (días / 365.25), sin redondear
+                        expiry = days / 365.25;
+                    }
+                }
+                return [
+                    style, 0.5 * center, 1.5 * center, ready(spot) ? spot : center,
+                    ready(volatility) ? volatility : noUpdate(), ready(rate) ? rate : noUpdate(), expiry,
+                ];
+            },
+
+            // Curvas de precio frente al subyacente, una por volatilidad, como en comparacion_simulaciones
+            comparison_figure: function (spot, volatility, rate, expiry, strike, optionType, volatilities) {
+                if (!ready(spot, volatility, rate, expiry, strike)) {
+                    return [noUpdate(), noUpdate()];
+                }
+                const r = rate / 100;
+                const sigmas = [volatility].concat((volatilities || []).filter((v) => ready(v)).map(Number))
+                    .filter((v, i, all) => all.indexOf(v) === i);
+                const spots = linspace(0.5 * strike, 1.5 * strike, 200);
+                const data = sigmas.map((v) => ({
+                    type: 'scatter', mode: 'lines', x: spots, name: `Vol: ${v.toFixed(2)}%`,
+                    y: spots.map((s) => price(s, strike, r, expiry, v / 100, optionType)),
+                    line: v === volatility ? {width: 3} : {width: 1.5, dash: 'dot'},
+                }));
+                const current = greeks(spot, strike, r, expiry, volatility / 100, optionType);
+                data.push({type: 'scatter', mode: 'markers', x: [spot], y: [current.price], name: 'Subyacente actual',
+                           marker: {size: 10}});
+                const figure = {
+                    data: data,
+                    layout: {title: {text: 'Valor de Opción por Precio del Activo Subyacente (en vivo)'},
+                             xaxis: {title: {text: 'Precio del Activo Subyacente'}},
+                             yaxis: {title: {text: 'Valor de la Opción'}}, uirevision: 'live'},
+                };
+                return [figure, greeksChildren(`Opción ${optionType} con S = ${spot.toFixed(2)}, volatilidad ${volatility}%`, current)];
+            },
+
+            // Evolución del precio hasta el vencimiento, como plot_option_evolution
+            evolution_figure: function (spot, volatility, rate, expiry, strike, optionType) {
+                if (!ready(spot, volatility, rate, expiry, strike)) {
+                    return [noUpdate(), noUpdate()];
+                }
+                const r = rate / 100;
+                const times = linspace(0, expiry, 365);
+                const prices = times.map((t) => price(spot, strike, r, expiry - t, volatility / 100, optionType));
+                const figure = {
+                    data: [{type: 'scatter', mode: 'lines', x: times, y: prices, name: 'Black-Scholes'}],
+                    layout: {title: {text: `Evolución del Precio de la Opción ${optionType} (en vivo)`},
+                             xaxis: {title: {text: 'Tiempo hasta la Expiración (Años)'}},
+                             yaxis: {title: {text: 'Precio de la Opción'}}, uirevision: 'live'},
+                };
+                const current = greeks(spot, strike, r, expiry, volatility / 100, optionType);
+                return [figure, greeksChildren(`Opción ${optionType} hoy`, current)];
+            },
+        },
+    });
+})();
@@ -0,0 +1,286 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from components.cache import clear_cache, configure_cache
+from components.funciones import (function_option_price, monte_carlo_option_pricing, monte_carlo_simulation,
+                                  plot_option_evolution, simulate_gbm)
+from components.multiactivo import constant_correlation, simulate_portfolio
+
+
+SEED = 12345
+DEFAULT_REPEATS = 7
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_ABSOLUTE_FLOOR = 0.005
+NOISE_FACTOR = 3
+MAX_NOISE_FACTOR = 2
+MARKET = {'S': 100.0, 'K': 100.0, 'r': 0.05, 'sigma': 0.2, 'T': 1.0}
+
+
+def _bench_function_option_price(calls):
+    spots = np.linspace(50.0, 150.0, calls)
+    return lambda: [function_option_price(spot, MARKET['K'], MARKET['r'], MARKET['T'], MARKET['sigma'], 'call')
+                    for spot in spots]
+
+
+def _bench_plot_option_evolution(steps):
+    return lambda: plot_option_evolution(MARKET['S'], MARKET['K'], MARKET['r'], MARKET['sigma'], MARKET['T'], steps, 'call')
+
+
+def _bench_monte_carlo_simulation(paths):
+    return lambda: monte_carlo_simulation(MARKET['S'], MARKET['K'], MARKET['r'], MARKET['T'], MARKET['sigma'], 'call',
+                                          paths, seed=SEED)
+
+
+def _bench_simulate_gbm(steps, paths):
+    return lambda: simulate_gbm(MARKET['S'], MARKET['r'], MARKET['sigma'], MARKET['T'], steps, paths, seed=SEED)
+
+
+def _bench_monte_carlo_option_pricing(paths, method):
+    return lambda: monte_carlo_option_pricing(MARKET['S'], MARKET['K'], MARKET['r'], MARKET['sigma'], MARKET['T'], 1,
+                                              paths, seed=SEED, method=method)
+
+
+def _bench_simulate_portfolio(assets, paths, steps):
+    spots = np.linspace(50.0, 150.0, assets)
+    positions = {'asset': np.arange(assets), 'type': ['call', 'put'] * (assets // 2) + ['call'] * (assets % 2),
+                 'strike': spots, 'expiry': np.full(assets, MARKET['T']), 'quantity': np.ones(assets)}
+    return lambda: simulate_portfolio(spots, np.full(assets, MARKET['sigma']), constant_correlation(assets, 0.3), MARKET['r'],
+                                      positions, horizon=MARKET['T'] / 12, steps=steps, paths=paths, seed=SEED)
+
+
+# (nombre, parámetros, constructor, unidades de trabajo, unidad)
+BENCHMARKS = (
+    [('function_option_price', {'calls': n}, _bench_function_option_price, n, 'valoraciones')
+     for n in (1_000, 10_000)]
+    + [('plot_option_evolution', {'steps': n}, _bench_plot_option_evolution, n, 'puntos')
+       for n in (365, 10_000, 100_000)]
+    + [('monte_carlo_simulation', {'paths': n}, _bench_monte_carlo_simulation, 365 * n, 'pasos de trayectoria')
+       for n in (1_000, 10_000, 100_000)]
+    + [('simulate_gbm', {'steps': m, 'paths': n}, _bench_simulate_gbm, m * n, 'pasos de trayectoria')
+       for m, n in ((50, 10_000), (252, 10_000), (252, 100_000))]
+    + [('monte_carlo_option_pricing', {'paths': n, 'method': method}, _bench_monte_carlo_option_pricing, n, 'trayectorias')
+       for n in (100_000, 1_000_000) for method in ('standard', 'antithetic', 'control', 'sobol')]
+    + [('simulate_portfolio', {'assets': n, 'paths': i, 'steps': m}, _bench_simulate_portfolio, n * i * m, 'pasos de activo')
+       for n, i, m in ((10, 100_000, 10), (500, 10_000, 1))]
+)
+
+
+def benchmark_id(name, params):
+    """
+    Identificador estable de un caso: nombre de la función y parámetros ordenados.
+    """
+
+    return name + '[' + ','.join(f"{key}={value}" for key, value in sorted(params.items())) + ']'
+
+
+def _calls_per_window(run, min_time):
+    """
+    Número de llamadas que hacen falta para que una medida dure al menos min_time segundos,
+    como timeit.Timer.autorange: los casos de microsegundos se cronometran en bucle para que
+    la resolución del reloj y las interrupciones del sistema no dominen la medida.
+    """
+
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls
+        calls = max(calls * 2, int(calls * min_time / elapsed) + 1) if elapsed > 0 else calls * 10
+
+
+def run_case(name, params, builder, work, unit, repeats=DEFAULT_REPEATS, min_time=DEFAULT_MIN_TIME):
+    """
+    Ejecuta un caso del banco de pruebas con la caché desactivada.
+
+    Cada una de las repeats medidas repite la llamada hasta durar al menos min_time segundos.
+    El tiempo es el mínimo por llamada (el menos afectado por el ruido del sistema) y el ruido,
+    la dispersión relativa de la mediana respecto a ese mínimo; compare lo usa como tolerancia
+    propia del caso. La memoria máxima se mide en una ejecución aparte con tracemalloc, que
+    ralentiza el código.
+
+    Devuelve:
+        dict: Identificador, parámetros, segundos, ruido, rendimiento (unidades por segundo) y memoria máxima en bytes.
+    """
+
+    run = builder(**params)
+    run()  # Calentamiento: importaciones perezosas y reserva inicial de memoria
+    calls = _calls_per_window(run, min_time)
+    timings = []
+    # Como timeit, sin el recolector de basura durante las medidas: sus pausas dependen de lo
+    # que hayan dejado los casos anteriores y no del código medido
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(calls):
+                run()
+            timings.append((time.perf_counter() - start) / calls)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    noise = float(np.median(timings)) / seconds - 1 if seconds > 0 else 0.0
+    return {'id': benchmark_id(name, params), 'function': name, 'params': params, 'seconds': seconds, 'noise': noise,
+            'calls': calls,
+            'throughput': work / seconds if seconds > 0 else float('inf'), 'unit': unit, 'peak_bytes': peak}
+
+
+def run_benchmarks(selection=None, repeats=DEFAULT_REPEATS, log=print, min_time=DEFAULT_MIN_TIME):
+    """
+    Ejecuta los casos de BENCHMARKS cuyo identificador contiene alguna de las cadenas de selection.
+
+    Devuelve:
+        dict: 'metadata' del entorno y lista de 'results' (ver run_case).
+    """
+
+    configure_cache(max_entries=0)
+    results = []
+    for name, params, builder, work, unit in BENCHMARKS:
+        case_id = benchmark_id(name, params)
+        if selection and not any(pattern in case_id for pattern in selection):
+            continue
+        clear_cache()
+        result = run_case(name, params, builder, work, unit, repeats, min_time)
+        log(f"{case_id:<70} {result['seconds'] * 1e3:10.2f} ms ±{result['noise']:5.1%} {result['throughput']:14,.0f} {unit}/s "
+            f"{result['peak_bytes'] / 1024 ** 2:9.1f} MiB")
+        results.append(result)
+    metadata = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'seed': SEED,
+        'repeats': repeats,
+        'min_time': min_time,
+    }
+    return {'metadata': metadata, 'results': results}
+
+
+def merge_runs(runs):
+    """
+    Combina varias ejecuciones completas de run_benchmarks en una sola, para grabar líneas base.
+
+    En una máquina compartida la velocidad cambia de un minuto a otro, así que el mínimo de
+    una sola ejecución puede salir de un intervalo especialmente rápido o lento. De cada caso
+    se toma el resultado de la ejecución con el tiempo mediano, y su ruido pasa a ser el mayor
+    entre el medido dentro de esa ejecución y la dispersión entre ejecuciones.
+
+    Parámetros:
+        runs (list of dict): Salidas de run_benchmarks con los mismos casos.
+
+    Devuelve:
+        dict: Salida con el formato de run_benchmarks.
+    """
+
+    results = []
+    for case_results in zip(*(run['results'] for run in runs)):
+        ordered = sorted(case_results, key=lambda result: result['seconds'])
+        median = dict(ordered[len(ordered) // 2])
+        spread = median['seconds'] / ordered[0]['seconds'] - 1 if ordered[0]['seconds'] > 0 else 0.0
+        median['noise'] = max(median['noise'], spread)
+        results.append(median)
+    metadata = dict(runs[-1]['metadata'], runs=len(runs))
+    return {'metadata': metadata, 'results': results}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, absolute_floor=DEFAULT_ABSOLUTE_FLOOR):
+    """
+    Compara unos resultados con una línea base guardada.
+
+    Un caso es una regresión solo si empeora por encima de su tolerancia relativa y además
+    en más de absolute_floor segundos, para que el ruido de los casos de milisegundos no haga
+    fallar la comparación. La tolerancia relativa de cada caso es threshold o, si es mayor,
+    NOISE_FACTOR veces el ruido medido en la línea base, con un máximo de MAX_NOISE_FACTOR
+    veces threshold. Solo cuenta el ruido de la línea base: si contara el de la ejecución
+    actual, una regresión que además añade variabilidad ampliaría su propia tolerancia.
+
+    Parámetros:
+        results (dict): Salida de run_benchmarks.
+        baseline (dict): Salida de run_benchmarks guardada previamente.
+        threshold (float): Empeoramiento relativo tolerado en tiempo (0.25 = 25% más lento).
+        absolute_floor (float): Empeoramiento en segundos por debajo del cual nunca hay regresión.
+
+    Devuelve:
+        list of dict: Una fila por caso común con 'id', 'baseline', 'current', 'ratio', 'tolerance' y 'regression'.
+    """
+
+    reference = {result['id']: result for result in baseline['results']}
+    rows = []
+    for result in results['results']:
+        if result['id'] not in reference:
+            continue
+        previous = reference[result['id']]
+        ratio = result['seconds'] / previous['seconds']
+        noise_allowance = min(NOISE_FACTOR * previous.get('noise', 0.0), MAX_NOISE_FACTOR * threshold)
+        tolerance = max(threshold, noise_allowance)
+        regression = ratio > 1 + tolerance and result['seconds'] - previous['seconds'] > absolute_floor
+        rows.append({'id': result['id'], 'baseline': previous['seconds'], 'current': result['seconds'],
+                     'ratio': ratio, 'tolerance': tolerance, 'regression': regression})
+    return rows
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m benchmarks.run_benchmarks [--baseline benchmarks/baseline.json].
+
+    La línea base guardada en el repositorio se regenera con --runs 3 --output benchmarks/baseline.json.
+    """
+
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento de los núcleos de valoración y simulación.")
+    parser.add_argument('--output', default='benchmarks/results.json', help="Fichero JSON donde guardar los resultados")
+    parser.add_argument('--baseline', help="Fichero JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento relativo tolerado antes de fallar (0.25 = 25%%)")
+    parser.add_argument('--absolute-floor', type=float, default=DEFAULT_ABSOLUTE_FLOOR,
+                        help="Empeoramiento en segundos por debajo del cual no se considera regresión")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Repeticiones cronometradas por caso")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help="Duración mínima en segundos de cada repetición; los casos rápidos se repiten en bucle")
+    parser.add_argument('--runs', type=int, default=1,
+                        help="Ejecuciones completas que se combinan con merge_runs (recomendado 3 al grabar la línea base)")
+    parser.add_argument('-k', '--select', action='append', help="Ejecuta solo los casos cuyo identificador contiene este texto")
+    args = parser.parse_args(argv)
+
+    runs = [run_benchmarks(args.select, args.repeats, min_time=args.min_time) for _ in range(max(args.runs, 1))]
+    results = merge_runs(runs) if len(runs) > 1 else runs[0]
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold, args.absolute_floor)
+        for row in rows:
+            status = 'REGRESIÓN' if row['regression'] else 'ok'
+            print(f"{row['id']:<70} {row['baseline'] * 1e3:10.2f} ms -> {row['current'] * 1e3:10.2f} ms "
+                  f"(x{row['ratio']:.2f}, tolerancia {row['tolerance']:.0%}) {status}")
+        regressions = [row for row in rows if row['regression']]
+        if regressions:
+            print(f"{len(regressions)} casos empeoran más de su tolerancia respecto a {args.baseline}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
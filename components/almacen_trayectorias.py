@@ -0,0 +1,172 @@
+import contextlib
+import os
+import time
+
+import diskcache
+import numpy as np
+import psutil
+
+from components.cache import stable_key
+from components.funciones import DEFAULT_CHUNK_SIZE, simulate_gbm
+
+
+STORE_DIR = os.environ.get('TFG_PATH_STORE_DIR', os.path.join('.', 'cache', 'trayectorias'))
+DEFAULT_MAX_BYTES = int(os.environ.get('TFG_PATH_STORE_MAX_BYTES', 2 * 1024 ** 3))
+
+_index = None
+
+
+def _get_index():
+    """
+    Índice compartido entre procesos: clave -> metadatos (bytes, último acceso y referencias por pid).
+
+    Se guarda en un diskcache.Cache (SQLite), así que las transacciones son atómicas entre
+    todos los workers que comparten STORE_DIR.
+    """
+
+    global _index
+    if _index is None:
+        os.makedirs(STORE_DIR, exist_ok=True)
+        _index = diskcache.Cache(os.path.join(STORE_DIR, 'index'))
+    return _index
+
+
+def _path(key):
+    return os.path.join(STORE_DIR, f'{key}.npy')
+
+
+def _live_references(entry):
+    """
+    Referencias de procesos que siguen vivos; las de workers caídos se descartan.
+    """
+
+    return {pid: count for pid, count in entry['refs'].items() if count > 0 and psutil.pid_exists(pid)}
+
+
+def _evict(index, max_bytes):
+    """
+    Borra los conjuntos de trayectorias sin referencias, del menos usado al más usado, hasta respetar max_bytes.
+
+    Debe llamarse dentro de una transacción del índice.
+    """
+
+    entries = {key: index[key] for key in list(index)}
+    total = sum(entry['bytes'] for entry in entries.values())
+    for key, entry in sorted(entries.items(), key=lambda item: item[1]['last_access']):
+        if total <= max_bytes:
+            break
+        if _live_references(entry):
+            continue
+        del index[key]
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(_path(key))
+        total -= entry['bytes']
+
+
+def _acquire(index, key):
+    entry = index.get(key)
+    if entry is None or not os.path.exists(_path(key)):
+        return False
+    pid = os.getpid()
+    entry['refs'] = _live_references(entry)
+    entry['refs'][pid] = entry['refs'].get(pid, 0) + 1
+    entry['last_access'] = time.time()
+    index[key] = entry
+    return True
+
+
+def release(key):
+    """
+    Libera una referencia de este proceso a un conjunto de trayectorias.
+    """
+
+    index = _get_index()
+    with index.transact():
+        entry = index.get(key)
+        if entry is None:
+            return
+        pid = os.getpid()
+        entry['refs'][pid] = max(entry['refs'].get(pid, 0) - 1, 0)
+        index[key] = entry
+
+
+def load_or_create(name, params, shape, dtype, fill, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Devuelve un array de solo lectura mapeado en memoria desde el almacén, creándolo si no existe.
+
+    Si otro worker ya generó el conjunto con los mismos parámetros, se adjunta sin copia con
+    np.load(mmap_mode='r') y todas sus páginas se comparten a través de la caché del sistema
+    operativo. Si no, fill escribe directamente en un fichero mapeado temporal que después se
+    publica con un renombrado atómico. Cada llamada suma una referencia que hay que liberar con
+    release (o usar attached_paths); solo se expulsan conjuntos sin referencias.
+
+    Parámetros:
+        name (str): Nombre de la función que genera los datos.
+        params (dict): Parámetros que determinan el resultado (incluida la semilla).
+        shape (tuple of int): Forma del array.
+        dtype (numpy.dtype): Tipo de los datos.
+        fill (callable): Función que recibe el array escribible y lo rellena.
+        max_bytes (int): Tamaño máximo del almacén.
+
+    Devuelve:
+        tuple: (array de solo lectura, clave del conjunto).
+    """
+
+    key = stable_key(name, params, tuple(shape), np.dtype(dtype))
+    index = _get_index()
+    with index.transact():
+        if _acquire(index, key):
+            return np.load(_path(key), mmap_mode='r'), key
+
+    temporary = os.path.join(STORE_DIR, f'{key}.{os.getpid()}.tmp.npy')
+    out = np.lib.format.open_memmap(temporary, mode='w+', dtype=dtype, shape=tuple(shape))
+    try:
+        fill(out)
+        out.flush()
+    except BaseException:
+        del out
+        os.remove(temporary)
+        raise
+    del out
+
+    with index.transact():
+        if _acquire(index, key):
+            # Otro worker ha publicado el mismo conjunto mientras tanto
+            os.remove(temporary)
+        else:
+            os.replace(temporary, _path(key))
+            index[key] = {'bytes': os.path.getsize(_path(key)), 'last_access': time.time(), 'refs': {os.getpid(): 1}}
+            _evict(index, max_bytes)
+    return np.load(_path(key), mmap_mode='r'), key
+
+
+@contextlib.contextmanager
+def attached_paths(name, params, shape, dtype, fill, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Igual que load_or_create, pero libera la referencia al salir del bloque with.
+    """
+
+    array, key = load_or_create(name, params, shape, dtype, fill, max_bytes)
+    try:
+        yield array
+    finally:
+        release(key)
+
+
+def shared_simulate_gbm(S0, r, sigma, T, M, I, seed, dtype=np.float64, **kwargs):
+    """
+    simulate_gbm respaldado por el almacén compartido: la matriz (M + 1, I) se escribe una vez en disco
+    y cualquier worker la adjunta después sin volver a simular.
+
+    Parámetros:
+        S0, r, sigma, T, M, I, seed, dtype: Igual que en simulate_gbm (la semilla es obligatoria).
+        **kwargs: Argumentos de ejecución de simulate_gbm (workers, chunk_size, progress_callback...).
+
+    Devuelve:
+        tuple: (trayectorias de solo lectura, clave del conjunto para release).
+    """
+
+    params = {'S0': S0, 'r': r, 'sigma': sigma, 'T': T, 'M': M, 'I': I, 'seed': seed,
+              'chunk_size': kwargs.get('chunk_size', DEFAULT_CHUNK_SIZE)}
+    return load_or_create('simulate_gbm', params, (M + 1, I), dtype,
+                          lambda out: simulate_gbm(S0, r, sigma, T, M, I, seed=seed, out=out, **kwargs))
@@ -1,9 +1,41 @@
 from dash import html, dcc, callback, Input, Output, State
-import pandas as pd
 import numpy as np
-import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime
-from components.funciones import function_option_price
+from components.funciones import option_greeks
+
+MEASURE_LABELS = {
+    'price': 'Valor de la Opción',
+    'delta': 'Delta',
+    'gamma': 'Gamma',
+    'vega': 'Vega',
+    'theta': 'Theta',
+    'rho': 'Rho',
+}
+SWEEP_AXES = {
+    'spot': 'Precio del activo subyacente',
+    'strike': 'Precio de ejercicio',
+    'rate': 'Tasa de interés (%)',
+    'volatility': 'Volatilidad (%)',
+    'time': 'Tiempo hasta el vencimiento (años)',
+}
+# Las tasas y volatilidades se muestran en porcentaje y se evalúan en tanto por uno
+AXIS_SCALE = {'spot': 1.0, 'strike': 1.0, 'rate': 0.01, 'volatility': 0.01, 'time': 1.0}
+DEFAULT_RESOLUTION = 100
+MAX_RESOLUTION = 500
+
+
+def _axis_controls(axis, label, default_axis, allow_none=False):
+    options = [{'label': 'Ninguno', 'value': 'none'}] if allow_none else []
+    options += [{'label': name, 'value': value} for value, name in SWEEP_AXES.items()]
+    return html.Div(className="input-group", children=[
+        html.Label(label, className="input-label"),
+        dcc.Dropdown(id=f'sens-axis-{axis}', options=options, value=default_axis, className="dropdown"),
+        dcc.Input(id=f'sens-{axis}-min', type='number', placeholder='Mínimo (por defecto según el eje)', className="input-field"),
+        dcc.Input(id=f'sens-{axis}-max', type='number', placeholder='Máximo (por defecto según el eje)', className="input-field"),
+        dcc.Input(id=f'sens-{axis}-points', type='number', value=DEFAULT_RESOLUTION, min=2, max=MAX_RESOLUTION, step=1,
+                  placeholder='Número de puntos', className="input-field"),
+    ])
 
 layout = html.Div([
     html.H1("Análisis de Sensibilidad", className="text-center title"),
@@ -45,12 +77,89 @@ layout = html.Div([
                 className="dropdown"
             ),
         ]),
+        html.Div(className="input-group", children=[
+            html.Label('Magnitud a representar:', className="input-label"),
+            dcc.Dropdown(
+                id='sens-measure',
+                options=[{'label': label, 'value': value} for value, label in MEASURE_LABELS.items()],
+                value='price',
+                className="dropdown"
+            ),
+        ]),
+        _axis_controls('x', 'Eje horizontal (mínimo, máximo y puntos):', 'spot'),
+        _axis_controls('y', 'Segundo eje opcional (mínimo, máximo y puntos):', 'none', allow_none=True),
+        html.Div(className="input-group", children=[
+            html.Label('Representación con dos ejes:', className="input-label"),
+            dcc.RadioItems(
+                id='sens-chart-type',
+                options=[
+                    {'label': ' Mapa de calor', 'value': 'heatmap'},
+                    {'label': ' Superficie 3D', 'value': 'surface'}
+                ],
+                value='heatmap',
+                inline=True
+            ),
+        ]),
         html.Button('Analizar Sensibilidad', id='sens-button-analyze', n_clicks=0, className="calculate-button"),
     ]),
     dcc.Graph(id='sens-analysis-graph', className="output-container"),
     html.Div(id='sens-analysis-conclusion', className="output-container")
 ], className="container")
 
+def default_range(axis, base):
+    """
+    Rango por defecto de un eje alrededor de su valor base, en las unidades mostradas en la página.
+
+    Parámetros:
+        axis (str): Clave de SWEEP_AXES.
+        base (float): Valor base del parámetro en unidades de la página.
+
+    Devuelve:
+        tuple of float: (mínimo, máximo).
+    """
+
+    if axis == 'rate':
+        return 0.0, max(2 * base, 1.0)
+    if axis == 'volatility':
+        return max(0.25 * base, 1.0), 2 * base
+    if axis == 'time':
+        return base / 20, 2 * base
+    return 0.5 * base, 1.5 * base
+
+
+def evaluate_sweep(base, option_type, x_axis, x_values, y_axis=None, y_values=None):
+    """
+    Evalúa el precio y todas las griegas sobre una malla de uno o dos ejes con un único broadcasting.
+
+    Parámetros:
+        base (dict): Valores base en tanto por uno de 'spot', 'strike', 'rate', 'volatility' y 'time'.
+        option_type (str): 'call' o 'put'.
+        x_axis (str): Parámetro que varía a lo largo de las columnas.
+        x_values (numpy.ndarray): Valores del eje horizontal en tanto por uno.
+        y_axis (str, opcional): Parámetro que varía a lo largo de las filas.
+        y_values (numpy.ndarray, opcional): Valores del segundo eje en tanto por uno.
+
+    Devuelve:
+        dict: Matrices (filas, columnas) de MEASURE_LABELS; una sola fila si no hay segundo eje.
+    """
+
+    params = dict(base)
+    params[x_axis] = np.asarray(x_values, dtype=float)[np.newaxis, :]
+    if y_axis is not None:
+        params[y_axis] = np.asarray(y_values, dtype=float)[:, np.newaxis]
+    # Pasa por la caché de valoración: cambiar solo la magnitud o el tipo de gráfico reutiliza la malla
+    values = option_greeks(params['spot'], params['strike'], params['rate'], params['time'], params['volatility'], option_type)
+    shape = (1 if y_axis is None else len(y_values), len(x_values))
+    return {measure: np.broadcast_to(values[measure], shape) for measure in MEASURE_LABELS}
+
+
+def _axis_values(axis, base, minimum, maximum, points):
+    lower, upper = default_range(axis, base)
+    lower = lower if minimum is None else minimum
+    upper = upper if maximum is None else maximum
+    return np.linspace(lower, upper, int(points))
+
+
 @callback(
     [Output('sens-analysis-graph', 'figure'),
      Output('sens-analysis-conclusion', 'children'),
@@ -62,10 +171,22 @@ layout = html.Div([
     State('sens-volatility', 'value'),
     State('sens-date-value', 'date'),
     State('sens-date-expiration', 'date'),
-    State('sens-option-type', 'value')
+    State('sens-option-type', 'value'),
+    State('sens-measure', 'value'),
+    State('sens-axis-x', 'value'),
+    State('sens-x-min', 'value'),
+    State('sens-x-max', 'value'),
+    State('sens-x-points', 'value'),
+    State('sens-axis-y', 'value'),
+    State('sens-y-min', 'value'),
+    State('sens-y-max', 'value'),
+    State('sens-y-points', 'value'),
+    State('sens-chart-type', 'value')
 )
 
-def analyze_sensitivity(n_clicks, spot, strike, rate, volatility, date_value, date_expiration, option_type):
+def analyze_sensitivity(n_clicks, spot, strike, rate, volatility, date_value, date_expiration, option_type, measure='price',
+                        x_axis='spot', x_min=None, x_max=None, x_points=DEFAULT_RESOLUTION, y_axis='none', y_min=None,
+                        y_max=None, y_points=DEFAULT_RESOLUTION, chart_type='heatmap'):
     if n_clicks > 0:
         missing_fields = []
         if spot is None:
@@ -84,7 +205,7 @@ def analyze_sensitivity(n_clicks, spot, strike, rate, volatility, date_value, da
                 html.H4("Error de entrada:", style={'color': 'red'}),
                 html.P("Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields), style={'color': 'red'})
             ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-            return px.line(), html.Div(), error_message
+            return go.Figure(), html.Div(), error_message
 
         date_value = datetime.strptime(date_value, '%Y-%m-%d')
         date_expiration = datetime.strptime(date_expiration, '%Y-%m-%d')
@@ -93,26 +214,58 @@ def analyze_sensitivity(n_clicks, spot, strike, rate, volatility, date_value, da
                 html.H4("Error de Fecha:", style={'color': 'red'}),
                 html.P("La fecha de vencimiento debe ser posterior a la fecha actual.", style={'color': 'red'})
             ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-            return px.line(), html.Div(), error_message
+            return go.Figure(), html.Div(), error_message
 
         T = (date_expiration - date_value).days / 365.25
-        rate = rate / 100
-        volatility = volatility / 100
+        x_axis = x_axis or 'spot'
+        y_axis = None if y_axis in (None, 'none', x_axis) else y_axis
+        resolutions = [x_points] + ([y_points] if y_axis else [])
+        if any(points is None or not 2 <= points <= MAX_RESOLUTION for points in resolutions):
+            error_message = html.Div([
+                html.H4("Error de resolución:", style={'color': 'red'}),
+                html.P(f"El número de puntos de cada eje debe estar entre 2 y {MAX_RESOLUTION}.", style={'color': 'red'})
+            ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+            return go.Figure(), html.Div(), error_message
+
+        display_base = {'spot': spot, 'strike': strike, 'rate': rate, 'volatility': volatility, 'time': T}
+        base = {name: value * AXIS_SCALE[name] for name, value in display_base.items()}
+        x_display = _axis_values(x_axis, display_base[x_axis], x_min, x_max, x_points)
+        y_display = _axis_values(y_axis, display_base[y_axis], y_min, y_max, y_points) if y_axis else None
+
+        sweep = evaluate_sweep(base, option_type, x_axis, x_display * AXIS_SCALE[x_axis], y_axis,
+                               None if y_axis is None else y_display * AXIS_SCALE[y_axis])
 
-        spot_prices = np.linspace(spot * 0.5, spot * 1.5, 20)
-        prices = [function_option_price(s, strike, rate, T, volatility, option_type) for s in spot_prices]
+        measure = measure or 'price'
+        label = MEASURE_LABELS[measure]
+        values = sweep[measure]
+        x_label = SWEEP_AXES[x_axis]
 
-        df = pd.DataFrame({'Precio del Activo Subyacente': spot_prices, 'Valor de la Opción': prices})
-        fig = px.line(df, x='Precio del Activo Subyacente', y='Valor de la Opción', title='Sensibilidad del Precio de la Opción respecto al precio del activo subyacente')
+        if y_axis is None:
+            title = (f'Sensibilidad del Precio de la Opción respecto a {x_label.lower()}' if measure == 'price'
+                     else f'{label} de la Opción respecto a {x_label.lower()}')
+            fig = go.Figure(go.Scatter(x=x_display, y=values[0], mode='lines'))
+            fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=label)
+            description = x_label.lower()
+        else:
+            y_label = SWEEP_AXES[y_axis]
+            if chart_type == 'surface':
+                fig = go.Figure(go.Surface(x=x_display, y=y_display, z=values, colorscale='Viridis', colorbar=dict(title=label)))
+                fig.update_layout(scene=dict(xaxis_title=x_label, yaxis_title=y_label, zaxis_title=label))
+            else:
+                fig = go.Figure(go.Heatmap(x=x_display, y=y_display, z=values, colorscale='Viridis', colorbar=dict(title=label)))
+                fig.update_layout(xaxis_title=x_label, yaxis_title=y_label)
+            fig.update_layout(title=f'{label} de la Opción respecto a {x_label.lower()} y {y_label.lower()}')
+            description = f"{x_label.lower()} y {y_label.lower()}"
 
         conclusion = html.Div([
             html.H4("Conclusión del Análisis de Sensibilidad:"),
-            html.P("Este análisis muestra cómo varía el precio de la opción respecto a cambios en el precio al contado del subyacente."),
-            html.P(f"El rango de precios de la opción analizado va desde {min(prices):.2f} hasta {max(prices):.2f}."),
+            html.P(f"Este análisis muestra cómo varía {'el precio' if measure == 'price' else 'la ' + label.lower()} de la opción respecto a cambios en {description}."),
+            html.P(f"El rango de valores analizado va desde {values.min():.4f} hasta {values.max():.4f} "
+                   f"sobre {values.size} puntos."),
             html.P("Comprender esta sensibilidad permite a los inversores anticipar cómo cambios en el mercado subyacente afectarán el valor de sus opciones, "
                    "lo cual es crucial para la gestión de riesgos y la toma de decisiones estratégicas.")
         ])
 
         return fig, conclusion, html.Div()  
 
-    return px.line(), html.Div(), html.Div()
\ No newline at end of file
+    return go.Figure(), html.Div(), html.Div()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import numpy as np
+from components.cache import memoize_pricing
+from components.funciones import batch_option_price
+
+LATTICE_METHODS = ('binomial', 'trinomial')
+DEFAULT_STEPS = 1000
+
+
+def _check_inputs(option_type, steps):
+    if option_type not in ('call', 'put'):
+        raise ValueError(f"Tipo de opción desconocido: {option_type}")
+    if steps < 2:
+        raise ValueError("El árbol necesita al menos 2 pasos.")
+
+
+def _exercise(values, spots, K, w, buffer):
+    """
+    Aplica en el sitio el ejercicio anticipado: values = max(values, w * (spots - K)).
+    """
+
+    np.subtract(spots, K, out=buffer)
+    buffer *= w
+    np.maximum(values, buffer, out=values)
+
+
+def binomial_price(S, K, r, T, sigma, option_type, steps=DEFAULT_STEPS, american=True, smoothing=True):
+    """
+    Valora una opción europea o americana con el árbol binomial de Cox-Ross-Rubinstein.
+
+    La inducción hacia atrás reutiliza un único array de N + 1 valores (más dos auxiliares
+    del mismo tamaño), así que la memoria es O(N) en lugar de O(N²). Con smoothing, el
+    último paso se sustituye por el precio Black-Scholes (método BBS), lo que elimina la
+    oscilación par/impar del árbol y permite aplicar extrapolación de Richardson.
+
+    Parámetros:
+        S (float): Precio actual del activo subyacente.
+        K (float): Precio de ejercicio de la opción.
+        r (float): Tasa de interés libre de riesgo (anual).
+        T (float): Tiempo hasta el vencimiento (en años).
+        sigma (float): Volatilidad del activo.
+        option_type (str): 'call' o 'put'.
+        steps (int): Número de pasos del árbol.
+        american (bool): Si es True, permite el ejercicio anticipado en cada nodo.
+        smoothing (bool): Si es True, usa Black-Scholes en el último paso.
+
+    Devuelve:
+        float: Precio de la opción.
+    """
+
+    _check_inputs(option_type, steps)
+    w = 1.0 if option_type == 'call' else -1.0
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1 / u
+    discount = np.exp(-r * dt)
+    p_up = discount * (np.exp(r * dt) - d) / (u - d)
+    p_down = discount - p_up
+
+    # Nodos del paso N - 1 (con suavizado) o del vencimiento, del más alto al más bajo
+    last = steps - 1 if smoothing else steps
+    spots = S * u ** (last - 2.0 * np.arange(last + 1))
+    if smoothing:
+        # Sin caché: el resultado se modifica en el sitio durante la inducción
+        values = batch_option_price.__wrapped__(spots, K, r, dt, sigma, option_type)
+    else:
+        values = np.maximum(w * (spots - K), 0.0)
+    buffer = np.empty_like(values)
+    if american:
+        _exercise(values, spots, K, w, buffer)
+
+    for n in range(last, 0, -1):
+        # values[:n] = p_up * values[:n] + p_down * values[1:n + 1], sin arrays temporales
+        np.multiply(values[1:n + 1], p_down, out=buffer[:n])
+        values[:n] *= p_up
+        values[:n] += buffer[:n]
+        if american:
+            spots[:n] *= d
+            _exercise(values[:n], spots[:n], K, w, buffer[:n])
+    return float(values[0])
+
+
+def trinomial_price(S, K, r, T, sigma, option_type, steps=DEFAULT_STEPS, american=True, smoothing=True):
+    """
+    Valora una opción europea o americana con un árbol trinomial en logaritmo del precio.
+
+    El espaciado es dx = sigma * sqrt(3 dt) y las probabilidades igualan la media y la varianza
+    del logaritmo del precio. Como en binomial_price, la inducción hacia atrás trabaja sobre un
+    único array de 2N + 1 valores (más dos auxiliares) y los precios de cada paso son una ventana del array final.
+
+    Parámetros:
+        S, K, r, T, sigma, option_type, steps, american, smoothing: Igual que en binomial_price.
+
+    Devuelve:
+        float: Precio de la opción.
+    """
+
+    _check_inputs(option_type, steps)
+    w = 1.0 if option_type == 'call' else -1.0
+    dt = T / steps
+    dx = sigma * np.sqrt(3 * dt)
+    nu = r - 0.5 * sigma ** 2
+    discount = np.exp(-r * dt)
+    second_moment = (sigma ** 2 * dt + nu ** 2 * dt ** 2) / dx ** 2
+    p_up = discount * 0.5 * (second_moment + nu * dt / dx)
+    p_down = discount * 0.5 * (second_moment - nu * dt / dx)
+    p_middle = discount - p_up - p_down
+
+    last = steps - 1 if smoothing else steps
+    # Nodo (n, j) = S * exp((n - j) dx) = spots[last - n + j]
+    spots = S * np.exp((last - np.arange(2 * last + 1)) * dx)
+    if smoothing:
+        # Sin caché: el resultado se modifica en el sitio durante la inducción
+        values = batch_option_price.__wrapped__(spots, K, r, dt, sigma, option_type)
+    else:
+        values = np.maximum(w * (spots - K), 0.0)
+    buffer = np.empty_like(values)
+    down = np.empty_like(values)
+    if american:
+        _exercise(values, spots, K, w, buffer)
+
+    for n in range(last - 1, -1, -1):
+        # Los hijos medio y bajo se leen antes de sobrescribir values[:size]
+        size = 2 * n + 1
+        np.multiply(values[1:size + 1], p_middle, out=buffer[:size])
+        np.multiply(values[2:size + 2], p_down, out=down[:size])
+        values[:size] *= p_up
+        values[:size] += buffer[:size]
+        values[:size] += down[:size]
+        if american:
+            window = spots[last - n:last - n + size]
+            _exercise(values[:size], window, K, w, buffer[:size])
+    return float(values[0])
+
+
+@memoize_pricing()
+def lattice_price(S, K, r, T, sigma, option_type, method='binomial', steps=DEFAULT_STEPS, american=True, richardson=True):
+    """
+    Valora una opción con el árbol elegido y, opcionalmente, extrapolación de Richardson.
+
+    Con el suavizado Black-Scholes el error del árbol es aproximadamente proporcional a 1/N,
+    por lo que 2 * P(N) - P(N/2) cancela el término principal: con N pasos se obtiene la
+    precisión que el árbol simple solo alcanza con muchos más.
+
+    Parámetros:
+        S, K, r, T, sigma, option_type: Igual que en binomial_price.
+        method (str): 'binomial' (CRR) o 'trinomial'.
+        steps (int): Número de pasos del árbol fino.
+        american (bool): Si es True, valora la opción americana.
+        richardson (bool): Si es True, combina los árboles de N y N/2 pasos.
+
+    Devuelve:
+        float: Precio de la opción.
+    """
+
+    if method not in LATTICE_METHODS:
+        raise ValueError(f"Método de árbol desconocido: {method}")
+    if T <= 0 or sigma <= 0:
+        european = float(batch_option_price(S, K, r, T, sigma, option_type))
+        intrinsic = max((1.0 if option_type == 'call' else -1.0) * (S - K), 0.0)
+        return max(european, intrinsic) if american else european
+
+    pricer = binomial_price if method == 'binomial' else trinomial_price
+    if not richardson:
+        return pricer(S, K, r, T, sigma, option_type, steps, american)
+    half = max(steps // 2, 2)
+    fine = pricer(S, K, r, T, sigma, option_type, 2 * half, american)
+    coarse = pricer(S, K, r, T, sigma, option_type, half, american)
+    return 2 * fine - coarse
@@ -0,0 +1,263 @@
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+DEFAULT_TTL = 15 * 60
+SIGNIFICANT_DIGITS = 12
+_SCALAR_TYPES = (float, int, str, type(None))
+
+_lock = threading.RLock()
+_entries = OrderedDict()
+_limits = {'max_entries': DEFAULT_MAX_ENTRIES, 'max_bytes': DEFAULT_MAX_BYTES, 'ttl': DEFAULT_TTL}
+_stats = {'hits': 0, 'misses': 0, 'bypasses': 0, 'evictions': 0, 'expirations': 0, 'bytes': 0}
+_function_stats = {}
+
+
+def configure_cache(max_entries=None, max_bytes=None, ttl=None):
+    """
+    Ajusta los límites de la caché de valoración compartida por todos los callbacks.
+
+    Parámetros:
+        max_entries (int, opcional): Número máximo de resultados guardados.
+        max_bytes (int, opcional): Tamaño máximo aproximado en bytes de los resultados guardados.
+        ttl (float, opcional): Segundos que un resultado sigue siendo válido.
+    """
+
+    with _lock:
+        for name, value in (('max_entries', max_entries), ('max_bytes', max_bytes), ('ttl', ttl)):
+            if value is not None:
+                _limits[name] = value
+        _evict()
+
+
+def clear_cache():
+    """
+    Vacía la caché y reinicia todos los contadores.
+    """
+
+    with _lock:
+        _entries.clear()
+        _function_stats.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def cache_stats():
+    """
+    Devuelve los contadores de la caché para poder dimensionarla.
+
+    Devuelve:
+        dict: Aciertos, fallos, llamadas no cacheables, expulsiones, expiraciones, número de
+        entradas, bytes ocupados, límites actuales y aciertos/fallos por función.
+    """
+
+    with _lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_entries)
+        stats.update(_limits)
+        stats['functions'] = {name: dict(counters) for name, counters in _function_stats.items()}
+        return stats
+
+
+def _normalize(value):
+    """
+    Convierte un argumento en una clave hashable y estable (100, 100.0 y np.float64(100) coinciden).
+    """
+
+    if value is None or isinstance(value, (bool, np.bool_, str)):
+        return value.item() if isinstance(value, np.bool_) else value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(f"{float(value):.{SIGNIFICANT_DIGITS}g}")
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return ('ndarray', value.shape, _normalize(value.tolist()))
+        digest = hashlib.blake2b(np.ascontiguousarray(value).view(np.uint8)).hexdigest()
+        return ('ndarray', value.dtype.str, value.shape, digest)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    if isinstance(value, np.random.SeedSequence):
+        return ('SeedSequence', value.entropy, value.spawn_key)
+    try:
+        return np.dtype(value).str
+    except TypeError:
+        return repr(value)
+
+
+def stable_key(*values):
+    """
+    Resume unos argumentos normalizados en una clave hexadecimal que es la misma en todos los procesos.
+
+    Devuelve:
+        str: Resumen blake2b de 32 caracteres.
+    """
+
+    return hashlib.blake2b(repr(_normalize(values)).encode(), digest_size=16).hexdigest()
+
+
+def _nbytes(value):
+    """
+    Estima la memoria ocupada por un resultado (arrays de NumPy y contenedores anidados).
+    """
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value) + sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values()) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """
+    Marca como de solo lectura los arrays de un resultado para que ningún llamante altere la copia cacheada.
+    """
+
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    return value
+
+
+def _copy_containers(value):
+    """
+    Copia listas, tuplas y diccionarios de un resultado cacheado sin duplicar los arrays.
+    """
+
+    if isinstance(value, list):
+        return [_copy_containers(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_containers(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    return value
+
+
+def _evict():
+    """
+    Elimina entradas desde el extremo menos usado: primero las caducadas que encuentre allí y,
+    después, las necesarias para respetar los límites.
+
+    No recorre toda la caché: las entradas caducadas que no estén en ese extremo se eliminan
+    cuando se consultan (ver _lookup), así que cada inserción cuesta O(1) amortizado.
+    """
+
+    now = time.monotonic()
+    while _entries:
+        key, (expires_at, nbytes, _) = next(iter(_entries.items()))
+        if expires_at <= now:
+            _stats['expirations'] += 1
+        elif len(_entries) > _limits['max_entries'] or _stats['bytes'] > _limits['max_bytes']:
+            _stats['evictions'] += 1
+        else:
+            break
+        del _entries[key]
+        _stats['bytes'] -= nbytes
+
+
+def _lookup(key):
+    """
+    Busca una entrada vigente; si ha caducado la elimina en ese momento.
+
+    Devuelve:
+        tuple o None: La entrada (caducidad, bytes, resultado) o None si no hay una vigente.
+    """
+
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del _entries[key]
+        _stats['bytes'] -= entry[1]
+        _stats['expirations'] += 1
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+def memoize_pricing(require_seed=False, ignore=()):
+    """
+    Decorador que memoriza los resultados de una función de valoración en la caché compartida.
+
+    Las claves se construyen con los argumentos normalizados (incluidos los valores por
+    defecto). Las llamadas que escriben en un buffer 'out' nunca se cachean, y con
+    require_seed=True solo se reutilizan resultados cuando se indica una semilla. Cuando
+    todos los argumentos se pasan por posición y son escalares de Python, la clave se
+    construye directamente sin signature.bind, que domina el coste de las llamadas escalares.
+
+    La caché vive en la memoria de cada proceso. Los callbacks en segundo plano de
+    DiskcacheManager se ejecutan en procesos hijos y no la aprovechan; por eso los cálculos
+    que se benefician de ella se hacen en callbacks normales.
+
+    Parámetros:
+        require_seed (bool): Si es True, las llamadas con seed=None se ejecutan sin caché.
+        ignore (tuple of str): Argumentos que no afectan al resultado y se excluyen de la clave.
+
+    Devuelve:
+        function: Decorador a aplicar sobre la función de valoración.
+    """
+
+    def decorator(function):
+        signature = inspect.signature(function)
+        name = f"{function.__module__}.{function.__qualname__}"
+        names = tuple(signature.parameters)
+        positional = all(parameter.kind == parameter.POSITIONAL_OR_KEYWORD for parameter in signature.parameters.values())
+
+        def arguments_of(args, kwargs):
+            if positional and not kwargs and len(args) == len(names) and all(type(value) in _SCALAR_TYPES for value in args):
+                return dict(zip(names, args))
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound.arguments
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            arguments = arguments_of(args, kwargs)
+            if arguments.get('out') is not None or (require_seed and arguments.get('seed') is None):
+                with _lock:
+                    _stats['bypasses'] += 1
+                return function(*args, **kwargs)
+
+            key = (name, tuple((arg, _normalize(value)) for arg, value in arguments.items() if arg not in ignore))
+            with _lock:
+                counters = _function_stats.setdefault(name, {'hits': 0, 'misses': 0})
+                entry = _lookup(key)
+                if entry is not None:
+                    _stats['hits'] += 1
+                    counters['hits'] += 1
+                    return _copy_containers(entry[2])
+                _stats['misses'] += 1
+                counters['misses'] += 1
+
+            result = function(*args, **kwargs)
+            nbytes = _nbytes(result)
+            if nbytes <= _limits['max_bytes']:
+                _freeze(result)
+                with _lock:
+                    if key in _entries:
+                        _stats['bytes'] -= _entries[key][1]
+                    _entries[key] = (time.monotonic() + _limits['ttl'], nbytes, result)
+                    _entries.move_to_end(key)
+                    _stats['bytes'] += nbytes
+                    _evict()
+            return _copy_containers(result)
+
+        return wrapper
+
+    return decorator
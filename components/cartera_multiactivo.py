@@ -0,0 +1,157 @@
+from dash import html, dcc, callback, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+from components.multiactivo import (simulate_portfolio, risk_measures, constant_correlation, parse_assets,
+                                    parse_correlation, parse_positions, DEFAULT_MEMORY_BUDGET)
+from components.graficos import fan_chart_figure, compact_figure
+from components.metricas import timed_background_job
+
+HISTOGRAM_BINS = 80
+FAN_SAMPLE_PATHS = 20
+
+layout = html.Div([
+    html.H1("Simulación de Carteras Multiactivo", className="text-center title"),
+    html.Div(className="input-container", children=[
+        html.Div(className="input-group", children=[
+            html.Label('Subyacentes (uno por línea: nombre, precio, volatilidad %):', className="input-label"),
+            dcc.Textarea(id='multi-assets', value='A, 100, 20\nB, 50, 30\nC, 200, 25', className="input-field",
+                         style={'width': '100%', 'height': '100px'}),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Correlación entre todos los pares:', className="input-label"),
+            dcc.Input(id='multi-correlation', type='number', value=0.3, min=-1, max=1, step=0.05, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Matriz de correlación (opcional, una fila por línea; sustituye a la anterior):', className="input-label"),
+            dcc.Textarea(id='multi-correlation-matrix', placeholder='1, 0.5, 0.2\n0.5, 1, 0.3\n0.2, 0.3, 1', className="input-field",
+                         style={'width': '100%', 'height': '100px'}),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Posiciones (una por línea: activo, tipo, ejercicio, vencimiento en años, cantidad):', className="input-label"),
+            dcc.Textarea(id='multi-positions', value='A, call, 105, 0.5, 10\nB, put, 45, 0.25, 20\nC, stock, 0, 0, 5',
+                         className="input-field", style={'width': '100%', 'height': '100px'}),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Tasa de interés (%):', className="input-label"),
+            dcc.Input(id='multi-rate', type='number', value=3, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Horizonte (días):', className="input-label"),
+            dcc.Input(id='multi-horizon', type='number', value=30, min=1, step=1, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Fechas de revaloración:', className="input-label"),
+            dcc.Input(id='multi-steps', type='number', value=10, min=1, max=365, step=1, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Número de simulaciones:', className="input-label"),
+            dcc.Input(id='multi-paths', type='number', value=10_000, min=100, step=1, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Semilla:', className="input-label"),
+            dcc.Input(id='multi-seed', type='number', value=42, min=0, step=1, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Nivel de confianza (%):', className="input-label"),
+            dcc.Input(id='multi-confidence', type='number', value=99, min=50, max=99.9, className="input-field"),
+        ]),
+        html.Div(id='multi-error-message', className="error-message-container"),
+        html.Button('Simular Cartera', id='multi-button-simulate', n_clicks=0, className="calculate-button"),
+        html.Button('Cancelar', id='multi-button-cancel', n_clicks=0, disabled=True, className="calculate-button"),
+        html.Progress(id='multi-progress', value='0', max='1', className="progress-bar-simulation", style={'visibility': 'hidden'})
+    ]),
+    dcc.Graph(id='multi-value-graph', className="output-container"),
+    dcc.Graph(id='multi-pnl-graph', className="output-container"),
+    html.Div(id='multi-summary', className="output-container")
+], className="container")
+
+
+def _error(title, message):
+    return html.Div([
+        html.H4(title, style={'color': 'red'}),
+        html.P(message, style={'color': 'red'})
+    ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+
+
+@callback(
+    [Output('multi-value-graph', 'figure'),
+     Output('multi-pnl-graph', 'figure'),
+     Output('multi-summary', 'children'),
+     Output('multi-error-message', 'children')],
+    Input('multi-button-simulate', 'n_clicks'),
+    State('multi-assets', 'value'),
+    State('multi-correlation', 'value'),
+    State('multi-correlation-matrix', 'value'),
+    State('multi-positions', 'value'),
+    State('multi-rate', 'value'),
+    State('multi-horizon', 'value'),
+    State('multi-steps', 'value'),
+    State('multi-paths', 'value'),
+    State('multi-seed', 'value'),
+    State('multi-confidence', 'value'),
+    background=True,
+    running=[
+        (Output('multi-button-simulate', 'disabled'), True, False),
+        (Output('multi-button-cancel', 'disabled'), False, True),
+        (Output('multi-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'}),
+    ],
+    cancel=[Input('multi-button-cancel', 'n_clicks')],
+    progress=[Output('multi-progress', 'value'), Output('multi-progress', 'max')],
+    prevent_initial_call=True
+)
+@timed_background_job
+def simulate_multi_asset_portfolio(set_progress, n_clicks, assets_text, rho, matrix_text, positions_text, rate, horizon_days,
+                                   steps, num_paths, seed, confidence):
+    missing_fields = []
+    if rate is None:
+        missing_fields.append("Tasa de interés")
+    if horizon_days is None:
+        missing_fields.append("Horizonte")
+    if steps is None:
+        missing_fields.append("Fechas de revaloración")
+    if num_paths is None:
+        missing_fields.append("Número de simulaciones")
+    if confidence is None:
+        missing_fields.append("Nivel de confianza")
+    if rho is None and not (matrix_text or '').strip():
+        missing_fields.append("Correlación")
+    if missing_fields:
+        return go.Figure(), go.Figure(), html.Div(), _error(
+            "Error de entrada:", "Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields))
+
+    horizon = horizon_days / 365
+    try:
+        names, spots, volatilities = parse_assets(assets_text)
+        if (matrix_text or '').strip():
+            correlation = parse_correlation(matrix_text, len(names))
+        else:
+            correlation = constant_correlation(len(names), rho)
+        positions = parse_positions(positions_text, names)
+        result = simulate_portfolio(spots, volatilities, correlation, rate / 100, positions, horizon, steps=int(steps),
+                                    paths=max(int(num_paths), 2), seed=seed,
+                                    progress_callback=lambda done, total: set_progress((str(done), str(total))))
+    except ValueError as e:
+        return go.Figure(), go.Figure(), html.Div(), _error("Error en la cartera:", str(e))
+
+    risk = risk_measures(result['pnl'], confidence / 100)
+
+    value_fig = fan_chart_figure(result['values'], x=result['times'] * 365, sample_size=FAN_SAMPLE_PATHS, seed=0,
+                                 overwrite_input=True, title='Valor simulado de la cartera',
+                                 xaxis_title='Días desde hoy', yaxis_title='Valor de la cartera')
+
+    counts, edges = np.histogram(result['pnl'], bins=HISTOGRAM_BINS)
+    pnl_fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name='Escenarios'))
+    pnl_fig.add_vline(x=-risk['var'], line_dash='dash', line_color='red',
+                      annotation_text=f"VaR {confidence:g}%: {risk['var']:.2f}")
+    pnl_fig.update_layout(title=f'Distribución de pérdidas y ganancias a {horizon_days:g} días',
+                          xaxis_title='P&L de la cartera', yaxis_title='Número de escenarios', showlegend=False)
+
+    summary = html.Div([
+        html.H4("Resultado de la Simulación:"),
+        html.P(f"{len(names)} subyacentes, {len(positions['asset'])} posiciones y {result['values'].shape[1]:,} trayectorias "
+               f"(bloques de {result['chunk_size']:,} trayectorias para no superar {DEFAULT_MEMORY_BUDGET / 1024 ** 2:.0f} MiB)."),
+        html.P(f"Valor actual de la cartera: {result['initial_value']:.2f}"),
+        html.P(f"P&L esperado: {risk['mean']:.2f} (desviación típica {risk['std']:.2f})"),
+        html.P(f"VaR al {confidence:g}%: {risk['var']:.2f} | Expected shortfall: {risk['expected_shortfall']:.2f}"),
+    ])
+    return compact_figure(value_fig), pnl_fig, summary, html.Div()
@@ -1,10 +1,18 @@
 from dash import html, dcc, callback, Input, Output, State
-import pandas as pd
 import numpy as np
 import plotly.graph_objs as go
 from datetime import datetime
 import dash
-from components.funciones import determine_optimal_strategy
+from components.estrategias import (STRATEGY_NAMES, SCENARIO_HORIZONS, build_strategy, determine_optimal_strategy,
+                                    evaluate_strategy, parse_legs, scenario_axes, scenario_scores)
+
+STRATEGY_COLORS = {
+    'Straddle': 'red',
+    'Strangle': 'green',
+    'Butterfly Spread': 'blue',
+    'Bull Spread': 'orange',
+    'Bear Spread': 'cyan'
+}
 
 layout = html.Div([
     html.H1("Comparación de Estrategias de Opciones", className="text-center title"),
@@ -45,15 +53,36 @@ layout = html.Div([
                 className="dropdown"
             ),
         ]),
+        html.Div(className="input-group", children=[
+            html.Label('Precio esperado del subyacente al vencimiento (opcional):', className="input-label"),
+            dcc.Input(id='comp-view-spot', type='number', placeholder='Por defecto, el precio actual', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Volatilidad realizada esperada (%) (opcional):', className="input-label"),
+            dcc.Input(id='comp-view-volatility', type='number', placeholder='Por defecto, la volatilidad actual', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Estrategia personalizada (una pata por línea: tipo, ejercicio, cantidad, vencimiento en años):', className="input-label"),
+            dcc.Textarea(id='comp-custom-legs', placeholder='call, 105, 1, 0.5\nput, 95, -1, 0.5', className="input-field",
+                         style={'width': '100%', 'height': '100px'}),
+        ]),
         html.Button('Comparar Estrategias', id='comp-button-compare', n_clicks=0, className="calculate-button"),
     ]),
     dcc.Graph(id='comp-strategy-comparison-graph', className="output-container"),
-    html.Div(id='comp-strategy-comparison-conclusion', className="output-container")
+    html.Div(id='comp-strategy-comparison-conclusion', className="output-container"),
+    dcc.Store(id='comp-scenario-spec'),
+    html.Div(className="input-container", children=[
+        html.Label('Horizonte del escenario (% del tiempo hasta el vencimiento):', className="input-label"),
+        dcc.Slider(id='comp-horizon', min=10, max=100, step=10, value=100,
+                   marks={v: f'{v}%' for v in range(10, 101, 10)}),
+    ]),
+    dcc.Graph(id='comp-scenario-heatmap', className="output-container")
 ], className= 'container')
 
 @callback(
     [Output('comp-strategy-comparison-graph', 'figure'),
-     Output('comp-strategy-comparison-conclusion', 'children')],
+     Output('comp-strategy-comparison-conclusion', 'children'),
+     Output('comp-scenario-spec', 'data')],
     [Input('comp-button-compare', 'n_clicks')],
     [State('comp-spot', 'value'),
      State('comp-strike', 'value'),
@@ -61,56 +90,118 @@ layout = html.Div([
      State('comp-volatility', 'value'),
      State('comp-date-value', 'date'),
      State('comp-date-expiration', 'date'),
-     State('comp-option-type', 'value')]
+     State('comp-option-type', 'value'),
+     State('comp-custom-legs', 'value'),
+     State('comp-view-spot', 'value'),
+     State('comp-view-volatility', 'value')]
 )
-def compare_strategies(n_clicks, spot, strike, rate, volatility, date_value, date_expiration, option_type):
+def compare_strategies(n_clicks, spot, strike, rate, volatility, date_value, date_expiration, option_type, custom_legs=None,
+                       view_spot=None, view_volatility=None):
     if n_clicks is None or n_clicks < 1:
-        return {}, "No se ha realizado ninguna comparación aún."
+        return {}, "No se ha realizado ninguna comparación aún.", None
+
+    if None in (spot, strike, rate, volatility, date_value, date_expiration):
+        return {}, "Todos los campos deben estar completos antes de comparar.", None
 
     date_value = datetime.strptime(date_value, '%Y-%m-%d')
     date_expiration = datetime.strptime(date_expiration, '%Y-%m-%d')
+    if date_expiration <= date_value:
+        return {}, "La fecha de vencimiento debe ser posterior a la fecha actual.", None
+
+    try:
+        custom = parse_legs(custom_legs)
+    except ValueError as e:
+        return {}, f"Error en la estrategia personalizada: {e}", None
+
+    view_spot = spot if view_spot is None else view_spot
+    view_volatility = volatility if view_volatility is None else view_volatility
+    optimal_strategy = determine_optimal_strategy(spot, strike, rate, volatility, date_value, date_expiration,
+                                                  view_spot=view_spot, view_volatility=view_volatility)
+
+    T = (date_expiration - date_value).days / 365.25
+    spot_grid = np.linspace(spot * 0.5, spot * 1.5, 400)
+    strategies = list(STRATEGY_NAMES)
+    colors = STRATEGY_COLORS
 
-    optimal_strategy = determine_optimal_strategy(spot, strike, rate, volatility, date_value, date_expiration, option_type)
-
-    strategies = ['Straddle', 'Strangle', 'Butterfly Spread', 'Bull Spread', 'Bear Spread']
-    
-    colors = {
-        'Straddle': 'red',
-        'Strangle': 'green',
-        'Butterfly Spread': 'blue',
-        'Bull Spread': 'orange',
-        'Bear Spread': 'cyan'
-    }
-    
     fig = go.Figure()
-    x_values = np.linspace(0, 200, 400)  
     for strategy in strategies:
-        y_values = np.sin(x_values / 50) * np.random.randint(50, 150) + (x_values / 100) * np.random.choice([-1, 1])
+        result = evaluate_strategy(build_strategy(strategy, strike, T), spot_grid, spot, rate / 100, volatility / 100)
         fig.add_trace(go.Scatter(
-            x=x_values,
-            y=y_values,
+            x=spot_grid,
+            y=result['pnl_expiry'],
             mode='lines',
             line=dict(color=colors[strategy], width=4 if strategy == optimal_strategy else 2),
             name=strategy
         ))
+        if strategy == optimal_strategy:
+            fig.add_trace(go.Scatter(x=spot_grid, y=result['pnl'], mode='lines',
+                                     line=dict(color=colors[strategy], width=2, dash='dash'),
+                                     name=f'{strategy} (valor actual)'))
+    if custom:
+        result = evaluate_strategy(custom, spot_grid, spot, rate / 100, volatility / 100)
+        fig.add_trace(go.Scatter(x=spot_grid, y=result['pnl_expiry'], mode='lines',
+                                 line=dict(color='black', width=3), name='Personalizada'))
+        fig.add_trace(go.Scatter(x=spot_grid, y=result['pnl'], mode='lines',
+                                 line=dict(color='black', width=2, dash='dash'), name='Personalizada (valor actual)'))
 
     fig.update_layout(
         title='Comparación de Estrategias de Opciones',
         xaxis_title='Precio del activo subyacente',
-        yaxis_title='Eje de rendimiento',
+        yaxis_title='Beneficio / pérdida al vencimiento (prima descontada)',
         template='plotly_white'
     )
 
     conclusion = (
         f"Como se observa en el gráfico, la estrategia '{optimal_strategy}' muestra un comportamiento destacado "
         f"bajo las condiciones actuales del mercado. Esta estrategia ha sido seleccionada como la mejor opción "
-        f"porque, en comparación con otras, ofrece un perfil de rendimiento más favorable en respuesta a "
-        f"los siguientes inputs: Precio del activo subyacente = {spot}, Precio de ejercicio = {strike}, "
+        f"porque es la que obtiene el mayor beneficio esperado por unidad de prima si al vencimiento el subyacente vale de media "
+        f"{view_spot} y la volatilidad realizada es del {view_volatility}% (el mapa inferior muestra la mejor estrategia en cada "
+        f"escenario) para los siguientes inputs: Precio del activo subyacente = {spot}, Precio de ejercicio = {strike}, "
         f"Tasa de interés = {rate}%, Volatilidad = {volatility}%, Fecha actual = {date_value.strftime('%Y-%m-%d')}, "
         f"Fecha de vencimiento = {date_expiration.strftime('%Y-%m-%d')}, y Tipo de opción = {option_type}. "
         f"El gráfico ilustra claramente cómo esta estrategia optimiza las ganancias o minimiza las pérdidas "
         f"en función del rango esperado de precios del activo."
     )
 
+    spec = {'spot': spot, 'strike': strike, 'rate': rate / 100, 'volatility': volatility / 100, 'expiry': T}
+    return fig, conclusion, spec
+
+
+@callback(
+    Output('comp-scenario-heatmap', 'figure'),
+    Input('comp-scenario-spec', 'data'),
+    Input('comp-horizon', 'value'),
+    prevent_initial_call=True
+)
+def update_scenario_heatmap(spec, horizon):
+    if not spec or horizon is None:
+        return {}
 
-    return fig, conclusion
\ No newline at end of file
+    view_spots, volatilities, horizons = scenario_axes(spec['spot'], spec['volatility'], spec['expiry'])
+    # La malla completa sale de la caché; mover el horizonte solo toma otro corte
+    index = int(np.clip(round(horizon / 100 * SCENARIO_HORIZONS) - 1, 0, SCENARIO_HORIZONS - 1))
+    t = horizons[index]
+    scores = scenario_scores(**spec)[:, index]
+    winner = scores.argmax(axis=0)
+    best = np.take_along_axis(scores, winner[np.newaxis], axis=0)[0]
+
+    n = len(STRATEGY_NAMES)
+    colorscale = []
+    for i, name in enumerate(STRATEGY_NAMES):
+        colorscale += [[i / n, STRATEGY_COLORS[name]], [(i + 1) / n, STRATEGY_COLORS[name]]]
+    names = np.array(STRATEGY_NAMES)[winner]
+
+    fig = go.Figure(go.Heatmap(
+        x=view_spots, y=volatilities * 100, z=winner, zmin=-0.5, zmax=n - 0.5, colorscale=colorscale,
+        customdata=np.dstack([names, np.round(best, 4)]),
+        hovertemplate='Precio esperado: %{x:.2f}<br>Volatilidad realizada: %{y:.1f}%<br>'
+                      'Mejor estrategia: %{customdata[0]}<br>P&L esperado por unidad de prima: %{customdata[1]}<extra></extra>',
+        colorbar=dict(tickvals=list(range(n)), ticktext=list(STRATEGY_NAMES), title='Estrategia')
+    ))
+    fig.update_layout(
+        title=f'Estrategia con mayor P&L esperado por unidad de prima a {t * 365.25:.0f} días',
+        xaxis_title='Precio esperado del subyacente en el horizonte',
+        yaxis_title='Volatilidad realizada (%)',
+        template='plotly_white'
+    )
+    return fig
\ No newline at end of file
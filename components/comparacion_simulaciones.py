@@ -2,7 +2,9 @@ from dash import dcc, html, Input, Output, State, callback, ALL
 import plotly.graph_objs as go
 import numpy as np
 from datetime import datetime
-from components.funciones import function_option_price
+from components.funciones import batch_option_price
+from components.graficos import compact_figure
+from components.modo_en_vivo import live_panel, register_live_panel
 
 
 
@@ -50,6 +52,7 @@ layout = html.Div([
         ], style={'textAlign': 'center', 'marginTop': '20px'}),
         html.Div(id='volatility_inputs', children=[]),
     ]),
+    live_panel('comp-sim'),
     dcc.Graph(id='option_prices_graph'),
     html.Div(id='conclusions', className='output-container')
 ], className="container")
@@ -71,10 +74,16 @@ def add_volatility_input(n_clicks, children):
     children.append(new_element)
     return children
 
+# En modo en vivo las curvas se recalculan en el navegador (sin desplazamiento visual) con cada deslizador
+register_live_panel('comp-sim', 'comparison_figure', 'spot_price', 'strike_price', 'interest_rate', None,
+                    'comp-date-value', 'comp-date-expiration', 'option_type',
+                    extra_inputs=[Input({'type': 'volatility_input', 'index': ALL}, 'value')])
+
 def apply_visual_offset(prices, index):
     """ Aplica un pequeño offset visual a los precios para evitar superposiciones en el gráfico. """
-    offset = index * 0.05 * max(prices) 
-    return [price + offset for price in prices]
+    prices = np.asarray(prices)
+    offset = index * 0.05 * np.max(prices)
+    return prices + offset
 
 
 @callback(
@@ -113,13 +122,13 @@ def update_graphs(n_clicks, volatilities, spot, strike, rate, val_date, exp_date
     fig = go.Figure()
     spot_prices = np.linspace(spot * 0.5, spot * 1.5, 100)
 
-    volatilities = [float(vol) / 100 for vol in volatilities if vol]  
-    for index, vol in enumerate(volatilities):
-        prices = [function_option_price(s, strike, rate, T, vol, opt_type) for s in spot_prices]
+    volatilities = np.array([float(vol) / 100 for vol in volatilities if vol])
+    price_grid = batch_option_price(spot_prices, strike, rate, T, volatilities[:, np.newaxis], opt_type)
+    for index, (vol, prices) in enumerate(zip(volatilities, price_grid)):
         adjusted_prices = apply_visual_offset(prices, index)
         fig.add_trace(go.Scatter(x=spot_prices, y=adjusted_prices, mode='lines', name=f'Vol: {vol * 100:.2f}%'))
 
     fig.update_layout(title='Valor de Opción por Precio del Activo Subyacente',
                       xaxis_title='Precio del Activo Subyacente',
                       yaxis_title='Valor de la Opción')
-    return fig, [], html.Div() 
\ No newline at end of file
+    return compact_figure(fig), [], html.Div()
\ No newline at end of file
@@ -0,0 +1,192 @@
+import numpy as np
+from scipy.linalg import solve_banded
+from components.cache import memoize_pricing
+
+FD_SCHEMES = {'explicit': 0.0, 'implicit': 1.0, 'crank-nicolson': 0.5}
+DEFAULT_SPACE_POINTS = 2000
+DEFAULT_TIME_STEPS = 2000
+RANNACHER_STEPS = 4
+
+
+def sinh_grid(K, s_max, points, concentration=0.1):
+    """
+    Construye una malla no uniforme en el precio que concentra los nodos alrededor del ejercicio.
+
+    Los nodos son S = K + c * sinh(xi) con xi uniforme, de modo que el espaciado es del orden
+    de c / points cerca de K y crece exponencialmente hacia los extremos.
+
+    Parámetros:
+        K (float): Precio de ejercicio, centro de la malla.
+        s_max (float): Precio máximo de la malla.
+        points (int): Número de intervalos (la malla tiene points + 1 nodos).
+        concentration (float): c / K; cuanto menor, más nodos cerca del ejercicio.
+
+    Devuelve:
+        numpy.ndarray: Nodos crecientes desde 0 hasta s_max.
+    """
+
+    c = concentration * K
+    xi = np.linspace(np.arcsinh(-K / c), np.arcsinh((s_max - K) / c), points + 1)
+    grid = K + c * np.sinh(xi)
+    grid[0], grid[-1] = 0.0, s_max
+    return grid
+
+
+def _operator(S, r, sigma):
+    """
+    Coeficientes tridiagonales del operador L V = sigma²/2 S² V_SS + r S V_S - r V en los nodos interiores.
+
+    Devuelve:
+        tuple of numpy.ndarray: (lower, diagonal, upper), uno por nodo interior.
+    """
+
+    h_minus = S[1:-1] - S[:-2]
+    h_plus = S[2:] - S[1:-1]
+    h_sum = h_minus + h_plus
+    diffusion = 0.5 * sigma ** 2 * S[1:-1] ** 2
+    drift = r * S[1:-1]
+    lower = (2 * diffusion - drift * h_plus) / (h_minus * h_sum)
+    upper = (2 * diffusion + drift * h_minus) / (h_plus * h_sum)
+    diagonal = -(2 * diffusion - drift * (h_plus - h_minus)) / (h_minus * h_plus) - r
+    return lower, diagonal, upper
+
+
+def _boundaries(S, K, r, tau, option_type, american):
+    """
+    Valores de Dirichlet en S = 0 y S = s_max para un tiempo hasta el vencimiento tau.
+    """
+
+    discounted_K = K if american else K * np.exp(-r * tau)
+    if option_type == 'call':
+        return 0.0, S[-1] - discounted_K
+    return discounted_K, 0.0
+
+
+def stable_time_steps(S, T, r, sigma):
+    """
+    Número mínimo de pasos de tiempo para que el esquema explícito sea estable en la malla S.
+
+    Devuelve:
+        int: Pasos necesarios para que dt * max|diagonal| <= 1.
+    """
+
+    _, diagonal, _ = _operator(S, r, sigma)
+    return int(np.ceil(T * np.abs(diagonal).max()))
+
+
+def explicit_time_steps(S0, K, r, T, sigma, space_points=DEFAULT_SPACE_POINTS):
+    """
+    Pasos de tiempo que necesita el esquema explícito en la malla que usaría fd_price.
+
+    Crecen con el cuadrado de los nodos de precio: con la malla por defecto son cientos de
+    miles, así que la página lo avisa antes de que se elija ese esquema.
+
+    Devuelve:
+        int: Pasos mínimos para que el esquema explícito sea estable.
+    """
+
+    S = sinh_grid(K, max(4 * K, 2 * S0), space_points)
+    return stable_time_steps(S, T, r, sigma)
+
+
+@memoize_pricing()
+def solve_black_scholes_pde(K, r, T, sigma, option_type, american=False, scheme='crank-nicolson',
+                            space_points=DEFAULT_SPACE_POINTS, time_steps=DEFAULT_TIME_STEPS, s_max=None, concentration=0.1):
+    """
+    Resuelve la EDP de Black-Scholes en diferencias finitas con un esquema theta sobre una malla no uniforme.
+
+    Cada paso resuelve un sistema tridiagonal con scipy.linalg.solve_banded (nunca se forman
+    matrices densas). Crank-Nicolson empieza con RANNACHER_STEPS medios pasos implícitos para
+    amortiguar las oscilaciones que produce el pico del pago en K. Para opciones americanas,
+    tras cada paso se proyecta la solución sobre el valor de ejercicio inmediato.
+
+    Parámetros:
+        K (float): Precio de ejercicio.
+        r (float): Tasa de interés libre de riesgo (anual).
+        T (float): Tiempo hasta el vencimiento (en años).
+        sigma (float): Volatilidad del activo.
+        option_type (str): 'call' o 'put'.
+        american (bool): Si es True, permite el ejercicio anticipado.
+        scheme (str): 'explicit', 'implicit' o 'crank-nicolson'.
+        space_points (int): Intervalos de la malla de precios.
+        time_steps (int): Pasos de tiempo.
+        s_max (float, opcional): Precio máximo de la malla; por defecto 4 * K.
+        concentration (float): Concentración de la malla alrededor de K (ver sinh_grid).
+
+    Devuelve:
+        dict: 'S' (nodos), 'tau' (tiempos hasta el vencimiento) y 'V', matriz (tiempos, nodos)
+        con el valor de la opción en toda la malla; la fila tau = T es la de hoy.
+    """
+
+    if scheme not in FD_SCHEMES:
+        raise ValueError(f"Esquema de diferencias finitas desconocido: {scheme}")
+    if option_type not in ('call', 'put'):
+        raise ValueError(f"Tipo de opción desconocido: {option_type}")
+
+    S = sinh_grid(K, s_max or 4 * K, space_points, concentration)
+    theta = FD_SCHEMES[scheme]
+    if theta == 0.0 and time_steps < stable_time_steps(S, T, r, sigma):
+        raise ValueError("El esquema explícito es inestable con esta malla: se necesitan al menos "
+                         f"{stable_time_steps(S, T, r, sigma)} pasos de tiempo.")
+
+    w = 1.0 if option_type == 'call' else -1.0
+    payoff = np.maximum(w * (S - K), 0.0)
+    lower, diagonal, upper = _operator(S, r, sigma)
+    tau = np.linspace(0.0, T, time_steps + 1)
+    V = np.empty((time_steps + 1, S.size))
+    V[0] = payoff
+
+    ab = np.empty((3, S.size - 2))
+    half_steps = RANNACHER_STEPS if theta == 0.5 else 0
+    schedule = [(1.0, 0.5)] * half_steps + [(theta, 1.0)] * (time_steps - half_steps // 2)
+    current = payoff.copy()
+    elapsed, row = 0.0, 1
+    for step_theta, fraction in schedule:
+        dt = fraction * (tau[1] - tau[0])
+        new_elapsed = elapsed + dt
+        new_low, new_high = _boundaries(S, K, r, new_elapsed, option_type, american)
+
+        # Parte explícita: (I + (1 - theta) dt L) V^n
+        rhs = current[1:-1].copy()
+        if step_theta < 1.0:
+            explicit = 1.0 - step_theta
+            rhs += explicit * dt * (lower * current[:-2] + diagonal * current[1:-1] + upper * current[2:])
+        rhs[0] += step_theta * dt * lower[0] * new_low
+        rhs[-1] += step_theta * dt * upper[-1] * new_high
+
+        if step_theta > 0.0:
+            ab[0, 1:] = -step_theta * dt * upper[:-1]
+            ab[1] = 1.0 - step_theta * dt * diagonal
+            ab[2, :-1] = -step_theta * dt * lower[1:]
+            interior = solve_banded((1, 1), ab, rhs, overwrite_b=True, check_finite=False)
+        else:
+            interior = rhs
+
+        current[0], current[1:-1], current[-1] = new_low, interior, new_high
+        if american:
+            np.maximum(current, payoff, out=current)
+        elapsed = new_elapsed
+        # Los medios pasos de Rannacher solo se guardan al completar un paso entero
+        if fraction == 1.0 or np.isclose(elapsed, tau[row]):
+            V[row] = current
+            row += 1
+    return {'S': S, 'tau': tau, 'V': V}
+
+
+def fd_price(S0, K, r, T, sigma, option_type, american=False, scheme='crank-nicolson',
+             space_points=DEFAULT_SPACE_POINTS, time_steps=DEFAULT_TIME_STEPS):
+    """
+    Precio, delta y gamma de hoy interpolados en S0 a partir de solve_black_scholes_pde.
+
+    Devuelve:
+        dict: 'price', 'delta' y 'gamma' en S0, además de la solución completa en 'grid'.
+    """
+
+    grid = solve_black_scholes_pde(K, r, T, sigma, option_type, american, scheme, space_points, time_steps,
+                                   s_max=max(4 * K, 2 * S0))
+    S, today = grid['S'], grid['V'][-1]
+    i = int(np.clip(np.searchsorted(S, S0) - 1, 1, S.size - 3))
+    # Interpolación cuadrática de Lagrange en los tres nodos que rodean S0
+    nodes, values = S[i:i + 3], today[i:i + 3]
+    coefficients = np.polyfit(nodes - S0, values, 2)
+    return {'price': coefficients[2], 'delta': coefficients[1], 'gamma': 2 * coefficients[0], 'grid': grid}
@@ -0,0 +1,290 @@
+import numpy as np
+from components.cache import memoize_pricing
+from components.funciones import batch_option_price
+
+STRATEGY_NAMES = ('Straddle', 'Strangle', 'Butterfly Spread', 'Bull Spread', 'Bear Spread')
+LEG_TYPES = ('call', 'put')
+SCENARIO_SPOTS = 41
+SCENARIO_VOLATILITIES = 31
+SCENARIO_HORIZONS = 10
+MIN_PREMIUM_FRACTION = 0.01
+
+
+def make_leg(option_type, strike, quantity, expiry):
+    """
+    Crea una pata de una estrategia de opciones.
+
+    Parámetros:
+        option_type (str): 'call' o 'put'.
+        strike (float): Precio de ejercicio.
+        quantity (float): Número de contratos; positivo para compra y negativo para venta.
+        expiry (float): Vencimiento en años desde hoy.
+
+    Devuelve:
+        dict: Pata con las claves 'type', 'strike', 'quantity' y 'expiry'.
+    """
+
+    if option_type not in LEG_TYPES:
+        raise ValueError(f"Tipo de opción desconocido en una pata: {option_type}")
+    return {'type': option_type, 'strike': float(strike), 'quantity': float(quantity), 'expiry': float(expiry)}
+
+
+def build_strategy(name, strike, expiry, width=None):
+    """
+    Construye las patas de una de las estrategias clásicas de STRATEGY_NAMES.
+
+    Parámetros:
+        name (str): Nombre de la estrategia.
+        strike (float): Precio de ejercicio central.
+        expiry (float): Vencimiento común de las patas en años.
+        width (float, opcional): Distancia entre ejercicios; por defecto el 10% de strike.
+
+    Devuelve:
+        list of dict: Patas de la estrategia.
+    """
+
+    width = 0.1 * strike if width is None else width
+    legs = {
+        'Straddle': [('call', strike, 1), ('put', strike, 1)],
+        'Strangle': [('put', strike - width, 1), ('call', strike + width, 1)],
+        'Butterfly Spread': [('call', strike - width, 1), ('call', strike, -2), ('call', strike + width, 1)],
+        'Bull Spread': [('call', strike, 1), ('call', strike + width, -1)],
+        'Bear Spread': [('put', strike, 1), ('put', strike - width, -1)],
+    }
+    if name not in legs:
+        raise ValueError(f"Estrategia desconocida: {name}")
+    return [make_leg(option_type, leg_strike, quantity, expiry) for option_type, leg_strike, quantity in legs[name]]
+
+
+def parse_legs(text):
+    """
+    Interpreta una estrategia personalizada escrita como una pata por línea: tipo, ejercicio, cantidad, vencimiento.
+
+    Ejemplo de línea: "call, 105, -2, 0.5". Las líneas vacías y las que empiezan por '#' se ignoran.
+
+    Devuelve:
+        list of dict: Patas de la estrategia.
+    """
+
+    legs = []
+    for number, line in enumerate((text or '').splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = [field.strip() for field in line.replace(';', ',').split(',')]
+        if len(fields) != 4:
+            raise ValueError(f"Línea {number}: se esperaban 4 campos (tipo, ejercicio, cantidad, vencimiento).")
+        try:
+            legs.append(make_leg(fields[0].lower(), *map(float, fields[1:])))
+        except ValueError as e:
+            raise ValueError(f"Línea {number}: {e}") from e
+    return legs
+
+
+def evaluate_strategy(legs, spot_grid, spot, rate, volatility, elapsed=0.0):
+    """
+    Calcula el pago al vencimiento, el valor Black-Scholes y el P&L de una estrategia sobre una malla de precios.
+
+    Todas las patas se valoran en una única evaluación vectorizada (patas x puntos de la malla)
+    con batch_option_price, el mismo núcleo que function_option_price.
+
+    Parámetros:
+        legs (list of dict): Patas de la estrategia (ver make_leg).
+        spot_grid (numpy.ndarray): Precios del subyacente en los que evaluar.
+        spot (float): Precio actual del subyacente, usado para la prima pagada hoy.
+        rate (float): Tasa de interés libre de riesgo.
+        volatility (float): Volatilidad del activo.
+        elapsed (float): Años transcurridos desde hoy en los que se valora la estrategia.
+
+    Devuelve:
+        dict: Arrays 'payoff' (al vencimiento de cada pata), 'value' (tras elapsed años),
+        'pnl_expiry' y 'pnl' (descontada la prima) y el escalar 'cost'.
+    """
+
+    spot_grid = np.asarray(spot_grid, dtype=float)
+    if not legs:
+        zeros = np.zeros_like(spot_grid)
+        return {'payoff': zeros, 'value': zeros, 'pnl_expiry': zeros, 'pnl': zeros, 'cost': 0.0}
+
+    types = np.array([leg['type'] for leg in legs])
+    strikes = np.array([leg['strike'] for leg in legs])[:, np.newaxis]
+    quantities = np.array([leg['quantity'] for leg in legs])
+    expiries = np.array([leg['expiry'] for leg in legs])[:, np.newaxis]
+    w = np.where(types == 'call', 1.0, -1.0)[:, np.newaxis]
+
+    cost = quantities @ batch_option_price(spot, strikes[:, 0], rate, expiries[:, 0], volatility, types)
+    value = quantities @ batch_option_price(spot_grid, strikes, rate, np.maximum(expiries - elapsed, 0.0), volatility, types[:, np.newaxis])
+    payoff = quantities @ np.maximum(w * (spot_grid - strikes), 0.0)
+    return {'payoff': payoff, 'value': value, 'pnl_expiry': payoff - cost, 'pnl': value - cost, 'cost': cost}
+
+
+def _leg_arrays(legs):
+    """
+    Convierte una lista de patas en arrays (tipos, ejercicios, cantidades, vencimientos).
+    """
+
+    return (np.array([leg['type'] for leg in legs]), np.array([leg['strike'] for leg in legs], dtype=float),
+            np.array([leg['quantity'] for leg in legs], dtype=float), np.array([leg['expiry'] for leg in legs], dtype=float))
+
+
+def expected_pnl(legs, view_spots, volatilities, horizons, spot, rate, volatility):
+    """
+    Calcula el P&L esperado de una estrategia en toda una malla de escenarios con una única evaluación vectorizada.
+
+    Las primas se pagan hoy al precio Black-Scholes con (spot, volatility). En cada escenario el
+    subyacente en el horizonte t sigue una lognormal de media view_spot y volatilidad realizada
+    sigma, y las patas vivas se revalúan con esa misma sigma. Por la propiedad de la torre, la
+    esperanza del valor de cada pata en t es exactamente exp(r t) * BS(view_spot * exp(-r t), sigma),
+    así que no hace falta integrar numéricamente. Al P&L se le descuenta la financiación de la prima.
+
+    Parámetros:
+        legs (list of dict): Patas de la estrategia (ver make_leg).
+        view_spots (numpy.ndarray): Precio medio esperado del subyacente en el horizonte.
+        volatilities (numpy.ndarray): Volatilidades realizadas de los escenarios.
+        horizons (numpy.ndarray): Horizontes en años.
+        spot (float): Precio actual del subyacente.
+        rate (float): Tasa de interés libre de riesgo.
+        volatility (float): Volatilidad implícita con la que se pagan las primas.
+
+    Devuelve:
+        numpy.ndarray: Matriz (horizontes, volatilidades, precios) con el P&L esperado.
+    """
+
+    view_spots = np.asarray(view_spots, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    horizons = np.asarray(horizons, dtype=float)
+    if not legs:
+        return np.zeros((horizons.size, volatilities.size, view_spots.size))
+
+    types, strikes, quantities, expiries = _leg_arrays(legs)
+    growth = np.exp(rate * horizons)[:, np.newaxis, np.newaxis]
+
+    # Ejes: (pata, horizonte, volatilidad, precio)
+    leg_shape = (-1, 1, 1, 1)
+    values = batch_option_price(view_spots / growth, strikes.reshape(leg_shape), rate, expiries.reshape(leg_shape),
+                                volatilities[:, np.newaxis], types.reshape(leg_shape))
+    cost = quantities @ batch_option_price(spot, strikes, rate, expiries, volatility, types)
+    return growth * (np.tensordot(quantities, values, axes=1) - cost)
+
+
+def scenario_axes(spot, volatility, expiry):
+    """
+    Construye los ejes por defecto de la malla de escenarios alrededor de los datos de mercado.
+
+    Devuelve:
+        tuple of numpy.ndarray: (precios esperados, volatilidades realizadas, horizontes).
+    """
+
+    view_spots = np.linspace(0.7 * spot, 1.3 * spot, SCENARIO_SPOTS)
+    volatilities = np.linspace(0.5 * volatility, 1.5 * volatility, SCENARIO_VOLATILITIES)
+    horizons = np.linspace(expiry / SCENARIO_HORIZONS, expiry, SCENARIO_HORIZONS)
+    return view_spots, volatilities, horizons
+
+
+def strategy_premium(legs, spot, rate, volatility):
+    """
+    Prima neta que se paga hoy por una estrategia al precio Black-Scholes.
+
+    En las estrategias de STRATEGY_NAMES (todas de débito) es también la pérdida máxima, así
+    que sirve para expresar el P&L por unidad de capital en riesgo.
+
+    Parámetros:
+        legs (list of dict): Patas de la estrategia (ver build_strategy).
+        spot (float): Precio actual del subyacente.
+        rate (float): Tasa de interés libre de riesgo.
+        volatility (float): Volatilidad implícita.
+
+    Devuelve:
+        float: Prima neta (positiva si se paga).
+    """
+
+    if not legs:
+        return 0.0
+    types, strikes, quantities, expiries = _leg_arrays(legs)
+    return float(quantities @ batch_option_price(spot, strikes, rate, expiries, volatility, types))
+
+
+def return_on_premium(pnl, premium, spot):
+    """
+    Divide un P&L por la prima de la estrategia, con un mínimo de MIN_PREMIUM_FRACTION * spot.
+
+    Sin ese mínimo una estrategia casi gratuita (un spread o un butterfly muy fuera del
+    dinero) tendría una rentabilidad enorme, o de signo cambiado si la prima neta sale
+    ligeramente negativa, y ganaría por sí sola cualquier comparación.
+
+    Parámetros:
+        pnl (float or numpy.ndarray): P&L esperado.
+        premium (float): Prima neta de la estrategia (ver strategy_premium).
+        spot (float): Precio actual del subyacente.
+
+    Devuelve:
+        float or numpy.ndarray: P&L por unidad de prima.
+    """
+
+    return pnl / max(abs(premium), MIN_PREMIUM_FRACTION * spot)
+
+
+@memoize_pricing()
+def scenario_scores(spot, strike, rate, volatility, expiry):
+    """
+    Puntúa todas las estrategias de STRATEGY_NAMES en la malla de escenarios de scenario_axes.
+
+    La puntuación es el P&L esperado por unidad de prima pagada (rentabilidad sobre el
+    capital en riesgo). Con el P&L sin normalizar ganaba casi siempre la estrategia más cara,
+    el straddle, solo por su tamaño. La malla completa queda en la caché compartida: el
+    mapa de escenarios toma de ella el corte de cada horizonte sin recalcular nada.
+
+    Parámetros:
+        spot (float): Precio actual del subyacente.
+        strike (float): Precio de ejercicio central de las estrategias.
+        rate (float): Tasa de interés libre de riesgo.
+        volatility (float): Volatilidad implícita.
+        expiry (float): Vencimiento de las estrategias en años.
+
+    Devuelve:
+        numpy.ndarray: Matriz (estrategias, horizontes, volatilidades, precios) con el P&L esperado por unidad de prima.
+    """
+
+    view_spots, volatilities, horizons = scenario_axes(spot, volatility, expiry)
+    scores = []
+    for name in STRATEGY_NAMES:
+        legs = build_strategy(name, strike, expiry)
+        pnl = expected_pnl(legs, view_spots, volatilities, horizons, spot, rate, volatility)
+        scores.append(return_on_premium(pnl, strategy_premium(legs, spot, rate, volatility), spot))
+    return np.stack(scores)
+
+
+def determine_optimal_strategy(spot, strike, rate, volatility, date_value, date_expiration, view_spot=None,
+                               view_volatility=None):
+    """
+    Determina la estrategia con mayor P&L esperado por unidad de prima según la previsión de mercado.
+
+    La previsión es el precio medio esperado del subyacente al vencimiento y la volatilidad
+    realizada hasta entonces; para ella se calcula exactamente el P&L esperado de cada
+    estrategia (ver expected_pnl) y se divide por su prima. Así una previsión alcista elige
+    un bull spread, una bajista un bear spread, una de calma un butterfly y una de mucho
+    movimiento un strangle o un straddle.
+
+    Parámetros:
+        spot (float): Precio actual del subyacente.
+        strike (float): Precio de ejercicio central.
+        rate (float): Tasa de interés en porcentaje.
+        volatility (float): Volatilidad en porcentaje.
+        date_value (datetime): Fecha actual.
+        date_expiration (datetime): Fecha de vencimiento.
+        view_spot (float, opcional): Precio medio esperado al vencimiento; por defecto spot.
+        view_volatility (float, opcional): Volatilidad realizada esperada en porcentaje; por defecto volatility.
+
+    Devuelve:
+        str: Nombre de la estrategia elegida, siempre uno de STRATEGY_NAMES.
+    """
+
+    expiry = max((date_expiration - date_value).days, 1) / 365.25
+    view_spot = spot if view_spot is None else view_spot
+    view_volatility = volatility if view_volatility is None else view_volatility
+    returns = []
+    for name in STRATEGY_NAMES:
+        legs = build_strategy(name, strike, expiry)
+        pnl = expected_pnl(legs, [view_spot], [view_volatility / 100], [expiry], spot, rate / 100, volatility / 100)
+        returns.append(return_on_premium(pnl.item(), strategy_premium(legs, spot, rate / 100, volatility / 100), spot))
+    return STRATEGY_NAMES[int(np.argmax(returns))]
@@ -1,10 +1,164 @@
 from dash import dcc, html
-from scipy.stats import norm
+from scipy.special import ndtr, ndtri
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from components.cache import memoize_pricing
+from components.metricas import timed_kernel
 
 
 
+OPTION_TYPES = ('call', 'put')
+
+
+def _normalize_option_type(option_type):
+    """
+    Normaliza el tipo de opción (sin espacios y en minúsculas) y comprueba que sea 'call' o 'put'.
+
+    Parámetros:
+        option_type (str o array-like de str): Tipo(s) de opción.
+
+    Devuelve:
+        numpy.ndarray: Tipos normalizados, con la misma forma que la entrada.
+
+    Lanza:
+        ValueError: Si algún tipo no es 'call' ni 'put'; el mensaje indica las posiciones.
+    """
+
+    if isinstance(option_type, str) and option_type.strip().lower() in OPTION_TYPES:
+        return np.asarray(option_type.strip().lower())
+    types = np.char.lower(np.char.strip(np.asarray(option_type, dtype=str)))
+    invalid = ~np.isin(types, OPTION_TYPES)
+    if invalid.any():
+        if types.ndim == 0:
+            raise ValueError(f"Tipo de opción no válido: {option_type!r}; debe ser 'call' o 'put'.")
+        positions = [str(index[0] if len(index) == 1 else index) for index in np.argwhere(invalid)[:10].tolist()]
+        raise ValueError(f"Tipo de opción no válido en {int(invalid.sum())} posiciones ({', '.join(positions)}"
+                         f"{', ...' if invalid.sum() > 10 else ''}); debe ser 'call' o 'put'.")
+    return types
+
+
+def _sign_from_option_type(option_type):
+    """
+    Convierte el tipo de opción en un signo: +1 para 'call' y -1 para 'put'.
+
+    Parámetros:
+        option_type (str o array-like de str): Tipo(s) de opción; se admiten mayúsculas y espacios.
+
+    Devuelve:
+        numpy.ndarray: Array con +1.0 en las posiciones 'call' y -1.0 en las 'put'.
+
+    Lanza:
+        ValueError: Si algún tipo no es 'call' ni 'put'.
+    """
+
+    return np.where(_normalize_option_type(option_type) == 'call', 1.0, -1.0)
+
+
+def _d1_d2(S, K, r, T, sigma):
+    """
+    Calcula los términos d1 y d2 de Black-Scholes admitiendo broadcasting entre sus entradas.
+
+    Cuando sigma * sqrt(T) es nulo (vencimiento o volatilidad cero) d1 y d2 se
+    dejan en NaN; quien llama debe usar el valor intrínseco en esas posiciones.
+
+    Devuelve:
+        tuple: (d1, d2, sqrt_T, mask) donde mask indica las posiciones con sigma * sqrt(T) > 0.
+    """
+
+    sqrt_T = np.sqrt(np.maximum(T, 0.0))
+    vol_sqrt_T = sigma * sqrt_T
+    mask = vol_sqrt_T > 0
+    safe = np.where(mask, vol_sqrt_T, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / safe
+    d1 = np.where(mask, d1, np.nan)
+    d2 = d1 - vol_sqrt_T
+    return d1, d2, sqrt_T, mask
+
+
+@memoize_pricing()
+@timed_kernel
+def batch_option_price(S, K, r, T, sigma, option_type):
+    """
+    Calcula de una sola vez el precio Black-Scholes de muchas opciones europeas.
+
+    Todos los parámetros numéricos aceptan escalares o arrays de NumPy y se combinan
+    mediante broadcasting, de forma que una curva o una malla completa se valora en
+    una única llamada. En el límite T -> 0 (o sigma -> 0) se devuelve el valor
+    intrínseco sobre el precio de ejercicio descontado.
+
+    Parámetros:
+        S (float o numpy.ndarray): Precio actual del activo subyacente.
+        K (float o numpy.ndarray): Precio de ejercicio de la opción.
+        r (float o numpy.ndarray): Tasa de interés libre de riesgo (anual).
+        T (float o numpy.ndarray): Tiempo hasta el vencimiento (en años).
+        sigma (float o numpy.ndarray): Volatilidad del activo.
+        option_type (str o array-like de str): 'call' o 'put', escalar o por contrato.
+
+    Devuelve:
+        numpy.ndarray: Precios con la forma resultante del broadcasting de las entradas.
+    """
+
+    S, K, r, T, sigma = (np.asarray(x, dtype=float) for x in (S, K, r, T, sigma))
+    w = _sign_from_option_type(option_type)
+    d1, d2, _, mask = _d1_d2(S, K, r, T, sigma)
+    discounted_K = K * np.exp(-r * T)
+    price = w * (S * ndtr(w * d1) - discounted_K * ndtr(w * d2))
+    intrinsic = np.maximum(w * (S - discounted_K), 0.0)
+    return np.where(mask, price, intrinsic)
+
+
+@memoize_pricing()
+@timed_kernel
+def option_greeks(S, K, r, T, sigma, option_type):
+    """
+    Calcula el precio y las griegas analíticas de Black-Scholes para muchas opciones a la vez.
+
+    Los términos d1, d2, la densidad normal y las probabilidades acumuladas se calculan
+    una sola vez y se reutilizan para todas las griegas. Admite broadcasting igual que
+    batch_option_price. En el límite sigma * sqrt(T) -> 0 gamma y vega valen cero y el
+    resto de griegas corresponde al valor intrínseco descontado.
+
+    Parámetros:
+        S (float o numpy.ndarray): Precio actual del activo subyacente.
+        K (float o numpy.ndarray): Precio de ejercicio de la opción.
+        r (float o numpy.ndarray): Tasa de interés libre de riesgo (anual).
+        T (float o numpy.ndarray): Tiempo hasta el vencimiento (en años).
+        sigma (float o numpy.ndarray): Volatilidad del activo.
+        option_type (str o array-like de str): 'call' o 'put', escalar o por contrato.
+
+    Devuelve:
+        dict: Arrays 'price', 'delta', 'gamma', 'vega' (por unidad de volatilidad),
+        'theta' (por año) y 'rho' (por unidad de tasa).
+    """
+
+    S, K, r, T, sigma = (np.asarray(x, dtype=float) for x in (S, K, r, T, sigma))
+    w = _sign_from_option_type(option_type)
+    d1, d2, sqrt_T, mask = _d1_d2(S, K, r, T, sigma)
+    discounted_K = K * np.exp(-r * T)
+    pdf_d1 = np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi)
+    cdf_d1 = ndtr(w * d1)
+    cdf_d2 = ndtr(w * d2)
+
+    in_the_money = (w * (S - discounted_K) > 0).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = pdf_d1 / (S * sigma * sqrt_T)
+        theta_decay = -S * pdf_d1 * sigma / (2 * sqrt_T)
+
+    return {
+        'price': np.where(mask, w * (S * cdf_d1 - discounted_K * cdf_d2), np.maximum(w * (S - discounted_K), 0.0)),
+        'delta': np.where(mask, w * cdf_d1, w * in_the_money),
+        'gamma': np.where(mask, gamma, 0.0),
+        'vega': np.where(mask, S * pdf_d1 * sqrt_T, 0.0),
+        'theta': np.where(mask, theta_decay - w * r * discounted_K * cdf_d2, -w * r * discounted_K * in_the_money),
+        'rho': np.where(mask, w * T * discounted_K * cdf_d2, w * T * discounted_K * in_the_money),
+    }
+
+
+@timed_kernel
 def function_option_price(S, K, r, T, sigma, option_type):
     """
     Calcula el precio de una opción europea (compra o venta) utilizando el modelo de Black-Scholes.
@@ -21,14 +175,103 @@ def function_option_price(S, K, r, T, sigma, option_type):
         float: Precio calculado de la opción.
     """
 
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    if option_type == 'call':
-        return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        return K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+    return batch_option_price(S, K, r, T, sigma, option_type)[()]
     
 
+def _price_and_vega(S, K, r, T, sigma, w):
+    """
+    Devuelve el precio Black-Scholes y la vega compartiendo d1 y d2 (uso interno de implied_volatility).
+    """
+
+    d1, d2, sqrt_T, mask = _d1_d2(S, K, r, T, sigma)
+    discounted_K = K * np.exp(-r * T)
+    price = np.where(mask, w * (S * ndtr(w * d1) - discounted_K * ndtr(w * d2)), np.maximum(w * (S - discounted_K), 0.0))
+    vega = np.where(mask, S * np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi) * sqrt_T, 0.0)
+    return price, vega
+
+
+@timed_kernel
+def implied_volatility(price, S, K, r, T, option_type, tol=1e-8, max_iter=50, sigma_bounds=(1e-6, 5.0)):
+    """
+    Calcula la volatilidad implícita de muchas cotizaciones a la vez.
+
+    Parte de la aproximación racional de Corrado-Miller, aplica iteraciones de Newton
+    vectorizadas con la vega y, para los contratos que no convergen (vega casi nula o
+    salto fuera del intervalo), recurre a una bisección vectorizada dentro de sigma_bounds.
+    Las cotizaciones fuera de los límites de no arbitraje devuelven NaN.
+
+    Parámetros:
+        price (float o numpy.ndarray): Precio de mercado de la opción.
+        S (float o numpy.ndarray): Precio actual del activo subyacente.
+        K (float o numpy.ndarray): Precio de ejercicio.
+        r (float o numpy.ndarray): Tasa de interés libre de riesgo.
+        T (float o numpy.ndarray): Tiempo hasta el vencimiento (en años).
+        option_type (str o array-like de str): 'call' o 'put', escalar o por contrato.
+        tol (float): Tolerancia absoluta sobre el precio.
+        max_iter (int): Número máximo de iteraciones de Newton.
+        sigma_bounds (tuple of float): Intervalo de búsqueda de la volatilidad.
+
+    Devuelve:
+        tuple of numpy.ndarray: Volatilidades implícitas y un indicador booleano de convergencia por contrato.
+    """
+
+    price, S, K, r, T, w = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, r, T)),
+                                               _sign_from_option_type(option_type))
+    shape = price.shape
+    price, S, K, r, T, w = (x.ravel() for x in (price, S, K, r, T, w))
+    low, high = sigma_bounds
+
+    discounted_K = K * np.exp(-r * T)
+    lower_bound = np.maximum(w * (S - discounted_K), 0.0)
+    upper_bound = np.where(w > 0, S, discounted_K)
+    valid = (price >= lower_bound - tol) & (price <= upper_bound + tol) & (T > 0)
+
+    # Aproximación racional de Corrado-Miller sobre el precio call equivalente (paridad put-call)
+    call_price = np.where(w > 0, price, price + S - discounted_K)
+    half_gap = 0.5 * (S - discounted_K)
+    root = np.sqrt(np.maximum((call_price - half_gap) ** 2 - (S - discounted_K) ** 2 / np.pi, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(2 * np.pi) / (S + discounted_K) * (call_price - half_gap + root) / np.sqrt(T)
+    sigma = np.clip(np.where(np.isfinite(sigma) & (sigma > 0), sigma, 0.2), low, high)
+
+    converged = np.zeros(price.shape, dtype=bool)
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        model, vega = _price_and_vega(S[idx], K[idx], r[idx], T[idx], sigma[idx], w[idx])
+        diff = model - price[idx]
+        done = np.abs(diff) < tol
+        converged[idx[done]] = True
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = sigma[idx] - diff / vega
+        stalled = ~done & (~np.isfinite(step) | (step <= low) | (step >= high))
+        sigma[idx] = np.where(done | stalled, sigma[idx], step)
+        active[idx[done | stalled]] = False
+
+    # Bisección para los contratos que Newton no ha resuelto
+    pending = np.flatnonzero(valid & ~converged)
+    if pending.size:
+        lo = np.full(pending.size, low)
+        hi = np.full(pending.size, high)
+        args = S[pending], K[pending], r[pending], T[pending]
+        for _ in range(int(np.ceil(np.log2((high - low) / 1e-12)))):
+            mid = 0.5 * (lo + hi)
+            model, _ = _price_and_vega(*args, mid, w[pending])
+            above = model > price[pending]
+            hi = np.where(above, mid, hi)
+            lo = np.where(above, lo, mid)
+        sigma[pending] = 0.5 * (lo + hi)
+        model, _ = _price_and_vega(*args, sigma[pending], w[pending])
+        converged[pending] = np.abs(model - price[pending]) < tol
+
+    sigma = np.where(valid, sigma, np.nan)
+    return sigma.reshape(shape), converged.reshape(shape)
+
+
+@memoize_pricing()
+@timed_kernel
 def plot_option_evolution(S, K, r, sigma, T, num_steps, option_type):
     """
     Calcula y devuelve los precios de una opción en diferentes momentos hasta su vencimiento.
@@ -43,16 +286,127 @@ def plot_option_evolution(S, K, r, sigma, T, num_steps, option_type):
         option_type (str): Tipo de opción ('call' o 'put').
     
     Devuelve:
-        tuple of lists: Dos listas, una con los tiempos y otra con los precios de la opción en esos tiempos.
+        tuple of numpy.ndarray: Los tiempos y los precios de la opción en esos tiempos.
     """
 
     times = np.linspace(0, T, num_steps)
-    option_prices = [function_option_price(S, K, r, T - ti, sigma, option_type) for ti in times]
+    option_prices = batch_option_price(S, K, r, T - times, sigma, option_type)
     return times, option_prices
 
-def monte_carlo_simulation(S, K, r, T, sigma, option_type, M):
+DEFAULT_CHUNK_SIZE = 65_536
+GBM_STRIP_ELEMENTS = 1 << 20
+MC_TIME_STEPS = 365
+
+
+def _path_blocks(I, chunk_size, seed):
+    """
+    Divide I trayectorias en bloques de tamaño fijo, cada uno con su propio flujo aleatorio.
+
+    Los flujos se derivan de una única SeedSequence, de modo que el reparto depende solo de
+    la semilla y de chunk_size, nunca del número de procesos que ejecuten los bloques. Si todo
+    cabe en un bloque se usa la propia semilla, así que el resultado coincide con el de un
+    único default_rng(seed).
+
+    Devuelve:
+        list of tuple: Pares (slice de columnas, SeedSequence) en orden.
+    """
+
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    n_blocks = -(-I // chunk_size)
+    if n_blocks <= 1:
+        return [(slice(0, I), root)]
+    children = root.spawn(n_blocks)
+    return [(slice(i * chunk_size, min(I, (i + 1) * chunk_size)), child) for i, child in enumerate(children)]
+
+
+def _run_blocks(function, blocks, workers=None, executor='thread', progress_callback=None, consume=None):
+    """
+    Ejecuta function sobre cada bloque, en serie o en un pool de hilos o procesos.
+
+    Los resultados se procesan siempre en el orden de los bloques para que la combinación
+    posterior sea exactamente la misma con cualquier número de workers. Si se indica consume,
+    se llama con (bloque, resultado) en cuanto cada bloque termina y el resultado no se
+    guarda; en el pool nunca hay más de 2 * workers bloques pendientes, así que la memoria
+    no crece con el número de bloques. Si se indica progress_callback, se llama con
+    (bloques_terminados, bloques_totales) tras cada bloque.
+
+    Devuelve:
+        list: Resultados en orden de los bloques (vacía si se indica consume).
+    """
+
+    results = []
+
+    def handle(done, block, result):
+        if consume is None:
+            results.append(result)
+        else:
+            consume(block, result)
+        if progress_callback is not None:
+            progress_callback(done, len(blocks))
+
+    if not workers or workers <= 1 or len(blocks) <= 1:
+        for done, block in enumerate(blocks, start=1):
+            handle(done, block, function(block))
+        return results
+
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    workers = min(workers, len(blocks))
+    with pool_class(max_workers=workers) as pool:
+        remaining = iter(blocks)
+        pending = deque((block, pool.submit(function, block)) for _, block in zip(range(2 * workers), remaining))
+        done = 0
+        while pending:
+            block, future = pending.popleft()
+            done += 1
+            handle(done, block, future.result())
+            del future
+            following = next(remaining, None)
+            if following is not None:
+                pending.append((following, pool.submit(function, following)))
+    return results
+
+
+def _payoff(prices, K, option_type):
+    """
+    Calcula el pago al vencimiento de una opción europea para un vector de precios.
+    """
+
+    if option_type == 'call':
+        return np.maximum(prices - K, 0)
+    return np.maximum(K - prices, 0)
+
+
+def _monte_carlo_block(S, K, r, T, sigma, option_type, num_steps, block):
+    """
+    Simula un bloque de trayectorias de monte_carlo_simulation y devuelve la suma de los pagos descontados por paso.
+    """
+
+    columns, seed_sequence = block
+    rng = np.random.default_rng(seed_sequence)
+    size = columns.stop - columns.start
+    dt = T / num_steps
+    drift = (r - 0.5 * sigma**2) * dt
+    diffusion = sigma * np.sqrt(dt)
+    payoff_sums = np.zeros(num_steps)
+    prices = np.full(size, S, dtype=float)
+    for t in range(1, num_steps):
+        prices = prices * np.exp(drift + diffusion * rng.standard_normal(size))
+        payoff_sums[t] = np.sum(np.exp(-r * (T - t/num_steps)) * _payoff(prices, K, option_type))
+    return payoff_sums
+
+
+@memoize_pricing(require_seed=True, ignore=('workers', 'executor', 'progress_callback'))
+@timed_kernel
+def monte_carlo_simulation(S, K, r, T, sigma, option_type, M, seed=None, chunk_size=None,
+                           workers=None, executor='thread', progress_callback=None):
     """
     Realiza una simulación de Monte Carlo para estimar el precio de una opción a través de la simulación de precios del activo subyacente.
+
+    No se guardan las matrices completas de trayectorias y pagos: las trayectorias se procesan
+    en bloques de chunk_size, cada uno con su propio generador derivado de la semilla, y de
+    cada bloque solo se mantiene el corte temporal actual y la suma acumulada de los pagos de
+    cada paso. Con workers los bloques se reparten entre un pool de hilos o procesos; el
+    resultado para una semilla depende solo de chunk_size, nunca de workers.
     
     Parámetros:
         S (float): Precio inicial del activo.
@@ -62,31 +416,44 @@ def monte_carlo_simulation(S, K, r, T, sigma, option_type, M):
         sigma (float): Volatilidad del activo.
         option_type (str): Tipo de la opción ('call' o 'put').
         M (int): Número de simulaciones a realizar.
+        seed (int, opcional): Semilla del generador aleatorio para obtener resultados reproducibles.
+        chunk_size (int, opcional): Número de trayectorias por bloque (DEFAULT_CHUNK_SIZE por defecto).
+        workers (int, opcional): Número de workers en paralelo; no cambia el resultado.
+        executor (str): 'thread' o 'process'.
+        progress_callback (callable, opcional): Función llamada con (bloques_terminados, bloques_totales)
+            tras cada bloque.
     
     Devuelve:
-        tuple of lists: Tiempos en los que se evalúa el precio y el valor esperado de los pagos de la opción.
+        tuple of numpy.ndarray: Tiempos en los que se evalúa el precio y el valor esperado de los pagos de la opción.
     """
 
-    num_steps = 365
+    num_steps = MC_TIME_STEPS
     times = np.linspace(0, T, num_steps)
-    dt = T / num_steps
-    paths = np.zeros((num_steps, M))
-    payoffs = np.zeros((num_steps, M))
-    paths[0] = S
-    for t in range(1, num_steps):
-        Z = np.random.standard_normal(M)
-        paths[t] = paths[t-1] * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-        if option_type == 'call':
-            payoffs[t] = np.exp(-r * (T - t/num_steps)) * np.maximum(paths[t] - K, 0)
-        else:
-            payoffs[t] = np.exp(-r * (T - t/num_steps)) * np.maximum(K - paths[t], 0)
-    mean_payoffs = np.mean(payoffs, axis=1)
-    return times, mean_payoffs
+    block_function = partial(_monte_carlo_block, S, K, r, T, sigma, option_type, num_steps)
+    blocks = _path_blocks(M, chunk_size or DEFAULT_CHUNK_SIZE, seed)
+    payoff_sums = np.zeros(num_steps)
+
+    def accumulate(block, sums):
+        payoff_sums[:] += sums
+
+    _run_blocks(block_function, blocks, workers, executor, progress_callback, consume=accumulate)
+    return times, payoff_sums / M
 
 
-def simulate_gbm(S0, r, sigma, T, M, I):
+@memoize_pricing(require_seed=True, ignore=('workers', 'executor', 'progress_callback'))
+@timed_kernel
+def simulate_gbm(S0, r, sigma, T, M, I, seed=None, dtype=np.float64, out=None, workers=None, executor='thread',
+                 chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
     """
     Simula múltiples trayectorias de precios para un activo usando el modelo geométrico de movimiento browniano.
+
+    Las columnas se reparten en bloques de chunk_size trayectorias, cada uno con un generador
+    propio derivado de la semilla. Los incrementos de cada bloque se generan por franjas de
+    pasos, se acumulan en espacio logarítmico con cumsum, se exponencian y se escriben en su
+    parte de la matriz de salida, sin temporales del tamaño de la salida ni del bloque.
+
+    workers solo decide si los bloques se simulan en serie o en paralelo: el resultado para
+    una semilla depende únicamente de chunk_size.
     
     Parámetros:
         S0 (float): Precio inicial del activo.
@@ -95,22 +462,173 @@ def simulate_gbm(S0, r, sigma, T, M, I):
         T (float): Duración del período de simulación.
         M (int): Número de pasos temporales en la simulación.
         I (int): Número de caminos independientes a simular.
+        seed (int, opcional): Semilla del generador aleatorio para obtener resultados reproducibles.
+        dtype (numpy.dtype): np.float64 o np.float32; se ignora si se proporciona out.
+        out (numpy.ndarray, opcional): Buffer C-contiguo de forma (M + 1, I) donde escribir las trayectorias.
+        workers (int, opcional): Número de workers en paralelo.
+        executor (str): 'thread' o 'process'.
+        chunk_size (int): Trayectorias por bloque.
+        progress_callback (callable, opcional): Función llamada con (bloques_terminados, bloques_totales)
+            tras cada bloque.
     
     Devuelve:
         numpy.ndarray: Una matriz que contiene todas las trayectorias de precios simuladas.
     """
 
-    dt = T / M
-    paths = np.zeros((M + 1, I))
-    paths[0] = S0
-    for t in range(1, M + 1):
-        z = np.random.standard_normal(I)
-        paths[t] = paths[t - 1] * np.exp((r - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z)
-    return paths
+    if out is None:
+        out = np.empty((M + 1, I), dtype=dtype)
+    elif out.shape != (M + 1, I) or not out.flags.c_contiguous:
+        raise ValueError(f"El buffer de salida debe ser C-contiguo y de forma {(M + 1, I)}.")
+
+    blocks = _path_blocks(I, chunk_size, seed)
+    if executor == 'process' and workers and workers > 1 and len(blocks) > 1:
+        # Los procesos no comparten out: cada bloque se copia en su sitio en cuanto llega
+        def store(block, paths):
+            out[:, block[0]] = paths
+
+        _run_blocks(partial(_simulate_gbm_block, S0, r, sigma, T, M, out.dtype, None), blocks, workers, executor,
+                    progress_callback, consume=store)
+    else:
+        _run_blocks(partial(_simulate_gbm_block, S0, r, sigma, T, M, out.dtype, out), blocks, workers, executor,
+                    progress_callback, consume=lambda block, result: None)
+    return out
+
+
+def _gbm_paths(S0, r, sigma, T, out, seed_sequence):
+    """
+    Rellena en el sitio out (pasos + 1, trayectorias) con un único flujo aleatorio.
+
+    Los incrementos se generan por franjas de filas sobre un buffer de GBM_STRIP_ELEMENTS
+    elementos, arrastrando el logaritmo acumulado entre franjas. Como default_rng rellena en
+    orden C, el resultado es idéntico al de generar todo el bloque de una vez, pero out puede
+    ser una vista no contigua (las columnas de un bloque) y no hace falta ninguna copia del
+    tamaño del bloque.
+    """
+
+    steps, paths = out.shape[0] - 1, out.shape[1]
+    dt = T / steps
+    rng = np.random.default_rng(seed_sequence)
+    rows = max(1, min(steps, GBM_STRIP_ELEMENTS // max(paths, 1)))
+    buffer = np.empty((rows, paths), dtype=out.dtype)
+    level = np.zeros(paths, dtype=out.dtype)
+    out[0] = S0
+    for first in range(1, steps + 1, rows):
+        strip = buffer[:min(rows, steps + 1 - first)]
+        rng.standard_normal(out=strip, dtype=out.dtype)
+        strip *= sigma * np.sqrt(dt)
+        strip += (r - 0.5 * sigma ** 2) * dt
+        strip[0] += level
+        np.cumsum(strip, axis=0, out=strip)
+        level[:] = strip[-1]
+        np.exp(strip, out=strip)
+        strip *= S0
+        out[first:first + len(strip)] = strip
+    return out
+
+
+def _simulate_gbm_block(S0, r, sigma, T, M, dtype, out, block):
+    """
+    Simula las trayectorias de un bloque de columnas de simulate_gbm con su propio flujo aleatorio.
+
+    Si se da out, escribe directamente en sus columnas del bloque y no devuelve nada; si no,
+    devuelve la matriz del bloque.
+    """
+
+    columns, seed_sequence = block
+    if out is None:
+        return _gbm_paths(S0, r, sigma, T, np.empty((M + 1, columns.stop - columns.start), dtype=dtype), seed_sequence)
+    _gbm_paths(S0, r, sigma, T, out[:, columns], seed_sequence)
+    return None
+
+
+VARIANCE_REDUCTION_METHODS = ('standard', 'antithetic', 'control', 'sobol')
+SOBOL_REPLICATES = 16
+
+
+def _estimate(samples, confidence):
+    """
+    Resume muestras independientes de un estimador en precio, error estándar e intervalo de confianza.
+    """
+
+    samples = np.asarray(samples, dtype=float)
+    price = np.mean(samples)
+    std_error = np.std(samples, ddof=1) / np.sqrt(samples.size) if samples.size > 1 else np.nan
+    z = ndtri(0.5 + confidence / 2)
+    return {'price': price, 'std_error': std_error, 'conf_int': (price - z * std_error, price + z * std_error)}
+
+
+def _control_variate_samples(samples, control, control_mean):
+    """
+    Ajusta las muestras con una variable de control de media conocida usando el coeficiente óptimo estimado.
+    """
+
+    control_var = np.var(control, ddof=1)
+    beta = np.cov(samples, control)[0, 1] / control_var if control_var > 0 else 0.0
+    return samples - beta * (control - control_mean)
+
+
+def _sobol_terminal_prices(S0, r, sigma, T, I, seed):
+    """
+    Genera precios al vencimiento con réplicas independientes de secuencias de Sobol aleatorizadas.
+
+    Devuelve:
+        numpy.ndarray: Matriz (SOBOL_REPLICATES, n) con n potencia de dos y SOBOL_REPLICATES * n <= max(I, 2 * SOBOL_REPLICATES).
+    """
+
+    # scipy.stats es de las importaciones más pesadas de la aplicación y solo se necesita aquí
+    from scipy.stats import qmc
+
+    m = max(int(np.log2(max(I // SOBOL_REPLICATES, 2))), 1)
+    streams = np.random.SeedSequence(seed).spawn(SOBOL_REPLICATES)
+    u = np.stack([qmc.Sobol(d=1, scramble=True, seed=np.random.default_rng(child)).random_base2(m)[:, 0]
+                  for child in streams])
+    z = ndtri(u)
+    return S0 * np.exp((r - 0.5 * sigma ** 2) * T + sigma * np.sqrt(T) * z)
+
+
+def _terminal_block(S0, r, sigma, T, M, dtype, block):
+    """
+    Devuelve solo los precios al vencimiento de un bloque de trayectorias simuladas.
+    """
+
+    return _simulate_gbm_block(S0, r, sigma, T, M, dtype, None, block)[-1].astype(float)
+
+
+def _terminal_prices(S0, r, sigma, T, M, I, seed, dtype, workers=None, executor='thread', progress_callback=None):
+    """
+    Simula I trayectorias por bloques (los mismos que simulate_gbm) y devuelve sus precios al vencimiento.
+    """
+
+    S_T = np.empty(I)
+
+    def store(block, prices):
+        S_T[block[0]] = prices
+
+    blocks = _path_blocks(I, DEFAULT_CHUNK_SIZE, seed)
+    _run_blocks(partial(_terminal_block, S0, r, sigma, T, M, dtype), blocks, workers, executor, progress_callback, consume=store)
+    return S_T
+
 
-def monte_carlo_option_pricing(S0, E, r, sigma, T, M, I):
+@memoize_pricing(require_seed=True, ignore=('workers', 'executor', 'progress_callback'))
+@timed_kernel
+def monte_carlo_option_pricing(S0, E, r, sigma, T, M, I, seed=None, dtype=np.float64, method='standard', confidence=0.95,
+                               workers=None, executor='thread', progress_callback=None, terminal_prices=None):
     """
     Calcula el precio de opciones de compra y venta utilizando el método de Monte Carlo a partir de trayectorias simuladas.
+
+    Si se proporcionan terminal_prices (por ejemplo la última fila de unas trayectorias ya
+    simuladas para un gráfico) no se simula nada: los métodos 'standard', 'antithetic' y
+    'control' se aplican sobre esos precios, y 'antithetic' usa cada precio y su simétrico.
+    'sobol' genera sus propios puntos y no admite terminal_prices.
+
+    Métodos disponibles:
+        'standard': Monte Carlo simple sobre I trayectorias.
+        'antithetic': I / 2 trayectorias y sus simétricas (Z y -Z); el error se calcula sobre los pares.
+        'control': usa como variable de control el precio al vencimiento descontado, cuya media
+            exacta es S0 (una opción europea no puede ser control de sí misma: el estimador
+            degeneraría en el precio cerrado de function_option_price).
+        'sobol': réplicas de secuencias de Sobol aleatorizadas sobre el precio al vencimiento
+            (exacto en el modelo GBM, por lo que M no interviene); el error se calcula entre réplicas.
     
     Parámetros:
         S0 (float): Precio inicial del activo.
@@ -120,54 +638,120 @@ def monte_carlo_option_pricing(S0, E, r, sigma, T, M, I):
         T (float): Tiempo hasta el vencimiento de la opción.
         M (int): Número de pasos temporales en la simulación.
         I (int): Número de caminos simulados.
+        seed (int, opcional): Semilla del generador aleatorio.
+        dtype (numpy.dtype): Precisión de las trayectorias simuladas (np.float64 o np.float32).
+        method (str): Técnica de reducción de varianza, una de VARIANCE_REDUCTION_METHODS.
+        confidence (float): Nivel de confianza del intervalo devuelto.
+        workers (int, opcional): Número de workers para simular las trayectorias en paralelo; no cambia el resultado.
+        executor (str): 'thread' o 'process'.
+        progress_callback (callable, opcional): Función llamada con (bloques_terminados, bloques_totales)
+            tras cada bloque.
+        terminal_prices (numpy.ndarray, opcional): Precios al vencimiento ya simulados que se reutilizan.
     
     Devuelve:
-        tuple (float, float): Precio de la opción de compra y venta calculados.
+        tuple (dict, dict): Resultados de la opción de compra y de venta, cada uno con las claves
+        'price', 'std_error' y 'conf_int'.
+
+    Lanza:
+        ValueError: Si el método es desconocido o si se combina 'sobol' con terminal_prices.
     """
 
-    paths = simulate_gbm(S0, r, sigma, T, M, I)
-    S_T = paths[-1]
-    call_payoff = np.maximum(S_T - E, 0)
-    put_payoff = np.maximum(E - S_T, 0)
-    call_price = np.exp(-r * T) * np.mean(call_payoff)
-    put_price = np.exp(-r * T) * np.mean(put_payoff)
-    return call_price, put_price
+    if method not in VARIANCE_REDUCTION_METHODS:
+        raise ValueError(f"Método de reducción de varianza desconocido: {method}")
+    if method == 'sobol' and terminal_prices is not None:
+        raise ValueError("El método 'sobol' genera sus propios precios al vencimiento y no admite terminal_prices.")
+
+    discount = np.exp(-r * T)
+    if method == 'sobol':
+        S_T = _sobol_terminal_prices(S0, r, sigma, T, I, seed)
+        call_means = discount * np.mean(np.maximum(S_T - E, 0), axis=1)
+        put_means = discount * np.mean(np.maximum(E - S_T, 0), axis=1)
+        return _estimate(call_means, confidence), _estimate(put_means, confidence)
+
+    if terminal_prices is not None:
+        S_T = np.asarray(terminal_prices, dtype=float)
+    elif method == 'antithetic':
+        S_T = _terminal_prices(S0, r, sigma, T, M, max(I // 2, 1), seed, dtype, workers, executor, progress_callback)
+    else:
+        S_T = _terminal_prices(S0, r, sigma, T, M, I, seed, dtype, workers, executor, progress_callback)
+
+    if method == 'antithetic':
+        S_T_anti = S0 ** 2 * np.exp(2 * (r - 0.5 * sigma ** 2) * T) / S_T
+        call_samples = discount * 0.5 * (np.maximum(S_T - E, 0) + np.maximum(S_T_anti - E, 0))
+        put_samples = discount * 0.5 * (np.maximum(E - S_T, 0) + np.maximum(E - S_T_anti, 0))
+        return _estimate(call_samples, confidence), _estimate(put_samples, confidence)
+
+    call_samples = discount * np.maximum(S_T - E, 0)
+    put_samples = discount * np.maximum(E - S_T, 0)
+    if method == 'control':
+        call_samples = _control_variate_samples(call_samples, discount * S_T, S0)
+        put_samples = _control_variate_samples(put_samples, discount * S_T, S0)
+    return _estimate(call_samples, confidence), _estimate(put_samples, confidence)
 
 
+PATH_PAYOFFS = ('call', 'put', 'digital_call', 'digital_put')
 
 
-def determine_optimal_strategy(spot, strike, rate, volatility, date_value, date_expiration, option_type):
+@timed_kernel
+def price_from_paths(paths, strikes, r, T, payoffs=PATH_PAYOFFS, confidence=0.95):
     """
-    Determines the optimal options strategy based on market conditions and option parameters.
+    Valora varias opciones europeas y varios precios de ejercicio a partir de un único conjunto de trayectorias.
+
+    Los precios al vencimiento se ordenan una sola vez y se acumulan sus sumas y sumas de
+    cuadrados, de modo que cada combinación de pago y precio de ejercicio se resuelve con
+    una búsqueda binaria, sin recorrer de nuevo las trayectorias ni crear matrices
+    (trayectorias x precios de ejercicio).
+
+    Pagos disponibles:
+        'call': max(S_T - K, 0).   'put': max(K - S_T, 0).
+        'digital_call': 1 si S_T > K.   'digital_put': 1 si S_T <= K.
+
+    Parámetros:
+        paths (numpy.ndarray): Matriz (pasos, trayectorias) de simulate_gbm o vector de precios al vencimiento.
+        strikes (float o array-like): Precio(s) de ejercicio.
+        r (float): Tasa de interés libre de riesgo.
+        T (float): Tiempo hasta el vencimiento.
+        payoffs (tuple of str): Pagos a valorar, subconjunto de PATH_PAYOFFS.
+        confidence (float): Nivel de confianza de los intervalos.
+
+    Devuelve:
+        dict: Para cada pago, un diccionario con arrays 'price', 'std_error' y 'conf_int' (uno por precio de ejercicio).
     """
-    # Define volatility thresholds
-    high_volatility_threshold = 25
-    low_volatility_threshold = 15
-    
-    # Calculate the number of days to expiration
-    days_to_expiration = (date_expiration - date_value).days
-    
-    # Calculate expected price movement
-    expected_price_movement = (volatility / 100) * spot * np.sqrt(days_to_expiration / 365.25)
-    price_movement_threshold = 0.1 * spot  # 10% of spot price
 
-    # Debugging output
-    print(f"Volatility: {volatility}, Expected Price Movement: {expected_price_movement}, Threshold: {price_movement_threshold}")
+    unknown = set(payoffs) - set(PATH_PAYOFFS)
+    if unknown:
+        raise ValueError(f"Pagos desconocidos: {sorted(unknown)}")
 
-    if volatility > high_volatility_threshold:
-        if expected_price_movement > price_movement_threshold:
-            return 'Straddle'
-        else:
-            return 'Strangle'
-    elif volatility < low_volatility_threshold:
-        if expected_price_movement < price_movement_threshold:
-            return 'Butterfly Spread'
-    else:
-        # Check relative position of spot to strike
-        if spot >= strike:
-            return 'Bull Spread'
-        else:
-            return 'Bear Spread'
+    paths = np.asarray(paths)
+    S_T = np.sort(paths[-1] if paths.ndim == 2 else paths).astype(float)
+    K = np.atleast_1d(np.asarray(strikes, dtype=float))
+    n = S_T.size
+    cum_S = np.concatenate(([0.0], np.cumsum(S_T)))
+    cum_S2 = np.concatenate(([0.0], np.cumsum(S_T ** 2)))
+
+    below = np.searchsorted(S_T, K, side='right')
+    above = n - below
+    sum_below, sum2_below = cum_S[below], cum_S2[below]
+    sum_above, sum2_above = cum_S[-1] - sum_below, cum_S2[-1] - sum2_below
+
+    moments = {
+        'call': (sum_above - K * above, sum2_above - 2 * K * sum_above + K ** 2 * above),
+        'put': (K * below - sum_below, K ** 2 * below - 2 * K * sum_below + sum2_below),
+        'digital_call': (above.astype(float), above.astype(float)),
+        'digital_put': (below.astype(float), below.astype(float)),
+    }
+
+    discount = np.exp(-r * T)
+    z = ndtri(0.5 + confidence / 2)
+    results = {}
+    for payoff in payoffs:
+        total, total_sq = moments[payoff]
+        mean = total / n
+        variance = np.maximum(total_sq / n - mean ** 2, 0.0) * n / max(n - 1, 1)
+        price = discount * mean
+        std_error = discount * np.sqrt(variance / n)
+        results[payoff] = {'price': price, 'std_error': std_error, 'conf_int': (price - z * std_error, price + z * std_error)}
+    return results
 
 
 def add_volatility_input(n_clicks, children):
@@ -197,12 +781,13 @@ def apply_visual_offset(prices, index):
     Aplica un desplazamiento visual a una lista de precios para mejorar la visualización en gráficos.
     
     Parámetros:
-        prices (list of float): Lista de precios originales.
+        prices (array-like of float): Precios originales.
         index (int): Índice utilizado para calcular el desplazamiento basado en el máximo de los precios.
     
     Devuelve:
-        list of float: Lista de precios ajustados con el desplazamiento aplicado.
+        numpy.ndarray: Precios ajustados con el desplazamiento aplicado.
     """
-    offset = index * 0.05 * max(prices)  
-    return [price + offset for price in prices]
+    prices = np.asarray(prices)
+    offset = index * 0.05 * np.max(prices)
+    return prices + offset
 
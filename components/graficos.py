@@ -0,0 +1,192 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+FAN_QUANTILES = (5, 25, 50, 75, 95)
+DEFAULT_MAX_POINTS = 1000
+SIGNIFICANT_DIGITS = 7
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Elige los índices que conserva el algoritmo Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+    Divide los puntos interiores en threshold - 2 grupos y, de cada uno, se queda con el punto
+    que forma el triángulo de mayor área con el punto elegido en el grupo anterior y la media
+    del grupo siguiente, lo que conserva picos y valles que un submuestreo regular perdería.
+
+    Parámetros:
+        x (numpy.ndarray): Valores del eje horizontal, crecientes.
+        y (numpy.ndarray): Valores del eje vertical.
+        threshold (int): Número de puntos a conservar (incluidos el primero y el último).
+
+    Devuelve:
+        numpy.ndarray: Índices crecientes de los puntos conservados.
+    """
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def _downsample(x, y, max_points):
+    """
+    Aplica LTTB a cada tramo sin huecos (NaN) de una traza, repartiendo max_points según su longitud.
+    """
+
+    gaps = np.isnan(y) | np.isnan(x)
+    if not gaps.any():
+        keep = lttb_indices(x, y, max_points)
+        return x[keep], y[keep]
+
+    bounds = np.flatnonzero(np.diff(np.concatenate(([1], gaps.astype(np.int8), [1]))))
+    segments = bounds.reshape(-1, 2)
+    budget = max_points - (len(segments) - 1)
+    xs, ys = [], []
+    for start, end in segments:
+        keep = start + lttb_indices(x[start:end], y[start:end], max(3, budget * (end - start) // (~gaps).sum()))
+        xs += [x[keep], [np.nan]]
+        ys += [y[keep], [np.nan]]
+    return np.concatenate(xs[:-1]), np.concatenate(ys[:-1])
+
+
+def compact_array(values, significant_digits=SIGNIFICANT_DIGITS):
+    """
+    Redondea un array numérico a la precisión de float32 para que su JSON sea más corto.
+
+    Los valores siguen siendo float64 (float32 se serializa con todos los dígitos de su
+    conversión a double), pero al redondear a significant_digits cifras respecto al mayor
+    valor absoluto cada número se escribe con como mucho ese número de dígitos.
+    """
+
+    values = np.asarray(values, dtype=float)
+    finite = np.abs(values[np.isfinite(values)])
+    if finite.size == 0 or finite.max() == 0:
+        return values
+    decimals = significant_digits - 1 - int(np.floor(np.log10(finite.max())))
+    return np.round(values, max(decimals, 0))
+
+
+def compact_figure(fig, max_points=DEFAULT_MAX_POINTS, significant_digits=SIGNIFICANT_DIGITS):
+    """
+    Reduce el tamaño de una figura antes de enviarla al navegador.
+
+    Cada traza con ejes numéricos y más de max_points puntos se submuestrea con LTTB (tramo a
+    tramo si contiene huecos NaN) y todos sus valores se redondean con compact_array. Las
+    trazas con relleno entre ellas (fill='tonexty') se dejan con todos sus puntos para que las
+    bandas sigan alineadas.
+
+    Parámetros:
+        fig (plotly.graph_objects.Figure): Figura a reducir; se modifica en el sitio.
+        max_points (int): Número máximo de puntos por traza.
+        significant_digits (int): Cifras significativas que se conservan.
+
+    Devuelve:
+        plotly.graph_objects.Figure: La misma figura.
+    """
+
+    traces = list(fig.data)
+    filled = {i for i, trace in enumerate(traces) if getattr(trace, 'fill', None) not in (None, 'none')}
+    filled |= {i - 1 for i in filled if i > 0}
+    for i, trace in enumerate(traces):
+        if trace.type not in ('scatter', 'scattergl') or trace.y is None:
+            continue
+        y = np.asarray(trace.y)
+        x = np.arange(len(y)) if trace.x is None else np.asarray(trace.x)
+        if not (np.issubdtype(x.dtype, np.number) and np.issubdtype(y.dtype, np.number)):
+            continue
+        downsampled = len(y) > max_points and i not in filled
+        if downsampled:
+            x, y = _downsample(x.astype(float), y.astype(float), max_points)
+        if downsampled or trace.x is not None:
+            trace.x = compact_array(x, significant_digits)
+        trace.y = compact_array(y, significant_digits)
+    return fig
+
+
+def path_sample_trace(x, paths, sample_size=20, seed=None, name='Trayectorias de muestra'):
+    """
+    Une una muestra aleatoria de trayectorias en una única traza WebGL separada por huecos.
+
+    Parámetros:
+        x (numpy.ndarray): Valores del eje horizontal (uno por fila de paths).
+        paths (numpy.ndarray): Matriz (pasos, trayectorias) de precios simulados.
+        sample_size (int): Número máximo de trayectorias a dibujar.
+        seed (int, opcional): Semilla para elegir la muestra.
+        name (str): Nombre de la traza en la leyenda.
+
+    Devuelve:
+        plotly.graph_objects.Scattergl: Traza con las trayectorias concatenadas y NaN entre ellas.
+    """
+
+    n_paths = paths.shape[1]
+    columns = np.random.default_rng(seed).choice(n_paths, size=min(sample_size, n_paths), replace=False)
+    sample = paths[:, np.sort(columns)]
+    gap = np.full((1, sample.shape[1]), np.nan, dtype=sample.dtype)
+    y_values = np.vstack([sample, gap]).T.ravel()
+    x_values = np.tile(np.append(np.asarray(x, dtype=float), np.nan), sample.shape[1])
+    return go.Scattergl(x=x_values, y=y_values, mode='lines', name=name, connectgaps=False,
+                        line=dict(width=1, color='rgba(100, 100, 100, 0.35)'))
+
+
+def fan_chart_figure(paths, x=None, quantiles=FAN_QUANTILES, sample_size=20, seed=None, overwrite_input=False,
+                     title=None, xaxis_title=None, yaxis_title=None):
+    """
+    Construye un gráfico de abanico con bandas de cuantiles por paso calculadas directamente sobre la matriz de NumPy.
+
+    En lugar de una traza por trayectoria, dibuja las bandas entre los cuantiles extremos e
+    intermedios, la mediana y una pequeña muestra de trayectorias en una sola traza WebGL,
+    por lo que el tamaño del gráfico no depende del número de trayectorias.
+
+    Parámetros:
+        paths (numpy.ndarray): Matriz (pasos, trayectorias) de precios simulados.
+        x (numpy.ndarray, opcional): Valores del eje horizontal; por defecto el índice del paso.
+        quantiles (tuple of float): Percentiles simétricos en orden creciente con la mediana en el centro.
+        sample_size (int): Número de trayectorias individuales a superponer.
+        seed (int, opcional): Semilla para elegir la muestra de trayectorias.
+        overwrite_input (bool): Permite reordenar paths dentro de cada paso al calcular los cuantiles
+            para evitar una copia de la matriz; las trayectorias dejan de ser coherentes tras la llamada.
+        title (str, opcional): Título del gráfico.
+        xaxis_title (str, opcional): Título del eje horizontal.
+        yaxis_title (str, opcional): Título del eje vertical.
+
+    Devuelve:
+        plotly.graph_objects.Figure: Figura con las bandas, la mediana y la muestra de trayectorias.
+    """
+
+    x = np.arange(paths.shape[0]) if x is None else np.asarray(x)
+    sample = path_sample_trace(x, paths, sample_size, seed)
+    bands = np.percentile(paths, quantiles, axis=1, overwrite_input=overwrite_input and paths.flags.writeable)
+
+    fig = go.Figure()
+    n_bands = len(quantiles) // 2
+    for i in range(n_bands):
+        lower, upper = bands[i], bands[-1 - i]
+        opacity = 0.15 + 0.2 * i
+        fig.add_trace(go.Scatter(x=x, y=upper, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=x, y=lower, mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba(0, 123, 255, {opacity:.2f})',
+                                 name=f'Percentiles {quantiles[i]:g}-{quantiles[-1 - i]:g}'))
+    if len(quantiles) % 2:
+        fig.add_trace(go.Scatter(x=x, y=bands[n_bands], mode='lines', name='Mediana',
+                                 line=dict(color='rgb(0, 60, 140)', width=2)))
+    fig.add_trace(sample)
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
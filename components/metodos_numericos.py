@@ -0,0 +1,196 @@
+from dash import html, dcc, callback, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+from datetime import datetime
+from components.diferencias_finitas import fd_price, explicit_time_steps, DEFAULT_SPACE_POINTS, DEFAULT_TIME_STEPS
+from components.funciones import function_option_price
+
+SURFACE_POINTS = 120
+
+layout = html.Div([
+    html.H1("Valoración por Diferencias Finitas", className="text-center title"),
+    html.Div(className="input-container", children=[
+        html.Div(className="input-group", children=[
+            html.Label('Precio del activo subyacente:', className="input-label"),
+            dcc.Input(id='fd-spot', type='number', placeholder='Ingrese precio del activo subyacente', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Precio del ejercicio:', className="input-label"),
+            dcc.Input(id='fd-strike', type='number', placeholder='Ingrese precio del ejercicio', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Tasa de interés (%):', className="input-label"),
+            dcc.Input(id='fd-rate', type='number', placeholder='Ingrese tasa de interés', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Volatilidad (%):', className="input-label"),
+            dcc.Input(id='fd-volatility', type='number', placeholder='Ingrese volatilidad', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Fecha actual:', className="input-label"),
+            dcc.DatePickerSingle(id='fd-date-value', date=datetime.today().date(), className="date-picker"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Fecha de vencimiento:', className="input-label"),
+            dcc.DatePickerSingle(id='fd-date-expiration', date=None, className="date-picker"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Tipo de opción:', className="input-label"),
+            dcc.Dropdown(
+                id='fd-option-type',
+                options=[
+                    {'label': 'Call', 'value': 'call'},
+                    {'label': 'Put', 'value': 'put'}
+                ],
+                value='call',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Estilo de ejercicio:', className="input-label"),
+            dcc.Dropdown(
+                id='fd-exercise-style',
+                options=[
+                    {'label': 'Europea', 'value': 'european'},
+                    {'label': 'Americana', 'value': 'american'}
+                ],
+                value='european',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Esquema:', className="input-label"),
+            dcc.Dropdown(
+                id='fd-scheme',
+                options=[
+                    {'label': 'Crank-Nicolson', 'value': 'crank-nicolson'},
+                    {'label': 'Implícito', 'value': 'implicit'},
+                    {'label': 'Explícito', 'value': 'explicit'}
+                ],
+                value='crank-nicolson',
+                className="dropdown"
+            ),
+            html.Div(id='fd-scheme-warning'),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Nodos de precio:', className="input-label"),
+            dcc.Input(id='fd-space-points', type='number', value=DEFAULT_SPACE_POINTS, min=10, step=1, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Pasos de tiempo:', className="input-label"),
+            dcc.Input(id='fd-time-steps', type='number', value=DEFAULT_TIME_STEPS, min=10, step=1, className="input-field"),
+        ]),
+        html.Div(id='fd-error-message', className="error-message-container"),
+        html.Button('Resolver EDP', id='fd-button-solve', n_clicks=0, className="calculate-button"),
+    ]),
+    html.Div(id='fd-output-price', className="output-container"),
+    dcc.Graph(id='fd-surface-graph', className="output-container"),
+], className="container")
+
+
+def _error(title, message):
+    return html.Div([
+        html.H4(title, style={'color': 'red'}),
+        html.P(message, style={'color': 'red'})
+    ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+
+
+@callback(
+    Output('fd-scheme-warning', 'children'),
+    Input('fd-scheme', 'value'),
+    Input('fd-space-points', 'value'),
+    Input('fd-time-steps', 'value'),
+    Input('fd-spot', 'value'),
+    Input('fd-strike', 'value'),
+    Input('fd-rate', 'value'),
+    Input('fd-volatility', 'value'),
+    Input('fd-date-value', 'date'),
+    Input('fd-date-expiration', 'date'),
+)
+def warn_explicit_scheme(scheme, space_points, time_steps, spot, strike, rate, volatility, date_value, date_expiration):
+    if scheme != 'explicit':
+        return None
+    if None in (space_points, spot, strike, rate, volatility, date_value, date_expiration):
+        return html.P("El esquema explícito solo es estable con muchos más pasos de tiempo que los otros esquemas "
+                      "(crecen con el cuadrado de los nodos de precio).", style={'color': 'darkorange'})
+    T = (datetime.strptime(date_expiration, '%Y-%m-%d') - datetime.strptime(date_value, '%Y-%m-%d')).days / 365.25
+    if T <= 0 or int(space_points) < 2:
+        return None
+    needed = explicit_time_steps(spot, strike, rate / 100, T, volatility / 100, int(space_points))
+    if time_steps is not None and int(time_steps) >= needed:
+        return None
+    return html.P(f"Con {int(space_points)} nodos de precio el esquema explícito necesita al menos {needed:,} pasos de "
+                  "tiempo; reduzca los nodos de precio o use Crank-Nicolson.", style={'color': 'darkorange'})
+
+
+@callback(
+    [Output('fd-surface-graph', 'figure'),
+     Output('fd-output-price', 'children'),
+     Output('fd-error-message', 'children')],
+    Input('fd-button-solve', 'n_clicks'),
+    State('fd-spot', 'value'),
+    State('fd-strike', 'value'),
+    State('fd-rate', 'value'),
+    State('fd-volatility', 'value'),
+    State('fd-date-value', 'date'),
+    State('fd-date-expiration', 'date'),
+    State('fd-option-type', 'value'),
+    State('fd-exercise-style', 'value'),
+    State('fd-scheme', 'value'),
+    State('fd-space-points', 'value'),
+    State('fd-time-steps', 'value'),
+    prevent_initial_call=True
+)
+def solve_pde(n_clicks, spot, strike, rate, volatility, date_value, date_expiration, option_type, exercise_style, scheme,
+              space_points, time_steps):
+    missing_fields = []
+    if spot is None:
+        missing_fields.append("Precio al contado inicial")
+    if strike is None:
+        missing_fields.append("Precio de ejercicio")
+    if rate is None:
+        missing_fields.append("Tasa de interés")
+    if volatility is None:
+        missing_fields.append("Volatilidad")
+    if date_value is None or date_expiration is None:
+        missing_fields.append("Fechas (actual y de vencimiento)")
+    if space_points is None or time_steps is None:
+        missing_fields.append("Tamaño de la malla")
+    if missing_fields:
+        return go.Figure(), html.Div(), _error("Error de entrada:", "Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields))
+
+    date_value = datetime.strptime(date_value, '%Y-%m-%d')
+    date_expiration = datetime.strptime(date_expiration, '%Y-%m-%d')
+    if date_expiration <= date_value:
+        return go.Figure(), html.Div(), _error("Error de Fecha:", "La fecha de vencimiento debe ser posterior a la fecha actual.")
+
+    T = (date_expiration - date_value).days / 365.25
+    rate /= 100
+    volatility /= 100
+    american = exercise_style == 'american'
+    try:
+        result = fd_price(spot, strike, rate, T, volatility, option_type, american, scheme, int(space_points), int(time_steps))
+    except ValueError as e:
+        return go.Figure(), html.Div(), _error("Error del esquema:", str(e))
+
+    grid = result['grid']
+    S, tau, V = grid['S'], grid['tau'], grid['V']
+    # La malla completa sale de una sola resolución; para el gráfico se toma una submalla hasta 2 * max(K, S0)
+    visible = np.flatnonzero(S <= 2 * max(strike, spot))
+    columns = np.unique(np.linspace(visible[0], visible[-1], SURFACE_POINTS).astype(int))
+    rows = np.unique(np.linspace(0, tau.size - 1, SURFACE_POINTS).astype(int))
+    fig = go.Figure(go.Surface(x=S[columns], y=T - tau[rows], z=V[np.ix_(rows, columns)], colorscale='Viridis',
+                               colorbar=dict(title='V(S, t)')))
+    fig.update_layout(title=f'Valor de la opción {option_type} {"americana" if american else "europea"} en toda la malla',
+                      scene=dict(xaxis_title='Precio del activo subyacente', yaxis_title='Tiempo transcurrido (años)',
+                                 zaxis_title='Valor de la opción'))
+
+    black_scholes = function_option_price(spot, strike, rate, T, volatility, option_type)
+    output = html.Div([
+        html.H4("Resultado de la Valoración:"),
+        html.P(f"Precio por diferencias finitas ({scheme}, malla {S.size} x {tau.size}): {result['price']:.4f}"),
+        html.P(f"Delta: {result['delta']:.4f} | Gamma: {result['gamma']:.6f}"),
+        html.P(f"Precio Black-Scholes europeo de referencia: {black_scholes:.4f}"
+               + (f" (prima por ejercicio anticipado: {result['price'] - black_scholes:.4f})" if american else "")),
+    ])
+    return fig, output, html.Div()
@@ -0,0 +1,335 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import diskcache
+from dash._callback import GLOBAL_CALLBACK_MAP
+from dash.exceptions import PreventUpdate
+from flask import Response
+
+from components.cache import cache_stats
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600)
+PROFILE_INTERVAL = 0.005
+
+_lock = threading.Lock()
+_callbacks = {}
+_kernels = {}
+_imports = {}
+_request_state = threading.local()
+_job_store = None
+
+
+def _new_histogram(buckets):
+    return {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+
+def _observe(histogram, value):
+    for i, bound in enumerate(histogram['buckets']):
+        if value <= bound:
+            histogram['counts'][i] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+def _new_callback_metrics():
+    return {
+        'latency': _new_histogram(LATENCY_BUCKETS), 'size': _new_histogram(SIZE_BUCKETS),
+        'kernel_seconds': 0.0, 'render_seconds': 0.0, 'errors': 0,
+    }
+
+
+def _background_store():
+    """
+    Abre (una vez por proceso) el almacén en disco donde los trabajos en segundo plano dejan sus métricas.
+
+    Los trabajos de DiskcacheManager se ejecutan en procesos hijos, así que sus tiempos no
+    pueden acumularse en la memoria del servidor; diskcache serializa las escrituras de todos
+    los procesos con transacciones de SQLite.
+    """
+
+    global _job_store
+    if _job_store is None:
+        directory = os.path.join(os.environ.get("TFG_JOBS_CACHE_DIR", "./cache"), 'metricas')
+        _job_store = diskcache.Cache(directory)
+    return _job_store
+
+
+def reset_metrics():
+    """
+    Borra todas las métricas acumuladas, incluidas las de los trabajos en segundo plano.
+    """
+
+    with _lock:
+        _callbacks.clear()
+        _kernels.clear()
+    _background_store().clear()
+
+
+def record_import(name, seconds, rss_delta):
+    """
+    Anota cuánto ha tardado y cuánta memoria residente ha añadido la carga de un módulo o del arranque.
+
+    Parámetros:
+        name (str): Módulo o fase del arranque.
+        seconds (float): Segundos empleados.
+        rss_delta (int): Bytes de memoria residente añadidos.
+    """
+
+    with _lock:
+        _imports[name] = {'seconds': seconds, 'rss_delta': rss_delta}
+
+
+def import_report():
+    """
+    Devuelve una copia de los tiempos y memoria de carga anotados con record_import.
+    """
+
+    with _lock:
+        return {name: dict(values) for name, values in _imports.items()}
+
+
+def timed_kernel(function):
+    """
+    Decorador que mide el tiempo de un núcleo de cálculo y lo acumula en el callback en curso.
+
+    Solo cuenta la llamada más externa: si un núcleo llama a otro (por ejemplo
+    function_option_price a batch_option_price) el tiempo no se suma dos veces.
+    """
+
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_request_state, 'kernel_depth', 0)
+        _request_state.kernel_depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_state.kernel_depth = depth
+            if depth == 0:
+                _request_state.kernel_seconds = getattr(_request_state, 'kernel_seconds', 0.0) + elapsed
+                with _lock:
+                    _observe(_kernels.setdefault(name, _new_histogram(LATENCY_BUCKETS)), elapsed)
+
+    return wrapper
+
+
+def _frame_name(frame):
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def _sample_stacks(thread_id, stop, interval, samples):
+    """
+    Muestrea periódicamente la pila del hilo indicado y cuenta las pilas plegadas (raíz;...;hoja).
+    """
+
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_name(frame))
+            frame = frame.f_back
+        if stack:
+            samples[';'.join(reversed(stack))] += 1
+
+
+def _dump_profile(name, samples, directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.folded")
+    with open(path, 'w') as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+def instrument_callback(function, name):
+    """
+    Envuelve un callback de Dash para medir latencia, tamaño de la respuesta y tiempo en núcleos.
+
+    La función envuelta es la que Dash guarda en callback_map, que devuelve la respuesta ya
+    serializada en JSON, así que su longitud es el tamaño enviado al navegador. El tiempo que
+    no se pasa en núcleos de cálculo (ver timed_kernel) se atribuye a construir figuras y
+    componentes. Si la variable de entorno TFG_PROFILE_SLOW_MS está definida, se muestrea la
+    pila del callback y, cuando tarda más de ese umbral, se guardan las pilas plegadas
+    (formato de flamegraph.pl y speedscope) en TFG_PROFILE_DIR.
+
+    Los callbacks en segundo plano no se envuelven aquí: en el servidor solo se vería el
+    lanzamiento y el sondeo del trabajo. Se miden dentro del trabajo con timed_background_job.
+
+    Parámetros:
+        function (callable): Función registrada en callback_map.
+        name (str): Nombre con el que se publican sus métricas.
+
+    Devuelve:
+        callable: Función envuelta.
+    """
+
+    if getattr(function, '_instrumented', False):
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        threshold_ms = os.environ.get('TFG_PROFILE_SLOW_MS')
+        sampler = None
+        if threshold_ms:
+            samples, stop = Counter(), threading.Event()
+            sampler = threading.Thread(target=_sample_stacks, daemon=True,
+                                       args=(threading.get_ident(), stop, PROFILE_INTERVAL, samples))
+            sampler.start()
+
+        _request_state.kernel_seconds = 0.0
+        start = time.perf_counter()
+        response, failed = None, False
+        try:
+            response = function(*args, **kwargs)
+            return response
+        except PreventUpdate:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            kernel_seconds = min(_request_state.kernel_seconds, elapsed)
+            if sampler is not None:
+                stop.set()
+                sampler.join()
+                if elapsed * 1000 >= float(threshold_ms) and samples:
+                    _dump_profile(name, samples, os.environ.get('TFG_PROFILE_DIR', './profiles'))
+            with _lock:
+                metrics = _callbacks.setdefault(name, _new_callback_metrics())
+                _observe(metrics['latency'], elapsed)
+                if isinstance(response, (str, bytes)):
+                    _observe(metrics['size'], len(response))
+                metrics['kernel_seconds'] += kernel_seconds
+                metrics['render_seconds'] += elapsed - kernel_seconds
+                metrics['errors'] += failed
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def timed_background_job(function):
+    """
+    Decorador para la función de un callback en segundo plano: mide el trabajo en el proceso hijo.
+
+    Se coloca debajo de @callback(..., background=True). Anota la latencia, el tiempo en
+    núcleos y los errores del trabajo en el almacén compartido (ver _background_store), y
+    render_metrics los publica con el resto de callbacks. El tamaño de la respuesta no se mide.
+    """
+
+    name = f"{function.__module__}.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _request_state.kernel_seconds = 0.0
+        start = time.perf_counter()
+        failed = False
+        try:
+            return function(*args, **kwargs)
+        except PreventUpdate:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            kernel_seconds = min(_request_state.kernel_seconds, elapsed)
+            store = _background_store()
+            with store.transact():
+                metrics = store.get(name) or _new_callback_metrics()
+                _observe(metrics['latency'], elapsed)
+                metrics['kernel_seconds'] += kernel_seconds
+                metrics['render_seconds'] += elapsed - kernel_seconds
+                metrics['errors'] += failed
+                store.set(name, metrics)
+
+    return wrapper
+
+
+def instrument_callbacks(*callback_maps):
+    """
+    Instrumenta todos los callbacks registrados en los callback_map indicados (por defecto los globales).
+
+    Es idempotente, por lo que puede volver a llamarse cuando se registran callbacks nuevos.
+    Los callbacks en el navegador (clientside) no pasan por el servidor y se omiten, igual que
+    los callbacks en segundo plano, que se miden con timed_background_job.
+    """
+
+    for callback_map in callback_maps or (GLOBAL_CALLBACK_MAP,):
+        for entry in callback_map.values():
+            if 'callback' not in entry or entry.get('long'):
+                continue
+            function = entry['callback']
+            entry['callback'] = instrument_callback(function, f"{function.__module__}.{function.__name__}")
+
+
+def _histogram_lines(metric, label, value, histogram):
+    lines = []
+    for bound, count in zip(histogram['buckets'], histogram['counts']):
+        lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound:g}"}} {count}')
+    lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {histogram["count"]}')
+    lines.append(f'{metric}_sum{{{label}="{value}"}} {histogram["sum"]:.6f}')
+    lines.append(f'{metric}_count{{{label}="{value}"}} {histogram["count"]}')
+    return lines
+
+
+def render_metrics():
+    """
+    Devuelve todas las métricas en el formato de texto de Prometheus.
+    """
+
+    store = _background_store()
+    background = {name: store.get(name) for name in store}
+    lines = []
+    with _lock:
+        callbacks = {**_callbacks, **{name: metrics for name, metrics in background.items() if metrics is not None}}
+        lines += ['# HELP tfg_callback_latency_seconds Latencia de los callbacks de Dash.',
+                  '# TYPE tfg_callback_latency_seconds histogram']
+        for name, metrics in sorted(callbacks.items()):
+            lines += _histogram_lines('tfg_callback_latency_seconds', 'callback', name, metrics['latency'])
+        lines += ['# HELP tfg_callback_response_bytes Tamaño de la respuesta JSON de los callbacks.',
+                  '# TYPE tfg_callback_response_bytes histogram']
+        for name, metrics in sorted(callbacks.items()):
+            lines += _histogram_lines('tfg_callback_response_bytes', 'callback', name, metrics['size'])
+        for metric, key, description in (
+                ('tfg_callback_kernel_seconds_total', 'kernel_seconds', 'Tiempo de los callbacks dentro de los núcleos de cálculo.'),
+                ('tfg_callback_render_seconds_total', 'render_seconds', 'Tiempo de los callbacks fuera de los núcleos (figuras y componentes).'),
+                ('tfg_callback_errors_total', 'errors', 'Callbacks terminados con una excepción.')):
+            lines += [f'# HELP {metric} {description}', f'# TYPE {metric} counter']
+            lines += [f'{metric}{{callback="{name}"}} {metrics[key]:g}' for name, metrics in sorted(callbacks.items())]
+        lines += ['# HELP tfg_kernel_seconds Duración de las llamadas a los núcleos de cálculo.',
+                  '# TYPE tfg_kernel_seconds histogram']
+        for name, histogram in sorted(_kernels.items()):
+            lines += _histogram_lines('tfg_kernel_seconds', 'kernel', name, histogram)
+
+        lines += ['# HELP tfg_import_seconds Tiempo de carga del arranque y de cada página.',
+                  '# TYPE tfg_import_seconds gauge']
+        lines += [f'tfg_import_seconds{{module="{name}"}} {values["seconds"]:.6f}' for name, values in sorted(_imports.items())]
+        lines += ['# HELP tfg_import_rss_bytes Memoria residente añadida por el arranque y por cada página.',
+                  '# TYPE tfg_import_rss_bytes gauge']
+        lines += [f'tfg_import_rss_bytes{{module="{name}"}} {values["rss_delta"]}' for name, values in sorted(_imports.items())]
+
+    stats = cache_stats()
+    for key in ('hits', 'misses', 'bypasses', 'evictions', 'expirations'):
+        lines += [f'# TYPE tfg_pricing_cache_{key}_total counter', f'tfg_pricing_cache_{key}_total {stats[key]}']
+    for key in ('entries', 'bytes'):
+        lines += [f'# TYPE tfg_pricing_cache_{key} gauge', f'tfg_pricing_cache_{key} {stats[key]}']
+    return '\n'.join(lines) + '\n'
+
+
+def register_metrics_route(server, path='/metrics'):
+    """
+    Publica render_metrics en la ruta indicada del servidor Flask de la aplicación.
+    """
+
+    server.add_url_rule(path, 'metrics', lambda: Response(render_metrics(), mimetype='text/plain; version=0.0.4'))
@@ -0,0 +1,81 @@
+from dash import html, dcc, clientside_callback, ClientsideFunction, Input, Output, State
+
+
+def live_panel(prefix):
+    """
+    Construye el modo en vivo de una página de Black-Scholes: un selector y un panel oculto con
+    deslizadores de subyacente, volatilidad, tasa y vencimiento, un gráfico y las griegas.
+
+    Todo el panel se calcula en el navegador con assets/black_scholes.js, así que mover un
+    deslizador no genera ninguna petición al servidor.
+
+    Parámetros:
+        prefix (str): Prefijo de los identificadores de la página.
+
+    Devuelve:
+        dash.html.Div: Selector y panel en vivo.
+    """
+
+    def slider(name, label, **kwargs):
+        return html.Div(className="input-group", children=[
+            html.Label(label, className="input-label"),
+            dcc.Slider(id=f'{prefix}-live-{name}', updatemode='drag',
+                       tooltip={'placement': 'bottom', 'always_visible': True}, **kwargs),
+        ])
+
+    return html.Div([
+        dcc.Checklist(
+            id=f'{prefix}-live-mode',
+            options=[{'label': ' Modo en vivo (cálculo Black-Scholes en el navegador)', 'value': 'live'}],
+            value=[],
+        ),
+        html.Div(id=f'{prefix}-live-panel', style={'display': 'none'}, children=[
+            html.Div(className="input-container", children=[
+                slider('spot', 'Precio del activo subyacente:', min=50, max=150, value=100, marks=None),
+                slider('volatility', 'Volatilidad (%):', min=1, max=100, step=0.5, value=20,
+                       marks={v: f'{v}%' for v in (1, 25, 50, 75, 100)}),
+                slider('rate', 'Tasa de interés (%):', min=-2, max=15, step=0.1, value=5,
+                       marks={v: f'{v}%' for v in (-2, 0, 5, 10, 15)}),
+                slider('expiry', 'Vencimiento (años):', min=0.001, max=5, step=0.0001, value=1,
+                       marks={v: str(v) for v in (1, 2, 3, 4, 5)}),
+            ]),
+            dcc.Graph(id=f'{prefix}-live-graph', className="output-container"),
+            html.Div(id=f'{prefix}-live-greeks', className="output-container"),
+        ]),
+    ])
+
+
+def register_live_panel(prefix, figure_function, spot, strike, rate, volatility, date_value, date_expiration,
+                        option_type, extra_inputs=()):
+    """
+    Registra los callbacks en el navegador del panel creado con live_panel.
+
+    Parámetros:
+        prefix (str): Prefijo usado en live_panel.
+        figure_function (str): Función de dash_clientside.black_scholes que dibuja el gráfico.
+        spot, strike, rate, volatility, date_value, date_expiration, option_type: Identificadores de
+            los campos del formulario de la página; volatility puede ser None si la página no lo tiene.
+        extra_inputs (sequence of dash.Input): Entradas adicionales que recibe figure_function.
+    """
+
+    clientside_callback(
+        ClientsideFunction(namespace='black_scholes', function_name='sync_live_controls'),
+        [Output(f'{prefix}-live-panel', 'style'),
+         Output(f'{prefix}-live-spot', 'min'), Output(f'{prefix}-live-spot', 'max'), Output(f'{prefix}-live-spot', 'value'),
+         Output(f'{prefix}-live-volatility', 'value'), Output(f'{prefix}-live-rate', 'value'),
+         Output(f'{prefix}-live-expiry', 'value')],
+        Input(f'{prefix}-live-mode', 'value'),
+        State(spot, 'value'), State(strike, 'value'), State(rate, 'value'),
+        State(volatility, 'value') if volatility else State(f'{prefix}-live-volatility', 'value'),
+        State(date_value, 'date'), State(date_expiration, 'date'),
+        prevent_initial_call=True
+    )
+
+    clientside_callback(
+        ClientsideFunction(namespace='black_scholes', function_name=figure_function),
+        [Output(f'{prefix}-live-graph', 'figure'), Output(f'{prefix}-live-greeks', 'children')],
+        Input(f'{prefix}-live-spot', 'value'), Input(f'{prefix}-live-volatility', 'value'),
+        Input(f'{prefix}-live-rate', 'value'), Input(f'{prefix}-live-expiry', 'value'),
+        Input(strike, 'value'), Input(option_type, 'value'),
+        *extra_inputs
+    )
@@ -0,0 +1,324 @@
+import numpy as np
+from scipy.linalg.blas import get_blas_funcs
+from components.cache import memoize_pricing
+from components.funciones import batch_option_price, _path_blocks
+from components.metricas import timed_kernel
+
+POSITION_COLUMNS = ('asset', 'type', 'strike', 'expiry', 'quantity')
+POSITION_TYPES = ('call', 'put', 'stock')
+DEFAULT_MEMORY_BUDGET = 256 * 1024 ** 2
+TIME_BLOCK_STEPS = 16
+SEED_BLOCK_PATHS = 1024
+CORRELATION_TOLERANCE = 1e-8
+
+
+@memoize_pricing()
+def correlation_factor(correlation):
+    """
+    Factoriza una matriz de correlación como C = L L^T con L triangular inferior (Cholesky).
+
+    La factorización se hace una sola vez por matriz: el resultado queda en la caché de
+    valoración y las simulaciones siguientes con la misma matriz lo reutilizan. Si la matriz
+    es semidefinida pero singular (por ejemplo, dos activos con correlación 1), se añade a la
+    diagonal el mínimo necesario para que Cholesky sea estable.
+
+    Parámetros:
+        correlation (numpy.ndarray): Matriz (activos, activos) simétrica, con unos en la diagonal.
+
+    Devuelve:
+        numpy.ndarray: Factor triangular inferior L.
+    """
+
+    C = np.asarray(correlation, dtype=float)
+    if C.ndim != 2 or C.shape[0] != C.shape[1]:
+        raise ValueError("La matriz de correlación debe ser cuadrada.")
+    if not np.allclose(C, C.T, atol=CORRELATION_TOLERANCE):
+        raise ValueError("La matriz de correlación debe ser simétrica.")
+    if not np.allclose(np.diag(C), 1.0, atol=CORRELATION_TOLERANCE) or np.abs(C).max() > 1 + CORRELATION_TOLERANCE:
+        raise ValueError("La matriz de correlación debe tener unos en la diagonal y valores entre -1 y 1.")
+
+    try:
+        return np.linalg.cholesky(C)
+    except np.linalg.LinAlgError:
+        pass
+    smallest = np.linalg.eigvalsh(C)[0]
+    if smallest < -np.sqrt(CORRELATION_TOLERANCE) * C.shape[0]:
+        raise ValueError(f"La matriz de correlación no es semidefinida positiva (autovalor mínimo {smallest:.4g}).")
+    jitter = max(-smallest, 0.0) + CORRELATION_TOLERANCE
+    L = np.linalg.cholesky(C + jitter * np.eye(C.shape[0]))
+    # Se reescalan las filas para que la diagonal de L L^T vuelva a ser exactamente 1
+    return L / np.linalg.norm(L, axis=1, keepdims=True)
+
+
+def constant_correlation(assets, rho):
+    """
+    Matriz de correlación con el mismo coeficiente rho entre todos los pares de activos.
+    """
+
+    C = np.full((assets, assets), float(rho))
+    np.fill_diagonal(C, 1.0)
+    return C
+
+
+def _lines(text):
+    for number, line in enumerate((text or '').splitlines(), start=1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, [field.strip() for field in line.replace(';', ',').split(',')]
+
+
+def parse_assets(text):
+    """
+    Interpreta los subyacentes escritos como uno por línea: nombre, precio, volatilidad (%).
+
+    Ejemplo de línea: "ACME, 100, 25". Las líneas vacías y las que empiezan por '#' se ignoran.
+
+    Devuelve:
+        tuple: (lista de nombres, array de precios, array de volatilidades en tanto por uno).
+    """
+
+    names, spots, volatilities = [], [], []
+    for number, fields in _lines(text):
+        if len(fields) != 3:
+            raise ValueError(f"Línea {number}: se esperaban 3 campos (nombre, precio, volatilidad).")
+        try:
+            spot, volatility = float(fields[1]), float(fields[2]) / 100
+        except ValueError as e:
+            raise ValueError(f"Línea {number}: {e}") from e
+        if spot <= 0 or volatility <= 0:
+            raise ValueError(f"Línea {number}: el precio y la volatilidad deben ser positivos.")
+        names.append(fields[0])
+        spots.append(spot)
+        volatilities.append(volatility)
+    if not names:
+        raise ValueError("No se ha indicado ningún subyacente.")
+    if len(set(names)) != len(names):
+        raise ValueError("Los nombres de los subyacentes deben ser distintos.")
+    return names, np.array(spots), np.array(volatilities)
+
+
+def parse_correlation(text, assets):
+    """
+    Interpreta una matriz de correlación escrita como una fila por línea con valores separados por comas.
+
+    Devuelve:
+        numpy.ndarray: Matriz (assets, assets).
+    """
+
+    try:
+        rows = [[float(value) for value in fields] for _, fields in _lines(text)]
+    except ValueError as e:
+        raise ValueError(f"Matriz de correlación: {e}") from e
+    if len(rows) != assets or any(len(row) != assets for row in rows):
+        raise ValueError(f"La matriz de correlación debe tener {assets} filas de {assets} valores.")
+    return np.array(rows)
+
+
+def parse_positions(text, names):
+    """
+    Interpreta las posiciones escritas como una por línea: activo, tipo, ejercicio, vencimiento, cantidad.
+
+    El activo es su nombre (o su número de línea empezando en 1), el tipo 'call', 'put' o 'stock'
+    (el ejercicio de una acción se ignora) y el vencimiento está en años. Ejemplo: "ACME, call, 105, 0.5, -2".
+
+    Devuelve:
+        dict: Columnas de POSITION_COLUMNS para simulate_portfolio.
+    """
+
+    index = {name: i for i, name in enumerate(names)}
+    positions = {column: [] for column in POSITION_COLUMNS}
+    for number, fields in _lines(text):
+        if len(fields) != 5:
+            raise ValueError(f"Línea {number}: se esperaban 5 campos (activo, tipo, ejercicio, vencimiento, cantidad).")
+        name, kind = fields[0], fields[1].lower()
+        if name in index:
+            asset = index[name]
+        elif name.isdigit() and 1 <= int(name) <= len(names):
+            asset = int(name) - 1
+        else:
+            raise ValueError(f"Línea {number}: subyacente desconocido '{name}'.")
+        if kind not in POSITION_TYPES:
+            raise ValueError(f"Línea {number}: tipo desconocido '{kind}' (se esperaba call, put o stock).")
+        try:
+            strike, expiry, quantity = (float(field) for field in fields[2:])
+        except ValueError as e:
+            raise ValueError(f"Línea {number}: {e}") from e
+        for column, value in zip(POSITION_COLUMNS, (asset, kind, strike, expiry, quantity)):
+            positions[column].append(value)
+    if not positions['asset']:
+        raise ValueError("La cartera no tiene posiciones.")
+    return positions
+
+
+def _position_arrays(positions, assets):
+    """
+    Convierte las posiciones (diccionario de columnas POSITION_COLUMNS) en arrays y las valida.
+    """
+
+    missing = [column for column in POSITION_COLUMNS if column not in positions]
+    if missing:
+        raise ValueError(f"Faltan columnas en las posiciones: {', '.join(missing)}")
+    asset = np.asarray(positions['asset'], dtype=int)
+    kind = np.asarray(positions['type'], dtype=str)
+    strike = np.asarray(positions['strike'], dtype=float)
+    expiry = np.asarray(positions['expiry'], dtype=float)
+    quantity = np.asarray(positions['quantity'], dtype=float)
+    if asset.size == 0:
+        raise ValueError("La cartera no tiene posiciones.")
+    if asset.min() < 0 or asset.max() >= assets:
+        raise ValueError(f"Los índices de activo deben estar entre 0 y {assets - 1}.")
+    unknown = set(kind) - set(POSITION_TYPES)
+    if unknown:
+        raise ValueError(f"Tipos de posición desconocidos: {sorted(unknown)}")
+    return asset, kind, strike, expiry, quantity
+
+
+def _portfolio_value(S, elapsed, rate, volatilities, asset, kind, strike, expiry, quantity):
+    """
+    Valora la cartera en todas las trayectorias a la vez: una evaluación Black-Scholes (trayectorias x opciones).
+
+    Las opciones que vencen justo en elapsed valen su valor intrínseco (batch_option_price con T = 0).
+    """
+
+    options = kind != 'stock'
+    value = S[:, asset[~options]] @ quantity[~options]
+    if options.any():
+        prices = batch_option_price.__wrapped__(S[:, asset[options]], strike[options], rate, expiry[options] - elapsed,
+                                                volatilities[asset[options]], kind[options])
+        value = value + prices @ quantity[options]
+    return value
+
+
+def chunk_paths(assets, positions, time_block, itemsize=8, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Número de trayectorias por bloque para que la simulación respete memory_budget.
+
+    Cada trayectoria del bloque ocupa los shocks de un bloque de tiempo (time_block x activos),
+    su vector de log-precios y los temporales de la revaloración (unos 12 arrays de una
+    posición por opción, en float64).
+    """
+
+    per_path = itemsize * (time_block * assets + 2 * assets) + 8 * 12 * positions
+    return max(1, int(memory_budget // per_path))
+
+
+@memoize_pricing(require_seed=True, ignore=('progress_callback',))
+@timed_kernel
+def simulate_portfolio(spots, volatilities, correlation, rate, positions, horizon, steps=1, paths=10_000, seed=None,
+                       dtype=np.float64, memory_budget=DEFAULT_MEMORY_BUDGET, progress_callback=None):
+    """
+    Simula por Monte Carlo una cartera de opciones sobre varios subyacentes correlacionados.
+
+    Los subyacentes siguen movimientos brownianos geométricos correlacionados. Las trayectorias
+    se procesan en bloques cuyo tamaño se calcula (chunk_paths) para no superar memory_budget,
+    así que 500 activos x 100.000 trayectorias caben en unos cientos de MiB. Dentro de cada
+    bloque los pasos se agrupan de TIME_BLOCK_STEPS en TIME_BLOCK_STEPS: los shocks
+    independientes de todo el grupo se generan de una vez y se correlacionan con una única
+    multiplicación por el factor de Cholesky (cacheado con correlation_factor), hecha en el
+    sitio con la rutina BLAS trmm, que aprovecha que L es triangular. Tras cada paso la
+    cartera se revalora con Black-Scholes en todas las trayectorias del bloque a la vez.
+
+    El movimiento browniano geométrico es exacto con cualquier número de pasos: steps solo
+    fija en cuántas fechas intermedias se revalora la cartera.
+
+    Cada grupo de SEED_BLOCK_PATHS trayectorias tiene su propio generador derivado de la
+    semilla y sus shocks se generan paso a paso, y los bloques de trabajo son siempre grupos
+    enteros: el resultado para una semilla no depende del tamaño de bloque ni de memory_budget.
+
+    Parámetros:
+        spots (array-like): Precio actual de cada activo.
+        volatilities (array-like): Volatilidad anual de cada activo.
+        correlation (numpy.ndarray): Matriz de correlación (activos, activos).
+        rate (float): Tasa de interés libre de riesgo (anual).
+        positions (dict): Columnas de POSITION_COLUMNS: índice del activo, tipo ('call', 'put' o
+            'stock'), precio de ejercicio, vencimiento en años desde hoy (no anterior a horizon) y cantidad.
+        horizon (float): Horizonte de la simulación en años.
+        steps (int): Fechas de revaloración entre hoy y el horizonte.
+        paths (int): Número de trayectorias.
+        seed (int, opcional): Semilla del generador aleatorio para obtener resultados reproducibles.
+        dtype (numpy.dtype): np.float64 o np.float32 para los shocks y los log-precios.
+        memory_budget (int): Memoria máxima en bytes para los bloques de trabajo.
+        progress_callback (callable, opcional): Función llamada con (bloques_terminados, bloques_totales).
+
+    Devuelve:
+        dict: 'times' (steps + 1), 'values' (matriz (steps + 1, paths) con el valor de la cartera),
+        'initial_value', 'pnl' (al horizonte, por trayectoria) y 'chunk_size'.
+    """
+
+    spots = np.asarray(spots, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    assets = spots.size
+    if volatilities.shape != (assets,):
+        raise ValueError("Debe haber una volatilidad por activo.")
+    L = correlation_factor(np.asarray(correlation, dtype=float))
+    if L.shape != (assets, assets):
+        raise ValueError(f"La matriz de correlación debe ser de {assets} x {assets}.")
+    asset, kind, strike, expiry, quantity = _position_arrays(positions, assets)
+    if (expiry[kind != 'stock'] < horizon).any():
+        raise ValueError("Las opciones deben vencer en el horizonte de la simulación o después.")
+
+    dtype = np.dtype(dtype)
+    L = L.astype(dtype)
+    trmm = get_blas_funcs('trmm', (L,))
+    time_block = min(steps, TIME_BLOCK_STEPS)
+    seed_blocks = _path_blocks(paths, SEED_BLOCK_PATHS, seed)
+    seed_blocks_per_chunk = max(1, chunk_paths(assets, asset.size, time_block, dtype.itemsize, memory_budget) // SEED_BLOCK_PATHS)
+    chunk_size = min(seed_blocks_per_chunk * SEED_BLOCK_PATHS, paths)
+    chunks = [seed_blocks[i:i + seed_blocks_per_chunk] for i in range(0, len(seed_blocks), seed_blocks_per_chunk)]
+
+    dt = horizon / steps
+    times = np.linspace(0.0, horizon, steps + 1)
+    drift = ((rate - 0.5 * volatilities ** 2) * dt).astype(dtype)
+    diffusion = (volatilities * np.sqrt(dt)).astype(dtype)
+    initial_value = float(_portfolio_value(spots[np.newaxis], 0.0, rate, volatilities, asset, kind, strike, expiry, quantity)[0])
+
+    values = np.empty((steps + 1, paths))
+    values[0] = initial_value
+    shocks = np.empty((time_block * chunk_size, assets), dtype=dtype)
+    for done, chunk in enumerate(chunks, start=1):
+        first = chunk[0][0].start
+        columns = slice(first, chunk[-1][0].stop)
+        size = columns.stop - first
+        generators = [(slice(part.start - first, part.stop - first), np.random.default_rng(seed_sequence))
+                      for part, seed_sequence in chunk]
+        log_prices = np.tile(np.log(spots).astype(dtype), (size, 1))
+        for start in range(0, steps, time_block):
+            block_steps = min(time_block, steps - start)
+            block = shocks[:block_steps * size]
+            by_step = block.reshape(block_steps, size, assets)
+            # Cada grupo rellena sus filas de cada paso, que son contiguas, con su propio generador
+            for j in range(block_steps):
+                for rows, rng in generators:
+                    rng.standard_normal(out=by_step[j, rows], dtype=dtype)
+            # block.T es F-contigua, así que trmm calcula L @ block.T en el sitio: una sola
+            # multiplicación correlaciona todos los pasos y trayectorias del grupo
+            correlated = trmm(1.0, L, block.T, lower=1, overwrite_b=1)
+            if not np.shares_memory(correlated, block):
+                block[...] = correlated.T
+            increments = block.reshape(block_steps, size, assets)
+            increments *= diffusion
+            increments += drift
+            for j in range(block_steps):
+                log_prices += increments[j]
+                values[start + j + 1, columns] = _portfolio_value(np.exp(log_prices, dtype=float), times[start + j + 1], rate,
+                                                                  volatilities, asset, kind, strike, expiry, quantity)
+        if progress_callback is not None:
+            progress_callback(done, len(chunks))
+
+    return {'times': times, 'values': values, 'initial_value': initial_value, 'pnl': values[-1] - initial_value,
+            'chunk_size': chunk_size}
+
+
+def risk_measures(pnl, confidence=0.99):
+    """
+    Valor en riesgo y expected shortfall de una distribución simulada de pérdidas y ganancias.
+
+    Devuelve:
+        dict: 'mean', 'std', 'var' y 'expected_shortfall' (ambas como pérdidas positivas).
+    """
+
+    pnl = np.asarray(pnl)
+    threshold = np.quantile(pnl, 1 - confidence)
+    tail = pnl[pnl <= threshold]
+    return {'mean': float(pnl.mean()), 'std': float(pnl.std(ddof=1)) if pnl.size > 1 else 0.0,
+            'var': float(-threshold), 'expected_shortfall': float(-tail.mean())}
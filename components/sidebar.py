@@ -36,6 +36,26 @@ def create_sidebar():
                         href="/option-simulation-comparison",
                         active="exact",
                     ),
+                    dbc.NavLink(
+                        [html.I(className="bx bx-spreadsheet"), html.Span("Valoración Masiva", className="d-none d-md-inline")],
+                        href="/bulk-pricing",
+                        active="exact",
+                    ),
+                    dbc.NavLink(
+                        [html.I(className="bx bx-area"), html.Span("Superficie de Precios", className="d-none d-md-inline")],
+                        href="/price-surface",
+                        active="exact",
+                    ),
+                    dbc.NavLink(
+                        [html.I(className="bx bx-grid-alt"), html.Span("Diferencias Finitas", className="d-none d-md-inline")],
+                        href="/finite-differences",
+                        active="exact",
+                    ),
+                    dbc.NavLink(
+                        [html.I(className="bx bx-network-chart"), html.Span("Carteras Multiactivo", className="d-none d-md-inline")],
+                        href="/multi-asset-portfolio",
+                        active="exact",
+                    ),
                 ],
                 vertical=True,
                 pills=True,
@@ -1,9 +1,16 @@
 from dash import html, dcc, callback, Input, Output, State
 import numpy as np
-import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime
-from components.funciones import simulate_gbm, monte_carlo_option_pricing
+from components.funciones import simulate_gbm, monte_carlo_option_pricing, price_from_paths, PATH_PAYOFFS
+from components.graficos import fan_chart_figure, compact_figure, DEFAULT_MAX_POINTS
+from components.almacen_trayectorias import shared_simulate_gbm, release
+from components.metricas import timed_background_job
+
+PROGRESS_CHUNK_SIZE = 10_000
+FAN_SAMPLE_PATHS = 30
+STRIKE_MULTIPLIERS = (0.9, 1.0, 1.1)
+PATH_TRACE_POINTS = 100
 
 layout = html.Div([
     html.H1("Simulación del Movimiento Browniano Geometrico", className="text-center title"),
@@ -28,6 +35,10 @@ layout = html.Div([
             html.Label('Número de simulaciones:', className="input-label"),
             dcc.Input(id='montecarlo-num-paths', type='number', placeholder='Ingrese numero de simulaciones', className="input-field"),
         ]),
+        html.Div(className="input-group", children=[
+            html.Label('Semilla (opcional, comparte las trayectorias entre sesiones):', className="input-label"),
+            dcc.Input(id='montecarlo-seed', type='number', min=0, step=1, placeholder='Sin semilla', className="input-field"),
+        ]),
         html.Div(className="input-group", children=[
             html.Label('Fecha actual:', className="input-label"),
             dcc.DatePickerSingle(id='montecarlo-date-value', date=datetime.today().date(), className="date-picker"),
@@ -36,8 +47,36 @@ layout = html.Div([
             html.Label('Fecha de vencimiento:', className="input-label"),
             dcc.DatePickerSingle(id='montecarlo-date-expiration', date=None, className="date-picker"),
         ]),
+        html.Div(className="input-group", children=[
+            html.Label('Reducción de varianza:', className="input-label"),
+            dcc.Dropdown(
+                id='montecarlo-method',
+                options=[
+                    {'label': 'Monte Carlo estándar', 'value': 'standard'},
+                    {'label': 'Variables antitéticas', 'value': 'antithetic'},
+                    {'label': 'Variable de control', 'value': 'control'},
+                    {'label': 'Cuasi-aleatorio (Sobol)', 'value': 'sobol'}
+                ],
+                value='standard',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Representación:', className="input-label"),
+            dcc.Dropdown(
+                id='montecarlo-render-mode',
+                options=[
+                    {'label': 'Bandas de percentiles (abanico)', 'value': 'fan'},
+                    {'label': 'Todas las trayectorias', 'value': 'paths'}
+                ],
+                value='fan',
+                className="dropdown"
+            ),
+        ]),
         html.Div(id='montecarlo-error-message', className="error-message-container"),
         html.Button('Simular', id='montecarlo-button-simulate', n_clicks=0, className="calculate-button"),
+        html.Button('Cancelar', id='montecarlo-button-cancel', n_clicks=0, disabled=True, className="calculate-button"),
+        html.Progress(id='montecarlo-progress', value='0', max='1', className="progress-bar-simulation", style={'visibility': 'hidden'})
     ]),
     dcc.Graph(id='montecarlo-simulation-graph', className="output-container"),
     html.Div(id='montecarlo-simulation-conclusion', className="output-container")
@@ -54,9 +93,22 @@ layout = html.Div([
     State('montecarlo-rate', 'value'),
     State('montecarlo-date-value', 'date'),
     State('montecarlo-date-expiration', 'date'),
-    State('montecarlo-num-paths', 'value')
+    State('montecarlo-num-paths', 'value'),
+    State('montecarlo-method', 'value'),
+    State('montecarlo-render-mode', 'value'),
+    State('montecarlo-seed', 'value'),
+    background=True,
+    running=[
+        (Output('montecarlo-button-simulate', 'disabled'), True, False),
+        (Output('montecarlo-button-cancel', 'disabled'), False, True),
+        (Output('montecarlo-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'}),
+    ],
+    cancel=[Input('montecarlo-button-cancel', 'n_clicks')],
+    progress=[Output('montecarlo-progress', 'value'), Output('montecarlo-progress', 'max')],
+    prevent_initial_call=True
 )
-def update_simulation(n_clicks, spot,strike, volatility, rate, date_value, date_expiration, num_paths):
+@timed_background_job
+def update_simulation(set_progress, n_clicks, spot,strike, volatility, rate, date_value, date_expiration, num_paths, method, render_mode, seed):
     if n_clicks > 0:
         missing_fields = []
         if spot is None:
@@ -79,7 +131,7 @@ def update_simulation(n_clicks, spot,strike, volatility, rate, date_value, date_
                 html.H4("Error de entrada:", style={'color': 'red'}),
                 html.P("Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields), style={'color': 'red'})
             ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-            return px.line(), html.Div(), error_message
+            return go.Figure(), html.Div(), error_message
 
         date_value = datetime.strptime(date_value, '%Y-%m-%d')
         date_expiration = datetime.strptime(date_expiration, '%Y-%m-%d')
@@ -88,7 +140,7 @@ def update_simulation(n_clicks, spot,strike, volatility, rate, date_value, date_
                 html.H4("Error de Fecha:", style={'color': 'red'}),
                 html.P("La fecha de vencimiento debe ser posterior a la fecha actual.", style={'color': 'red'})
             ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-            return px.line(), html.Div(), error_message
+            return go.Figure(), html.Div(), error_message
 
         T = (date_expiration - date_value).days / 365
         M = 252  
@@ -97,28 +149,75 @@ def update_simulation(n_clicks, spot,strike, volatility, rate, date_value, date_
         rate = rate / 100
         volatility = volatility / 100
 
-        paths = simulate_gbm(spot, rate, volatility, T, M, I)
-        call_price, put_price = monte_carlo_option_pricing(spot, strike, rate, volatility, T, M, I)
+        # Un único conjunto de trayectorias sirve para el gráfico y para todas las valoraciones.
+        # Este callback corre en un proceso hijo, así que no usa la caché de valoración en memoria:
+        # la reutilización entre peticiones viene del almacén compartido cuando hay semilla
+        progress = lambda done, total: set_progress((str(done), str(total)))
+        if seed is None:
+            paths, key = simulate_gbm(spot, rate, volatility, T, M, I, dtype=np.float32, workers=1,
+                                      chunk_size=PROGRESS_CHUNK_SIZE, progress_callback=progress), None
+        else:
+            # Con semilla el resultado es reproducible: se guarda en el almacén compartido y
+            # cualquier otro worker que reciba la misma petición lo adjunta sin volver a simular
+            paths, key = shared_simulate_gbm(spot, rate, volatility, T, M, I, int(seed), dtype=np.float32, workers=1,
+                                             chunk_size=PROGRESS_CHUNK_SIZE, progress_callback=progress)
+        # La referencia al conjunto compartido se libera aunque falle la valoración o el gráfico;
+        # si no, el almacén nunca podría desalojarlo
+        try:
+            terminal_prices = paths[-1].astype(float)
+            method = method or 'standard'
+            # Sobol genera sus propios puntos: su precio es una estimación independiente de las trayectorias dibujadas
+            independent = method == 'sobol'
+            call, put = monte_carlo_option_pricing(spot, strike, rate, volatility, T, M, I, seed=None if seed is None else int(seed),
+                                                   method=method, terminal_prices=None if independent else terminal_prices)
+            strikes = strike * np.array(STRIKE_MULTIPLIERS)
+            chain = price_from_paths(terminal_prices, strikes, rate, T)
 
-        df = pd.DataFrame(paths)
-        df['Día'] = np.arange(M + 1)
-        df_melted = df.melt(id_vars=['Día'], var_name='Simulación', value_name='Precio')
+            min_price = paths.min()
+            max_price = paths.max()
 
-        fig = px.line(df_melted, x='Día', y='Precio', color='Simulación', title="Simulación del movimiento Browniano geometrico del precio del subyacente")
-        fig.update_layout(xaxis_title="Días hasta fecha de vencimiento", yaxis_title="Precio activo subyacente", showlegend=False)
+            title = "Simulación del movimiento Browniano geometrico del precio del subyacente"
+            if render_mode == 'paths':
+                # pandas y plotly.express solo hacen falta en este modo; se importan al usarlo
+                import pandas as pd
+                import plotly.express as px
 
-        min_price = df_melted['Precio'].min()
-        max_price = df_melted['Precio'].max()
+                df = pd.DataFrame(paths)
+                df['Día'] = np.arange(M + 1)
+                df_melted = df.melt(id_vars=['Día'], var_name='Simulación', value_name='Precio')
+                fig = px.line(df_melted, x='Día', y='Precio', color='Simulación', title=title)
+                fig.update_layout(showlegend=False)
+            else:
+                fig = fan_chart_figure(paths, sample_size=FAN_SAMPLE_PATHS, overwrite_input=True, title=title)
+            fig.update_layout(xaxis_title="Días hasta fecha de vencimiento", yaxis_title="Precio activo subyacente")
+            # Con todas las trayectorias hay una traza por simulación, así que cada una se reduce más
+            compact_figure(fig, max_points=PATH_TRACE_POINTS if render_mode == 'paths' else DEFAULT_MAX_POINTS)
+        finally:
+            if key is not None:
+                release(key)
 
         conclusion_text = "Analiza la variabilidad y el riesgo asociado con la opción basado en la simulación."
         conclusion = html.Div([
             html.H4("Conclusión de la Simulación:"),
             html.P(conclusion_text),
             html.P(f"El rango de precios simulados va desde {min_price:.2f} hasta {max_price:.2f}."),
-            html.P(f"Precio estimado de la opción Call: {call_price:.2f}"),
-            html.P(f"Precio estimado de la opción Put: {put_price:.2f}")
+            html.P(f"Precio estimado de la opción Call: {call['price']:.2f} "
+                   f"(error estándar {call['std_error']:.4f}, IC 95%: {call['conf_int'][0]:.2f} - {call['conf_int'][1]:.2f})"),
+            html.P(f"Precio estimado de la opción Put: {put['price']:.2f} "
+                   f"(error estándar {put['std_error']:.4f}, IC 95%: {put['conf_int'][0]:.2f} - {put['conf_int'][1]:.2f})"),
+            html.P("Con Sobol el precio es una estimación independiente: se calcula con sus propios puntos cuasi-aleatorios, "
+                   "no con las trayectorias del gráfico ni de la tabla." if independent else
+                   "El precio se calcula sobre las mismas trayectorias del gráfico."),
+            html.H5("Valoración sobre las mismas trayectorias:"),
+            html.Table([
+                html.Thead(html.Tr([html.Th(header) for header in ("Precio de ejercicio", "Call", "Put", "Digital call", "Digital put")])),
+                html.Tbody([
+                    html.Tr([html.Td(f"{K:.2f}")] + [html.Td(f"{chain[payoff]['price'][i]:.4f}") for payoff in PATH_PAYOFFS])
+                    for i, K in enumerate(strikes)
+                ])
+            ], className="table table-sm")
         ])
 
         return fig, conclusion, html.Div()
 
-    return px.line(), html.Div(), html.Div()
\ No newline at end of file
+    return go.Figure(), html.Div(), html.Div()
\ No newline at end of file
@@ -1,8 +1,15 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, Input, Output, State, Patch, no_update
 import plotly.graph_objects as go
 from datetime import datetime
 from components.funciones import plot_option_evolution, monte_carlo_simulation
+from components.arboles import lattice_price, DEFAULT_STEPS
+from components.graficos import compact_figure
+from components.modo_en_vivo import live_panel, register_live_panel
+from components.metricas import timed_background_job
+
+MC_CHUNK_SIZE = 50_000
+STALE_SUFFIX = ' (anterior)'
 
 layout = html.Div([
     html.H1("Simulación de Carteras de Opciones", className="text-center title"),
@@ -48,25 +55,68 @@ layout = html.Div([
                 className="dropdown"
             ),
         ]),
+        html.Div(className="input-group", children=[
+            html.Label('Modelo de valoración:', className="input-label"),
+            dcc.Dropdown(
+                id='input-pricing-model',
+                options=[
+                    {'label': 'Black-Scholes', 'value': 'black-scholes'},
+                    {'label': 'Árbol binomial (CRR)', 'value': 'binomial'},
+                    {'label': 'Árbol trinomial', 'value': 'trinomial'}
+                ],
+                value='black-scholes',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Estilo de ejercicio (árboles):', className="input-label"),
+            dcc.Dropdown(
+                id='input-exercise-style',
+                options=[
+                    {'label': 'Americana', 'value': 'american'},
+                    {'label': 'Europea', 'value': 'european'}
+                ],
+                value='american',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Pasos del árbol:', className="input-label"),
+            dcc.Input(id='input-lattice-steps', type='number', value=DEFAULT_STEPS, min=2, max=20000, step=1, className="input-field"),
+        ]),
         html.Button('Calcular Precio', id='button-calculate-bs', n_clicks=0, className="calculate-button"),
-        html.Button('Simulación movimiento Browniano', id='button-monte-carlo', n_clicks=0, className="calculate-button")
+        html.Button('Simulación movimiento Browniano', id='button-monte-carlo', n_clicks=0, className="calculate-button"),
+        html.Button('Cancelar', id='button-cancel-simulation', n_clicks=0, disabled=True, className="calculate-button"),
+        html.Progress(id='simulation-progress', value='0', max='1', className="progress-bar-simulation", style={'visibility': 'hidden'})
     ]),
+    live_panel('sim'),
+    dcc.Store(id='sim-background-request'),
     html.Div(id='output-option-price', className="output-container"),
+    html.Div(id='output-background-price', className="output-container"),
     dcc.Graph(id='option-evolution-graph', className="output-container"),
     html.Div(id='portfolio-simulation-conclusion', className="output-container")
 ], className='container')
 
+# La curva de Black-Scholes se puede explorar en el navegador; Monte Carlo y los árboles siguen en el servidor
+register_live_panel('sim', 'evolution_figure', 'input-spot', 'input-strike', 'input-rate', 'input-volatility',
+                    'input-date-value', 'input-date-expiration', 'input-option-type')
+
 @callback(
-    [Output('option-evolution-graph', 'figure'), Output('output-option-price', 'children'), Output('1-error-message', 'children')],
+    [Output('option-evolution-graph', 'figure'), Output('output-option-price', 'children'), Output('1-error-message', 'children'),
+     Output('output-background-price', 'children'), Output('sim-background-request', 'data')],
     [Input('button-calculate-bs', 'n_clicks'), Input('button-monte-carlo', 'n_clicks')],
     [State('input-spot', 'value'), State('input-strike', 'value'), State('input-rate', 'value'),
      State('input-date-value', 'date'), State('input-date-expiration', 'date'),
-     State('input-volatility', 'value'), State('input-option-type', 'value'), State('input-num-simulations', 'value')]
+     State('input-volatility', 'value'), State('input-option-type', 'value'), State('input-num-simulations', 'value'),
+     State('input-pricing-model', 'value'), State('input-exercise-style', 'value'), State('input-lattice-steps', 'value'),
+     State('option-evolution-graph', 'figure')],
+    prevent_initial_call=True
 )
-def update_output(n_calculate_bs, n_monte_carlo, S, K, rate, date_value, date_expiration, volatility, option_type, M):
+def update_output(n_calculate_bs, n_monte_carlo, S, K, rate, date_value, date_expiration, volatility, option_type, M,
+                  pricing_model='black-scholes', exercise_style='american', lattice_steps=DEFAULT_STEPS, previous_figure=None):
     ctx = dash.callback_context
     if not ctx.triggered:
-        return go.Figure(), "", html.Div()
+        return go.Figure(), "", html.Div(), "", no_update
 
     button_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
@@ -88,7 +138,7 @@ def update_output(n_calculate_bs, n_monte_carlo, S, K, rate, date_value, date_ex
             html.H4("Error de entrada:", style={'color': 'red'}),
             html.P("Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields), style={'color': 'red'})
         ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-        return go.Figure(), "", error_message
+        return go.Figure(), "", error_message, "", no_update
 
     
     try:
@@ -101,27 +151,115 @@ def update_output(n_calculate_bs, n_monte_carlo, S, K, rate, date_value, date_ex
             html.H4("Error de Fecha:", style={'color': 'red'}),
             html.P(str(e), style={'color': 'red'})
         ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
-        return go.Figure(), "", error_message
+        return go.Figure(), "", error_message, "", no_update
 
-    T = (date_expiration - date_value).days / 365.0
+    T = (date_expiration - date_value).days / 365.25
     rate /= 100
     volatility /= 100
     num_steps = 365
 
     print(f"S: {S}, K: {K}, rate: {rate}, volatility: {volatility}, T: {T}, option_type: {option_type}")
 
+    # Black-Scholes se calcula aquí, en el proceso del servidor, donde la caché de valoración sí se reutiliza
     times, option_prices = plot_option_evolution(S, K, rate, volatility, T, num_steps, option_type)
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=times, y=option_prices, mode='lines', name='Black-Scholes'))
     output_text = f"El precio de la opción {option_type} usando Black-Scholes es: {option_prices[-1]:.2f}"
-
-    if button_id == 'button-monte-carlo':
-        _, mean_payoffs = monte_carlo_simulation(S, K, rate, T, volatility, option_type, M)
-        fig.add_trace(go.Scatter(x=times, y=mean_payoffs, mode='lines', name='Monte Carlo'))
-        output_text += f" | El precio promedio de la opción {option_type} usando el movimiento Browniano es: {mean_payoffs[-1]:.2f}"
-
     fig.update_layout(title=f'Evolución del Precio de la Opción {option_type.capitalize()}',
                       xaxis_title='Tiempo hasta la Expiración (Años)',
                       yaxis_title='Precio de la Opción')
 
-    return fig, output_text, html.Div()
\ No newline at end of file
+    # El árbol y Monte Carlo se lanzan como trabajo en segundo plano, que añade sus trazas a la figura.
+    # Mientras tanto se siguen viendo los resultados anteriores: sus trazas se conservan marcadas
+    # como anteriores y el texto no se toca hasta que el trabajo los sustituye
+    lattice = pricing_model in ('binomial', 'trinomial')
+    if not (lattice or button_id == 'button-monte-carlo'):
+        return compact_figure(fig), output_text, html.Div(), "", no_update
+
+    stale_traces = _stale_traces(previous_figure)
+    for trace in stale_traces:
+        fig.add_trace(trace)
+    request = {'S': S, 'K': K, 'rate': rate, 'T': T, 'volatility': volatility, 'option_type': option_type,
+               'M': M, 'monte_carlo': button_id == 'button-monte-carlo', 'pricing_model': pricing_model if lattice else None,
+               'exercise_style': exercise_style, 'lattice_steps': int(lattice_steps or DEFAULT_STEPS),
+               'black_scholes_price': float(option_prices[0]), 'stale_traces': len(stale_traces),
+               'clicks': (n_calculate_bs, n_monte_carlo)}
+
+    return compact_figure(fig), output_text, html.Div(), no_update, request
+
+
+def _stale_traces(figure):
+    """
+    Trazas de Monte Carlo y del árbol de la figura anterior, atenuadas y marcadas como anteriores.
+
+    La primera traza de la figura es siempre la de Black-Scholes, que se recalcula en cada
+    petición; las demás las añadió update_background_pricing.
+    """
+
+    if not figure:
+        return []
+    stale = []
+    for trace in figure.get('data', [])[1:]:
+        trace = dict(trace)
+        name = trace.get('name') or ''
+        if not name.endswith(STALE_SUFFIX):
+            trace['name'] = name + STALE_SUFFIX
+        trace['opacity'] = 0.4
+        stale.append(trace)
+    return stale
+
+
+@callback(
+    [Output('option-evolution-graph', 'figure', allow_duplicate=True),
+     Output('output-background-price', 'children', allow_duplicate=True)],
+    Input('sim-background-request', 'data'),
+    background=True,
+    running=[
+        (Output('button-calculate-bs', 'disabled'), True, False),
+        (Output('button-monte-carlo', 'disabled'), True, False),
+        (Output('button-cancel-simulation', 'disabled'), False, True),
+        (Output('simulation-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'}),
+    ],
+    cancel=[Input('button-cancel-simulation', 'n_clicks')],
+    progress=[Output('simulation-progress', 'value'), Output('simulation-progress', 'max')],
+    prevent_initial_call=True
+)
+@timed_background_job
+def update_background_pricing(set_progress, request):
+    if not request:
+        return no_update, no_update
+
+    S, K, rate, T, volatility, option_type = (request[name] for name in ('S', 'K', 'rate', 'T', 'volatility', 'option_type'))
+    extra = go.Figure()
+    output_text = ""
+
+    pricing_model = request['pricing_model']
+    if pricing_model:
+        american = request['exercise_style'] != 'european'
+        steps = request['lattice_steps']
+        lattice_value = lattice_price(S, K, rate, T, volatility, option_type, method=pricing_model, steps=steps, american=american)
+        style = 'americana' if american else 'europea'
+        extra.add_trace(go.Scatter(x=[0.0], y=[lattice_value], mode='markers', marker=dict(size=10),
+                                   name=f'Árbol {pricing_model} ({style})'))
+        difference = lattice_value - request['black_scholes_price']
+        # Solo en la americana la diferencia con Black-Scholes es la prima por ejercicio anticipado;
+        # en la europea es el error de discretización del árbol
+        comparison = (f"prima por ejercicio anticipado: {difference:.4f} frente a Black-Scholes" if american
+                      else f"diferencia frente a Black-Scholes: {difference:.4f}")
+        output_text += (f"Con un árbol {pricing_model} de {steps} pasos y extrapolación de Richardson, la opción {style} "
+                        f"vale: {lattice_value:.4f} ({comparison})")
+
+    if request['monte_carlo']:
+        times, mean_payoffs = monte_carlo_simulation(S, K, rate, T, volatility, option_type, request['M'], chunk_size=MC_CHUNK_SIZE,
+                                                     progress_callback=lambda done, total: set_progress((str(done), str(total))))
+        extra.add_trace(go.Scatter(x=times, y=mean_payoffs, mode='lines', name='Monte Carlo'))
+        output_text += (" | " if output_text else "") + \
+            f"El precio promedio de la opción {option_type} usando el movimiento Browniano es: {mean_payoffs[-1]:.2f}"
+
+    patched_figure = Patch()
+    # Las trazas anteriores siguen justo detrás de la de Black-Scholes hasta que llegan las nuevas
+    for _ in range(request.get('stale_traces', 0)):
+        del patched_figure['data'][1]
+    for trace in compact_figure(extra).data:
+        patched_figure['data'].append(trace.to_plotly_json())
+    return patched_figure, output_text
@@ -0,0 +1,210 @@
+from dash import html, dcc, callback, Input, Output, State
+import numpy as np
+import plotly.graph_objects as go
+from scipy.interpolate import CubicSpline, RegularGridInterpolator
+from components.cache import memoize_pricing
+from components.funciones import option_greeks
+
+MEASURE_LABELS = {
+    'price': 'Precio de la Opción',
+    'delta': 'Delta',
+    'gamma': 'Gamma',
+    'vega': 'Vega',
+    'theta': 'Theta',
+}
+GRID_STRIKES = 61
+GRID_MATURITIES = 40
+GRID_VOLATILITIES = 31
+
+layout = html.Div([
+    html.H1("Superficie de Precios por Ejercicio y Vencimiento", className="text-center title"),
+    html.Div(className="input-container", children=[
+        html.Div(className="input-group", children=[
+            html.Label('Precio del activo subyacente:', className="input-label"),
+            dcc.Input(id='surf-spot', type='number', placeholder='Ingrese precio del activo subyacente', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Tasa de interés (%):', className="input-label"),
+            dcc.Input(id='surf-rate', type='number', placeholder='Ingrese tasa de interés', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Vencimiento máximo (años):', className="input-label"),
+            dcc.Input(id='surf-max-maturity', type='number', value=2, min=0.05, className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Rango de volatilidad (%):', className="input-label"),
+            dcc.RangeSlider(id='surf-vol-range', min=1, max=150, value=[5, 80], marks={v: f'{v}%' for v in (1, 25, 50, 75, 100, 125, 150)}),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Tipo de opción:', className="input-label"),
+            dcc.Dropdown(
+                id='surf-option-type',
+                options=[
+                    {'label': 'Call', 'value': 'call'},
+                    {'label': 'Put', 'value': 'put'}
+                ],
+                value='call',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Magnitud a representar:', className="input-label"),
+            dcc.Dropdown(
+                id='surf-measure',
+                options=[{'label': label, 'value': value} for value, label in MEASURE_LABELS.items()],
+                value='price',
+                className="dropdown"
+            ),
+        ]),
+        html.Div(id='surf-error-message', className="error-message-container"),
+        html.Button('Calcular Superficie', id='surf-button-compute', n_clicks=0, className="calculate-button"),
+    ]),
+    dcc.Store(id='surf-grid-spec'),
+    html.Div(className="input-container", children=[
+        html.Label('Volatilidad mostrada (%):', className="input-label"),
+        dcc.Slider(id='surf-volatility', min=5, max=80, value=20, tooltip={'placement': 'bottom', 'always_visible': True}),
+        html.Div(className="input-group", children=[
+            html.Label('Consultar precio de ejercicio:', className="input-label"),
+            dcc.Input(id='surf-query-strike', type='number', placeholder='Precio de ejercicio', className="input-field"),
+        ]),
+        html.Div(className="input-group", children=[
+            html.Label('Consultar vencimiento (años):', className="input-label"),
+            dcc.Input(id='surf-query-maturity', type='number', placeholder='Vencimiento en años', className="input-field"),
+        ]),
+        html.Div(id='surf-query-result'),
+    ]),
+    dcc.Graph(id='surf-surface-graph', className="output-container"),
+    dcc.Graph(id='surf-heatmap-graph', className="output-container"),
+], className="container")
+
+
+def grid_axes(spot, max_maturity, vol_range):
+    """
+    Construye los ejes de la malla: precios de ejercicio, vencimientos y volatilidades.
+
+    Parámetros:
+        spot (float): Precio actual del activo subyacente.
+        max_maturity (float): Vencimiento máximo en años.
+        vol_range (tuple of float): Volatilidad mínima y máxima en tanto por uno.
+
+    Devuelve:
+        tuple of numpy.ndarray: (strikes, maturities, volatilities).
+    """
+
+    strikes = np.linspace(0.5 * spot, 1.5 * spot, GRID_STRIKES)
+    maturities = np.linspace(max_maturity / GRID_MATURITIES, max_maturity, GRID_MATURITIES)
+    volatilities = np.linspace(vol_range[0], vol_range[1], GRID_VOLATILITIES)
+    return strikes, maturities, volatilities
+
+
+@memoize_pricing()
+def surface_grid(spot, rate, option_type, measure, max_maturity, vol_min, vol_max):
+    """
+    Evalúa la magnitud pedida en toda la malla volatilidad x vencimiento x ejercicio con un único broadcasting.
+
+    El resultado queda en la caché compartida, de modo que mover el deslizador de
+    volatilidad o consultar puntos cercanos solo interpola sobre la malla guardada.
+
+    Devuelve:
+        numpy.ndarray: Matriz (volatilidades, vencimientos, ejercicios).
+    """
+
+    strikes, maturities, volatilities = grid_axes(spot, max_maturity, (vol_min, vol_max))
+    # Sin la caché de option_greeks: guardaría otra vez la malla, con las seis magnitudes
+    return option_greeks.__wrapped__(spot, strikes[np.newaxis, np.newaxis, :], rate, maturities[np.newaxis, :, np.newaxis],
+                                     volatilities[:, np.newaxis, np.newaxis], option_type)[measure]
+
+
+@callback(
+    [Output('surf-grid-spec', 'data'),
+     Output('surf-volatility', 'min'),
+     Output('surf-volatility', 'max'),
+     Output('surf-error-message', 'children')],
+    Input('surf-button-compute', 'n_clicks'),
+    State('surf-spot', 'value'),
+    State('surf-rate', 'value'),
+    State('surf-max-maturity', 'value'),
+    State('surf-vol-range', 'value'),
+    State('surf-option-type', 'value'),
+    State('surf-measure', 'value'),
+    prevent_initial_call=True
+)
+def compute_surface(n_clicks, spot, rate, max_maturity, vol_range, option_type, measure):
+    missing_fields = []
+    if spot is None:
+        missing_fields.append("Precio al contado inicial")
+    if rate is None:
+        missing_fields.append("Tasa de interés")
+    if max_maturity is None:
+        missing_fields.append("Vencimiento máximo")
+
+    if missing_fields:
+        error_message = html.Div([
+            html.H4("Error de entrada:", style={'color': 'red'}),
+            html.P("Los siguientes campos están vacíos y son requeridos: " + ", ".join(missing_fields), style={'color': 'red'})
+        ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+        return None, 5, 80, error_message
+
+    # Con un rango degenerado el eje de volatilidades repite valores y la interpolación falla
+    if vol_range is None or not vol_range[0] < vol_range[1]:
+        error_message = html.Div([
+            html.H4("Error de rango:", style={'color': 'red'}),
+            html.P("La volatilidad mínima del rango debe ser menor que la máxima.", style={'color': 'red'})
+        ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+        return None, 5, 80, error_message
+
+    spec = {
+        'spot': spot, 'rate': rate / 100, 'option_type': option_type, 'measure': measure or 'price',
+        'max_maturity': max_maturity, 'vol_min': vol_range[0] / 100, 'vol_max': vol_range[1] / 100,
+    }
+    surface_grid(**spec)
+    return spec, vol_range[0], vol_range[1], html.Div()
+
+
+@callback(
+    [Output('surf-surface-graph', 'figure'),
+     Output('surf-heatmap-graph', 'figure')],
+    Input('surf-grid-spec', 'data'),
+    Input('surf-volatility', 'value'),
+    prevent_initial_call=True
+)
+def update_surface(spec, volatility):
+    if not spec or volatility is None:
+        return go.Figure(), go.Figure()
+
+    strikes, maturities, volatilities = grid_axes(spec['spot'], spec['max_maturity'], (spec['vol_min'], spec['vol_max']))
+    grid = surface_grid(**spec)
+    sigma = np.clip(volatility / 100, volatilities[0], volatilities[-1])
+    values = CubicSpline(volatilities, grid, axis=0)(sigma)
+    label = MEASURE_LABELS[spec['measure']]
+
+    surface = go.Figure(go.Surface(x=strikes, y=maturities, z=values, colorscale='Viridis', colorbar=dict(title=label)))
+    surface.update_layout(title=f'{label} con volatilidad {sigma * 100:.1f}%',
+                          scene=dict(xaxis_title='Precio de ejercicio', yaxis_title='Vencimiento (años)', zaxis_title=label))
+
+    heatmap = go.Figure(go.Heatmap(x=strikes, y=maturities, z=values, colorscale='Viridis', colorbar=dict(title=label)))
+    heatmap.update_layout(title=f'Mapa de calor de {label.lower()}', xaxis_title='Precio de ejercicio', yaxis_title='Vencimiento (años)')
+    return surface, heatmap
+
+
+@callback(
+    Output('surf-query-result', 'children'),
+    Input('surf-query-strike', 'value'),
+    Input('surf-query-maturity', 'value'),
+    Input('surf-volatility', 'value'),
+    State('surf-grid-spec', 'data'),
+    prevent_initial_call=True
+)
+def query_surface(strike, maturity, volatility, spec):
+    if not spec or strike is None or maturity is None or volatility is None:
+        return html.Div()
+
+    axes = grid_axes(spec['spot'], spec['max_maturity'], (spec['vol_min'], spec['vol_max']))
+    strikes, maturities, volatilities = axes
+    point = (np.clip(volatility / 100, volatilities[0], volatilities[-1]),
+             np.clip(maturity, maturities[0], maturities[-1]),
+             np.clip(strike, strikes[0], strikes[-1]))
+    interpolator = RegularGridInterpolator((volatilities, maturities, strikes), surface_grid(**spec), method='cubic')
+    value = interpolator([point])[0]
+    return html.P(f"{MEASURE_LABELS[spec['measure']]} interpolado en K = {point[2]:.2f}, T = {point[1]:.2f} años, "
+                  f"volatilidad {point[0] * 100:.1f}%: {value:.4f}")
@@ -0,0 +1,103 @@
+import base64
+import io
+from dash import html, dcc, callback, Input, Output, State
+from components.valoracion_masiva import price_contracts_file, CONTRACT_COLUMNS
+
+PREVIEW_ROWS = 10
+
+layout = html.Div([
+    html.H1("Valoración Masiva de Carteras", className="text-center title"),
+    html.Div(className="input-container", children=[
+        html.P("Sube un fichero CSV o Parquet con una fila por contrato y las columnas: " + ", ".join(CONTRACT_COLUMNS) +
+               ". Las tasas y volatilidades van en tanto por uno y el vencimiento en años."),
+        html.Div(className="input-group", children=[
+            html.Label('Formato de salida:', className="input-label"),
+            dcc.Dropdown(
+                id='bulk-output-format',
+                options=[
+                    {'label': 'CSV', 'value': 'csv'},
+                    {'label': 'Parquet', 'value': 'parquet'}
+                ],
+                value='csv',
+                className="dropdown"
+            ),
+        ]),
+        dcc.Checklist(
+            id='bulk-include-greeks',
+            options=[{'label': ' Incluir griegas (delta, gamma, vega, theta, rho)', 'value': 'greeks'}],
+            value=['greeks']
+        ),
+        dcc.Upload(
+            id='bulk-upload',
+            children=html.Div(['Arrastra aquí el fichero de contratos o ', html.A('selecciónalo')]),
+            className="calculate-button text-center",
+            multiple=False
+        ),
+        html.Div(id='bulk-error-message', className="error-message-container"),
+    ]),
+    html.Div(id='bulk-summary', className="output-container"),
+    dcc.Download(id='bulk-download')
+], className="container")
+
+
+@callback(
+    [Output('bulk-summary', 'children'),
+     Output('bulk-download', 'data'),
+     Output('bulk-error-message', 'children')],
+    Input('bulk-upload', 'contents'),
+    State('bulk-upload', 'filename'),
+    State('bulk-output-format', 'value'),
+    State('bulk-include-greeks', 'value'),
+    prevent_initial_call=True
+)
+def price_uploaded_book(contents, filename, output_format, include_greeks):
+    if contents is None:
+        return html.Div(), None, html.Div()
+
+    # pandas solo se carga cuando se valora un fichero, no al arrancar la aplicación
+    import pandas as pd
+
+    _, encoded = contents.split(',', 1)
+    source = io.BytesIO(base64.b64decode(encoded))
+    input_format = 'parquet' if filename and filename.lower().endswith(('.parquet', '.pq')) else 'csv'
+    output_format = output_format or 'csv'
+    sink = io.BytesIO() if output_format == 'parquet' else io.StringIO()
+
+    try:
+        stats = price_contracts_file(source, sink, greeks='greeks' in (include_greeks or []),
+                                     input_format=input_format, output_format=output_format)
+    except (ValueError, KeyError, pd.errors.ParserError) as e:
+        error_message = html.Div([
+            html.H4("Error en el fichero:", style={'color': 'red'}),
+            html.P(str(e), style={'color': 'red'})
+        ], style={'border': '2px solid red', 'padding': '10px', 'border-radius': '5px', 'margin-right': '20px'})
+        return html.Div(), None, error_message
+
+    output_name = (filename or 'cartera').rsplit('.', 1)[0] + '_valorada.' + output_format
+    if output_format == 'parquet':
+        preview = pd.read_parquet(io.BytesIO(sink.getvalue())).head(PREVIEW_ROWS)
+        download = dcc.send_bytes(sink.getvalue(), output_name)
+    else:
+        preview = pd.read_csv(io.StringIO(sink.getvalue()), nrows=PREVIEW_ROWS)
+        download = dict(content=sink.getvalue(), filename=output_name)
+
+    if stats['rows'] == 0:
+        return html.Div([
+            html.H4("Resumen de la Valoración:"),
+            html.P(f"El fichero no contiene contratos; {output_name} solo tiene las columnas: " + ", ".join(preview.columns) + "."),
+        ]), download, html.Div()
+
+    summary = html.Div([
+        html.H4("Resumen de la Valoración:"),
+        html.P(f"Se han valorado {stats['rows']} contratos en {stats['chunks']} bloques y {stats['seconds']:.2f} s "
+               f"({stats['rows_per_second']:,.0f} filas por segundo)."),
+        html.P(f"Primeras {len(preview)} filas del fichero {output_name}:"),
+        html.Table([
+            html.Thead(html.Tr([html.Th(column) for column in preview.columns])),
+            html.Tbody([
+                html.Tr([html.Td(f"{value:.4f}" if isinstance(value, float) else str(value)) for value in row])
+                for row in preview.itertuples(index=False)
+            ])
+        ], className="table table-sm")
+    ])
+    return summary, download, html.Div()
@@ -0,0 +1,157 @@
+import argparse
+import time
+
+import numpy as np
+
+from components.funciones import option_greeks, OPTION_TYPES
+
+
+CONTRACT_COLUMNS = ('spot', 'strike', 'rate', 'time_to_expiry', 'volatility', 'option_type')
+GREEK_COLUMNS = ('delta', 'gamma', 'vega', 'theta', 'rho')
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _file_format(source, file_format=None):
+    """
+    Deduce el formato ('csv' o 'parquet') a partir del parámetro explícito o de la extensión del fichero.
+    """
+
+    if file_format:
+        return file_format.lower()
+    name = str(getattr(source, 'name', source)).lower()
+    return 'parquet' if name.endswith(('.parquet', '.pq')) else 'csv'
+
+
+def read_contracts(source, chunksize=DEFAULT_CHUNKSIZE, file_format=None):
+    """
+    Lee una cartera de contratos por bloques desde un CSV o un Parquet.
+
+    Parámetros:
+        source (str o file-like): Ruta o fichero abierto en modo binario.
+        chunksize (int): Número de filas por bloque.
+        file_format (str, opcional): 'csv' o 'parquet'; por defecto se deduce de la extensión.
+
+    Devuelve:
+        generator of pandas.DataFrame: Bloques de como mucho chunksize contratos; un fichero sin
+        contratos produce un único bloque vacío con sus columnas.
+    """
+
+    if _file_format(source, file_format) == 'parquet':
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        if parquet_file.metadata.num_rows == 0:
+            # Como read_csv con un CSV sin filas: un único bloque vacío con las columnas del fichero,
+            # para que la salida tenga al menos su esquema
+            yield parquet_file.schema_arrow.empty_table().to_pandas()
+            return
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def price_chunk(contracts, greeks=True):
+    """
+    Valora un bloque de contratos con una única evaluación vectorizada de Black-Scholes.
+
+    Parámetros:
+        contracts (pandas.DataFrame): Bloque con las columnas de CONTRACT_COLUMNS (tasas y
+            volatilidades en tanto por uno, vencimiento en años).
+        greeks (bool): Si es True, añade también las columnas de GREEK_COLUMNS.
+
+    Devuelve:
+        pandas.DataFrame: El bloque original con la columna 'price' y, opcionalmente, las griegas.
+    """
+
+    missing = [column for column in CONTRACT_COLUMNS if column not in contracts.columns]
+    if missing:
+        raise ValueError("Faltan columnas en el fichero de contratos: " + ", ".join(missing))
+
+    option_type = contracts['option_type'].astype(str).str.strip().str.lower().to_numpy()
+    invalid = ~np.isin(option_type, OPTION_TYPES)
+    if invalid.any():
+        rows = contracts.index[invalid]
+        raise ValueError(f"Tipo de opción no válido en {len(rows)} filas ({', '.join(map(str, rows[:10]))}"
+                         f"{', ...' if len(rows) > 10 else ''}); debe ser 'call' o 'put'.")
+    # Sin caché: cada bloque es único y solo ocuparía memoria
+    values = option_greeks.__wrapped__(*(contracts[column].to_numpy(dtype=float) for column in CONTRACT_COLUMNS[:-1]),
+                                       option_type)
+    priced = contracts.copy()
+    priced['price'] = values['price']
+    if greeks:
+        for greek in GREEK_COLUMNS:
+            priced[greek] = values[greek]
+    return priced
+
+
+def price_contracts_file(source, sink, chunksize=DEFAULT_CHUNKSIZE, greeks=True, input_format=None, output_format=None,
+                         progress_callback=None):
+    """
+    Valora una cartera completa leyendo, valorando y escribiendo bloque a bloque.
+
+    La memoria queda acotada por el tamaño del bloque: nunca se carga la cartera entera.
+
+    Parámetros:
+        source (str o file-like): Fichero de contratos (CSV o Parquet).
+        sink (str o file-like): Fichero de salida (CSV o Parquet).
+        chunksize (int): Número de contratos por bloque.
+        greeks (bool): Si es True, escribe también las griegas.
+        input_format (str, opcional): Formato de entrada; por defecto se deduce de la extensión.
+        output_format (str, opcional): Formato de salida; por defecto se deduce de la extensión.
+        progress_callback (callable, opcional): Función llamada con el número de filas valoradas tras cada bloque.
+
+    Devuelve:
+        dict: 'rows' valoradas, 'chunks', 'seconds' empleados y 'rows_per_second'.
+    """
+
+    to_parquet = _file_format(sink, output_format) == 'parquet'
+    if to_parquet:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+    parquet_writer = None
+    rows = chunks = 0
+    start = time.perf_counter()
+    try:
+        for contracts in read_contracts(source, chunksize, input_format):
+            priced = price_chunk(contracts, greeks)
+            if to_parquet:
+                table = pa.Table.from_pandas(priced, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(sink, table.schema)
+                parquet_writer.write_table(table)
+            else:
+                priced.to_csv(sink, index=False, header=chunks == 0, mode='w' if chunks == 0 else 'a')
+            rows += len(contracts)
+            chunks += 1
+            if progress_callback is not None:
+                progress_callback(rows)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'chunks': chunks, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds > 0 else np.inf}
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m components.valoracion_masiva entrada salida.
+    """
+
+    parser = argparse.ArgumentParser(description="Valoración Black-Scholes por bloques de una cartera de opciones.")
+    parser.add_argument('input', help="Fichero de contratos (.csv o .parquet) con las columnas " + ", ".join(CONTRACT_COLUMNS))
+    parser.add_argument('output', help="Fichero de salida (.csv o .parquet)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Contratos por bloque")
+    parser.add_argument('--no-greeks', action='store_true', help="Escribe solo el precio, sin griegas")
+    args = parser.parse_args(argv)
+
+    stats = price_contracts_file(args.input, args.output, chunksize=args.chunksize, greeks=not args.no_greeks,
+                                 progress_callback=lambda rows: print(f"{rows} contratos valorados", flush=True))
+    print(f"{stats['rows']} contratos en {stats['seconds']:.2f} s ({stats['rows_per_second']:,.0f} filas/s)")
+
+
+if __name__ == '__main__':
+    main()
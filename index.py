@@ -1,10 +1,32 @@
+import time
+_import_start = time.perf_counter()
+
+import psutil
+_import_rss = psutil.Process().memory_info().rss
+
 from dash import dcc, html, Input, Output
+from dash._callback import GLOBAL_CALLBACK_MAP
 from dash_bootstrap_components import Container, Row, Col, Card, CardBody, Button
 from app import app
 from components.navbar import create_navbar
 from components.sidebar import create_sidebar
 from components.auth import login_layout
-from components import simulaciones, simulacion_browniano, analisis_de_sensibilidad, comparacion_de_estrategias, comparacion_simulaciones
+from components.metricas import instrument_callbacks, record_import
+from components import (simulaciones, simulacion_browniano, analisis_de_sensibilidad, comparacion_de_estrategias,
+                        comparacion_simulaciones, valoracion_cartera, superficie_precios, metodos_numericos,
+                        cartera_multiactivo)
+
+PAGES = {
+    '/portfolio-simulation': simulaciones,
+    '/montecarlo-simulation': simulacion_browniano,
+    '/sensitivity-analysis': analisis_de_sensibilidad,
+    '/strategy-comparison': comparacion_de_estrategias,
+    '/option-simulation-comparison': comparacion_simulaciones,
+    '/bulk-pricing': valoracion_cartera,
+    '/price-surface': superficie_precios,
+    '/finite-differences': metodos_numericos,
+    '/multi-asset-portfolio': cartera_multiactivo,
+}
 
 
 app.layout = html.Div([
@@ -70,23 +92,51 @@ def display_page(pathname):
                         Button("Explorar", href="/option-simulation-comparison", className="stretched-link")
                     ])
                 ], className="mb-3"), md=4),
+                Col(Card([
+                    CardBody([
+                        html.H4("Valoración Masiva", className="card-title text-center"),
+                        html.P("Valora carteras completas de contratos desde ficheros CSV o Parquet, calculando precios y griegas por bloques y descargando el resultado."),
+                        Button("Explorar", href="/bulk-pricing", className="stretched-link")
+                    ])
+                ], className="mb-3"), md=4),
+            ]),
+            Row([
+                Col(Card([
+                    CardBody([
+                        html.H4("Superficie de Precios", className="card-title text-center"),
+                        html.P("Visualiza el precio o las griegas de la opción sobre una malla de precios de ejercicio, vencimientos y volatilidades, con superficie 3D y mapa de calor."),
+                        Button("Explorar", href="/price-surface", className="stretched-link")
+                    ])
+                ], className="mb-3"), md=4),
+                Col(Card([
+                    CardBody([
+                        html.H4("Diferencias Finitas", className="card-title text-center"),
+                        html.P("Resuelve la ecuación de Black-Scholes con esquemas explícito, implícito o de Crank-Nicolson, para opciones europeas y americanas, y visualiza V(S, t) en toda la malla."),
+                        Button("Explorar", href="/finite-differences", className="stretched-link")
+                    ])
+                ], className="mb-3"), md=4),
+                Col(Card([
+                    CardBody([
+                        html.H4("Carteras Multiactivo", className="card-title text-center"),
+                        html.P("Simula carteras de opciones sobre varios subyacentes correlacionados y estima la distribución de pérdidas y ganancias, el VaR y el expected shortfall."),
+                        Button("Explorar", href="/multi-asset-portfolio", className="stretched-link")
+                    ])
+                ], className="mb-3"), md=4),
             ])
         ], className="container",fluid=True)
         return content, sidebar
     elif pathname == '/login':
         return login_layout, None
-    elif pathname == '/portfolio-simulation':
-        return simulaciones.layout, create_sidebar()
-    elif pathname == '/montecarlo-simulation':
-        return simulacion_browniano.layout, create_sidebar()
-    elif pathname == '/sensitivity-analysis':
-        return analisis_de_sensibilidad.layout, create_sidebar()
-    elif pathname == '/strategy-comparison':
-        return comparacion_de_estrategias.layout, create_sidebar()
-    elif pathname == '/option-simulation-comparison':
-        return comparacion_simulaciones.layout, create_sidebar()
+    elif pathname in PAGES:
+        return PAGES[pathname].layout, create_sidebar()
     else:
         return login_layout, None
 
+# Instrumenta todos los callbacks registrados por las páginas
+instrument_callbacks(GLOBAL_CALLBACK_MAP, app.callback_map)
+
+record_import('index', time.perf_counter() - _import_start, psutil.Process().memory_info().rss - _import_rss)
+record_import('process', time.time() - psutil.Process().create_time(), 0)
+
 if __name__ == '__main__':
     app.run_server(debug=True)
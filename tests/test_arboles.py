@@ -0,0 +1,41 @@
+import pytest
+
+from components.arboles import LATTICE_METHODS, binomial_price, lattice_price, trinomial_price
+from components.funciones import function_option_price
+
+MARKET = dict(S=100.0, K=105.0, r=0.05, T=0.75, sigma=0.25)
+
+
+@pytest.mark.parametrize('pricer', [binomial_price, trinomial_price])
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_european_lattice_converges_to_black_scholes(pricer, option_type):
+    exact = function_option_price(MARKET['S'], MARKET['K'], MARKET['r'], MARKET['T'], MARKET['sigma'], option_type)
+    errors = [abs(pricer(**MARKET, option_type=option_type, steps=steps, american=False, smoothing=False) - exact)
+              for steps in (50, 200, 800)]
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 5e-3
+
+
+@pytest.mark.parametrize('method', LATTICE_METHODS)
+def test_richardson_lattice_price_matches_black_scholes(method):
+    for option_type in ('call', 'put'):
+        exact = function_option_price(MARKET['S'], MARKET['K'], MARKET['r'], MARKET['T'], MARKET['sigma'], option_type)
+        price = lattice_price.__wrapped__(**MARKET, option_type=option_type, method=method, steps=400, american=False)
+        assert price == pytest.approx(exact, abs=1e-3)
+
+
+@pytest.mark.parametrize('method', LATTICE_METHODS)
+@pytest.mark.parametrize('strike', [80.0, 105.0, 130.0])
+def test_american_put_is_worth_at_least_the_european(method, strike):
+    market = dict(MARKET, K=strike)
+    american = lattice_price.__wrapped__(**market, option_type='put', method=method, steps=400, american=True)
+    european = lattice_price.__wrapped__(**market, option_type='put', method=method, steps=400, american=False)
+    assert american >= european - 1e-10
+    assert american >= max(strike - market['S'], 0.0) - 1e-9
+
+
+def test_deep_in_the_money_american_put_carries_an_early_exercise_premium():
+    market = dict(MARKET, K=130.0)
+    american = lattice_price.__wrapped__(**market, option_type='put', steps=400, american=True)
+    european = lattice_price.__wrapped__(**market, option_type='put', steps=400, american=False)
+    assert american - european > 0.5
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+
+from components.cache import cache_stats, clear_cache, configure_cache, memoize_pricing, DEFAULT_TTL
+
+
+@memoize_pricing()
+def _price(S, K, option_type='call'):
+    return np.asarray(S - K if option_type == 'call' else K - S, dtype=float)
+
+
+def test_scalar_fast_path_shares_entries_with_keyword_calls():
+    clear_cache()
+    _price(110.0, 100, 'call')
+    _price(S=110, K=100.0)
+    assert cache_stats()['hits'] == 1
+
+
+def test_expired_entries_are_dropped_on_lookup():
+    clear_cache()
+    configure_cache(ttl=0.01)
+    try:
+        _price(110.0, 100, 'call')
+        time.sleep(0.02)
+        _price(110.0, 100, 'call')
+        stats = cache_stats()
+        assert (stats['hits'], stats['misses'], stats['expirations'], stats['entries']) == (0, 2, 1, 1)
+    finally:
+        configure_cache(ttl=DEFAULT_TTL)
+        clear_cache()
+
+
+def test_surface_grid_is_cached_once():
+    from components.superficie_precios import surface_grid
+
+    clear_cache()
+    grid = surface_grid(100.0, 0.03, 'call', 'price', 2.0, 0.1, 0.5)
+    stats = cache_stats()
+    assert stats['entries'] == 1
+    assert 'option_greeks' not in stats['functions']
+    assert stats['bytes'] < 2 * grid.nbytes
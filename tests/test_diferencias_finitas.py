@@ -0,0 +1,21 @@
+import pytest
+
+from components.diferencias_finitas import explicit_time_steps, fd_price, solve_black_scholes_pde
+from components.funciones import function_option_price
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+@pytest.mark.parametrize('spot', [80.0, 100.0, 125.0])
+def test_crank_nicolson_matches_black_scholes(option_type, spot):
+    exact = function_option_price(spot, 100.0, 0.05, 1.0, 0.2, option_type)
+    result = fd_price(spot, 100.0, 0.05, 1.0, 0.2, option_type, scheme='crank-nicolson', space_points=400, time_steps=200)
+    assert result['price'] == pytest.approx(exact, abs=2e-3)
+
+
+def test_unstable_explicit_scheme_is_rejected():
+    needed = explicit_time_steps(100.0, 100.0, 0.05, 1.0, 0.2, space_points=200)
+    with pytest.raises(ValueError, match=f"{needed} pasos"):
+        solve_black_scholes_pde.__wrapped__(100.0, 0.05, 1.0, 0.2, 'put', scheme='explicit', space_points=200,
+                                            time_steps=needed - 1)
+    result = fd_price(100.0, 100.0, 0.05, 1.0, 0.2, 'put', scheme='explicit', space_points=200, time_steps=needed)
+    assert result['price'] == pytest.approx(function_option_price(100.0, 100.0, 0.05, 1.0, 0.2, 'put'), abs=1e-2)
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from components.estrategias import (MIN_PREMIUM_FRACTION, STRATEGY_NAMES, build_strategy, determine_optimal_strategy,
+                                    expected_pnl, return_on_premium, scenario_scores, strategy_premium)
+
+TODAY, EXPIRY = datetime(2024, 1, 1), datetime(2024, 7, 1)
+
+
+@pytest.mark.parametrize('view_spot, view_volatility, expected', [
+    (108, 15, 'Bull Spread'),
+    (85, 20, 'Bear Spread'),
+    (100, 10, 'Butterfly Spread'),
+    (100, 30, 'Strangle'),
+])
+def test_market_view_selects_strategy(view_spot, view_volatility, expected):
+    assert determine_optimal_strategy(100, 100, 3, 20, TODAY, EXPIRY, view_spot=view_spot,
+                                      view_volatility=view_volatility) == expected
+
+
+def test_no_strategy_wins_most_scenarios_by_size_alone():
+    scores = scenario_scores.__wrapped__(100, 100, 0.03, 0.2, 0.5)
+    wins = np.bincount(scores.argmax(axis=0).ravel(), minlength=len(STRATEGY_NAMES))
+    assert wins[STRATEGY_NAMES.index('Straddle')] < wins.sum() / 2
+    assert np.count_nonzero(wins) >= 3
+
+
+def test_near_zero_cost_spread_does_not_win_on_its_premium_alone():
+    legs = build_strategy('Bull Spread', 200, 0.5)
+    premium = strategy_premium(legs, 100, 0.03, 0.2)
+    assert 0 < premium < 1e-4
+    pnl = expected_pnl(legs, [130], [0.2], [0.5], 100, 0.03, 0.2).item()
+    assert return_on_premium(pnl, premium, 100) == pytest.approx(pnl / (MIN_PREMIUM_FRACTION * 100))
+    # Dividiendo por la prima sin mínimo el bull spread rendiría más de un 200.000%
+    assert determine_optimal_strategy(100, 200, 3, 20, TODAY, EXPIRY, view_spot=130) == 'Butterfly Spread'
+    assert np.isfinite(scenario_scores.__wrapped__(100, 200, 0.03, 0.2, 0.5)).all()
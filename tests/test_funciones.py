@@ -0,0 +1,129 @@
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from components.funciones import (batch_option_price, function_option_price, implied_volatility, monte_carlo_option_pricing,
+                                  monte_carlo_simulation, option_greeks, simulate_gbm)
+from components.valoracion_masiva import price_chunk
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_simulate_gbm_same_seed_same_paths_for_any_workers(workers):
+    reference = simulate_gbm.__wrapped__(100, 0.05, 0.2, 1, 50, 10_000, seed=7, chunk_size=1_000)
+    paths = simulate_gbm.__wrapped__(100, 0.05, 0.2, 1, 50, 10_000, seed=7, chunk_size=1_000, workers=workers)
+    np.testing.assert_array_equal(paths, reference)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_monte_carlo_option_pricing_same_seed_same_price_for_any_workers(workers):
+    reference = monte_carlo_option_pricing.__wrapped__(100, 100, 0.05, 0.2, 1, 20, 150_000, seed=11)
+    result = monte_carlo_option_pricing.__wrapped__(100, 100, 0.05, 0.2, 1, 20, 150_000, seed=11, workers=workers)
+    assert result == reference
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_monte_carlo_simulation_same_seed_same_curve_for_any_workers(workers):
+    _, reference = monte_carlo_simulation.__wrapped__(100, 100, 0.05, 1, 0.2, 'call', 5_000, seed=3, chunk_size=1_000)
+    _, curve = monte_carlo_simulation.__wrapped__(100, 100, 0.05, 1, 0.2, 'call', 5_000, seed=3, chunk_size=1_000,
+                                                  workers=workers)
+    np.testing.assert_array_equal(curve, reference)
+
+
+def test_simulate_gbm_single_block_matches_plain_generator():
+    paths = simulate_gbm.__wrapped__(100, 0.05, 0.2, 1, 10, 100, seed=5)
+    increments = np.random.default_rng(5).standard_normal((10, 100))
+    dt = 1 / 10
+    expected = 100 * np.exp(np.vstack([np.zeros(100), np.cumsum((0.05 - 0.02) * dt + 0.2 * np.sqrt(dt) * increments, axis=0)]))
+    np.testing.assert_allclose(paths, expected)
+
+
+def test_simulate_gbm_parallel_peak_memory_close_to_output():
+    tracemalloc.start()
+    try:
+        paths = simulate_gbm.__wrapped__(100, 0.05, 0.2, 1, 252, 100_000, seed=1, dtype=np.float32, chunk_size=10_000,
+                                         workers=4)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 1.5 * paths.nbytes
+
+
+def test_option_type_is_normalized_and_validated():
+    np.testing.assert_array_equal(batch_option_price.__wrapped__(100, 100, 0.05, 1, 0.2, [' Call', 'PUT']),
+                                  batch_option_price.__wrapped__(100, 100, 0.05, 1, 0.2, ['call', 'put']))
+    with pytest.raises(ValueError, match=r'\(1\)'):
+        batch_option_price.__wrapped__(100, 100, 0.05, 1, 0.2, ['call', 'cal'])
+
+
+def test_price_chunk_names_rows_with_invalid_option_type():
+    contracts = pd.DataFrame({'spot': [100.0] * 3, 'strike': [100.0] * 3, 'rate': [0.05] * 3, 'time_to_expiry': [1.0] * 3,
+                              'volatility': [0.2] * 3, 'option_type': ['call', 'Put ', 'straddle']})
+    assert price_chunk(contracts.iloc[:2])['price'].gt(0).all()
+    with pytest.raises(ValueError, match=r'1 filas \(2\)'):
+        price_chunk(contracts)
+
+
+def test_sobol_rejects_terminal_prices():
+    with pytest.raises(ValueError, match='sobol'):
+        monte_carlo_option_pricing.__wrapped__(100, 100, 0.05, 0.2, 1, 10, 1_000, method='sobol',
+                                               terminal_prices=np.full(1_000, 100.0))
+
+
+def test_implied_volatility_round_trip():
+    S = 100.0
+    K = np.array([40.0, 70.0, 100.0, 130.0, 250.0])[:, None, None]
+    T = np.array([2 / 365, 0.25, 2.0])[None, :, None]
+    sigma = np.array([0.1, 0.3, 0.8])[None, None, :]
+    for option_type in ('call', 'put'):
+        prices = batch_option_price.__wrapped__(S, K, 0.03, T, sigma, option_type)
+        vols, converged = implied_volatility(prices, S, K, 0.03, T, option_type)
+        # Sin valor temporal apreciable (muy dentro o muy fuera del dinero, casi sin plazo) la
+        # volatilidad no está determinada; basta con que reproduzca el precio
+        identifiable = batch_option_price.__wrapped__(S, K, 0.03, T, sigma * 1.01, option_type) - prices > 1e-6
+        assert converged[identifiable].all()
+        np.testing.assert_allclose(batch_option_price.__wrapped__(S, K, 0.03, T, vols, option_type)[converged],
+                                   prices[converged], atol=1e-6)
+        np.testing.assert_allclose(vols[identifiable], np.broadcast_to(sigma, prices.shape)[identifiable], rtol=1e-4)
+
+
+def test_implied_volatility_outside_no_arbitrage_bounds_is_nan():
+    S, K, r, T = 100.0, 100.0, 0.05, 1.0
+    discounted_K = K * np.exp(-r * T)
+    call_quotes = [S - discounted_K - 0.5, S + 0.5]
+    put_quotes = [-0.1, discounted_K + 0.5]
+    call_vols, call_converged = implied_volatility(call_quotes, S, K, r, T, 'call')
+    put_vols, put_converged = implied_volatility(put_quotes, S, K, r, T, 'put')
+    assert np.isnan(call_vols).all() and np.isnan(put_vols).all()
+    assert not call_converged.any() and not put_converged.any()
+
+
+def test_batch_option_price_matches_scalar_pricing_over_broadcast_grid():
+    S = np.array([60.0, 95.0, 100.0, 140.0])[:, None, None]
+    K = np.array([80.0, 100.0, 120.0])[None, :, None]
+    T = np.array([0.0, 0.1, 1.0, 3.0])[None, None, :]
+    for option_type in ('call', 'put'):
+        batch = batch_option_price.__wrapped__(S, K, 0.04, T, 0.25, option_type)
+        assert batch.shape == (4, 3, 4)
+        for (i, j, k), price in np.ndenumerate(batch):
+            assert price == pytest.approx(function_option_price(S[i, 0, 0], K[0, j, 0], 0.04, T[0, 0, k], 0.25, option_type),
+                                          abs=1e-12)
+    # Paridad put-call en toda la malla
+    parity = batch_option_price.__wrapped__(S, K, 0.04, T, 0.25, 'call') - batch_option_price.__wrapped__(S, K, 0.04, T, 0.25, 'put')
+    np.testing.assert_allclose(parity, np.broadcast_to(S - K * np.exp(-0.04 * T), parity.shape), atol=1e-10)
+
+
+def test_option_greeks_match_finite_differences_of_batch_price():
+    S, K, r, T, sigma = np.array([70.0, 100.0, 130.0]), 100.0, 0.03, 0.75, 0.3
+    h = 1e-4
+    price = batch_option_price.__wrapped__
+    for option_type in ('call', 'put'):
+        greeks = option_greeks.__wrapped__(S, K, r, T, sigma, option_type)
+        np.testing.assert_allclose(greeks['price'], price(S, K, r, T, sigma, option_type), atol=1e-12)
+        bump = lambda **shift: price(S + shift.get('S', 0), K, r + shift.get('r', 0), T + shift.get('T', 0),
+                                     sigma + shift.get('sigma', 0), option_type)
+        np.testing.assert_allclose(greeks['delta'], (bump(S=h) - bump(S=-h)) / (2 * h), atol=1e-6)
+        np.testing.assert_allclose(greeks['gamma'], (bump(S=1e-2) - 2 * bump() + bump(S=-1e-2)) / 1e-4, atol=1e-5)
+        np.testing.assert_allclose(greeks['vega'], (bump(sigma=h) - bump(sigma=-h)) / (2 * h), atol=1e-5)
+        np.testing.assert_allclose(greeks['rho'], (bump(r=h) - bump(r=-h)) / (2 * h), atol=1e-5)
+        # theta es la derivada respecto al tiempo transcurrido, el opuesto de la derivada respecto a T
+        np.testing.assert_allclose(greeks['theta'], -(bump(T=h) - bump(T=-h)) / (2 * h), atol=1e-5)
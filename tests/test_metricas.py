@@ -0,0 +1,22 @@
+import multiprocessing
+
+from components import metricas
+
+
+def _job(x):
+    return x * 2
+
+
+_timed_job = metricas.timed_background_job(_job)
+
+
+def test_background_job_metrics_are_shared_between_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv('TFG_JOBS_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(metricas, '_job_store', None)
+    process = multiprocessing.get_context('fork').Process(target=_timed_job, args=(21,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert f'tfg_callback_latency_seconds_count{{callback="{__name__}._job"}} 1' in metricas.render_metrics()
+    metricas.reset_metrics()
+    assert f'callback="{__name__}._job"' not in metricas.render_metrics()
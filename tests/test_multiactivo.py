@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from components.multiactivo import SEED_BLOCK_PATHS, constant_correlation, correlation_factor, simulate_portfolio
+
+
+def test_correlation_factor_reproduces_the_correlation_matrix():
+    correlation = np.array([[1.0, 0.5, -0.2], [0.5, 1.0, 0.3], [-0.2, 0.3, 1.0]])
+    L = correlation_factor.__wrapped__(correlation)
+    np.testing.assert_allclose(np.tril(L), L)
+    np.testing.assert_allclose(L @ L.T, correlation, atol=1e-12)
+
+
+def test_correlation_factor_applies_jitter_to_a_singular_matrix():
+    correlation = constant_correlation(3, 1.0)
+    with pytest.raises(np.linalg.LinAlgError):
+        np.linalg.cholesky(correlation)
+    L = correlation_factor.__wrapped__(correlation)
+    assert np.isfinite(L).all()
+    np.testing.assert_allclose(np.diag(L @ L.T), 1.0)
+    np.testing.assert_allclose(L @ L.T, correlation, atol=1e-6)
+
+
+def test_correlation_factor_rejects_indefinite_matrix():
+    with pytest.raises(ValueError, match="semidefinida"):
+        correlation_factor.__wrapped__(np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]]))
+
+
+def test_simulate_portfolio_same_seed_same_result_chunked_and_unchunked():
+    spots, volatilities = np.array([100.0, 50.0, 200.0]), np.array([0.2, 0.3, 0.25])
+    positions = {'asset': np.array([0, 1, 2]), 'type': ['call', 'put', 'stock'], 'strike': np.array([105.0, 45.0, 0.0]),
+                 'expiry': np.array([0.5, 0.25, 0.0]), 'quantity': np.array([10.0, 20.0, 5.0])}
+    args = (spots, volatilities, constant_correlation(3, 0.3), 0.03, positions, 30 / 365)
+    paths = 5 * SEED_BLOCK_PATHS + 100
+    unchunked = simulate_portfolio.__wrapped__(*args, steps=20, paths=paths, seed=42)
+    chunked = simulate_portfolio.__wrapped__(*args, steps=20, paths=paths, seed=42, memory_budget=1)
+    assert unchunked['chunk_size'] == paths and chunked['chunk_size'] == SEED_BLOCK_PATHS
+    np.testing.assert_array_equal(chunked['values'], unchunked['values'])
@@ -0,0 +1,41 @@
+import base64
+import io
+
+import pandas as pd
+import pytest
+
+from components.valoracion_cartera import price_uploaded_book
+from components.valoracion_masiva import CONTRACT_COLUMNS, GREEK_COLUMNS, price_contracts_file
+
+
+def _empty_book(file_format):
+    book = pd.DataFrame({column: pd.Series(dtype=float) for column in CONTRACT_COLUMNS[:-1]})
+    book['option_type'] = pd.Series(dtype=str)
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        book.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return book.to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize('input_format', ['csv', 'parquet'])
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_empty_book_writes_schema_only_output(input_format, output_format):
+    sink = io.BytesIO() if output_format == 'parquet' else io.StringIO()
+    stats = price_contracts_file(io.BytesIO(_empty_book(input_format)), sink, input_format=input_format,
+                                 output_format=output_format)
+    assert stats['rows'] == 0
+    if output_format == 'parquet':
+        priced = pd.read_parquet(io.BytesIO(sink.getvalue()))
+    else:
+        priced = pd.read_csv(io.StringIO(sink.getvalue()))
+    assert priced.empty
+    assert list(priced.columns) == list(CONTRACT_COLUMNS) + ['price'] + list(GREEK_COLUMNS)
+
+
+def test_uploaded_empty_parquet_book_reports_no_contracts():
+    contents = 'data:application/octet-stream;base64,' + base64.b64encode(_empty_book('parquet')).decode()
+    summary, download, error = price_uploaded_book(contents, 'cartera.parquet', 'parquet', ['greeks'])
+    assert download['filename'] == 'cartera_valorada.parquet'
+    assert 'no contiene contratos' in str(summary)
+    assert not error.children